@@ -21,5 +21,6 @@ from . import agent, index
 
 router = APIRouter()
 
-router.include_router(agent.router)
+# Index goes first, so its routes are not matched as ids by the agent routes
 router.include_router(index.router)
+router.include_router(agent.router)
@@ -14,25 +14,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Request
 
+from aiconsole.api.utils.asset_list import AssetListQuery, asset_list
+from aiconsole.api.utils.asset_status_change import asset_bulk_status_change
+from aiconsole.api.utils.status_change_post_body import BulkStatusChangePostBody
 from aiconsole.core.assets.types import AssetType
-from aiconsole.core.project import project
 
 router = APIRouter()
 
 
 @router.get("/")
-async def fetch_agents():
-    return JSONResponse(
-        [
-            *(
-                {
-                    **agent.model_dump(exclude_none=True),
-                    "status": project.get_project_agents().get_status(AssetType.AGENT, agent.id),
-                }
-                for agent in project.get_project_agents().all_assets()
-            )
-        ]
-    )
+async def fetch_agents(request: Request, query: AssetListQuery = Depends()):
+    return await asset_list(request, AssetType.AGENT, query)
+
+
+@router.post("/status-change")
+async def agent_bulk_status_change(body: BulkStatusChangePostBody):
+    return await asset_bulk_status_change(AssetType.AGENT, body)
@@ -21,6 +21,7 @@ from . import index, material, preview
 
 router = APIRouter()
 
+# Index goes first, so its routes are not matched as ids by the material routes
+router.include_router(index.router)
 router.include_router(preview.router)
 router.include_router(material.router)
-router.include_router(index.router)
@@ -20,10 +20,12 @@ from aiconsole.api.endpoints import (
     agents,
     chats,
     check_key,
+    code_interpreters,
     commands_history,
     genui,
     image,
     materials,
+    metrics,
     ping,
     profile,
     projects,
@@ -43,5 +45,7 @@ app_router.include_router(materials.router, prefix="/api/materials", tags=["Mate
 app_router.include_router(agents.router, prefix="/api/agents", tags=["Agents"])
 app_router.include_router(projects.router, prefix="/api/projects", tags=["Projects"])
 app_router.include_router(settings.router, prefix="/api/settings", tags=["Project Settings"])
+app_router.include_router(metrics.router, prefix="/api/metrics", tags=["Metrics"])
+app_router.include_router(code_interpreters.router, prefix="/api/code-interpreters", tags=["Code Interpreters"])
 app_router.include_router(commands_history.router)
 app_router.include_router(ws.router)
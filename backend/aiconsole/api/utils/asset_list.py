@@ -0,0 +1,97 @@
+import hashlib
+from dataclasses import dataclass
+
+from fastapi import Query, Request, Response
+from fastapi.responses import JSONResponse
+
+from aiconsole.core.assets.materials.material import Material, MaterialContentType
+from aiconsole.core.assets.types import Asset, AssetLocation, AssetStatus, AssetType
+from aiconsole.core.project import project
+
+
+@dataclass
+class AssetListQuery:
+    """
+    Query parameters of asset listings, all optional.
+    """
+
+    status: AssetStatus | None = None
+    # Materials only
+    content_type: MaterialContentType | None = None
+    location: AssetLocation | None = None
+    q: str = Query("", description="Case insensitive text search in id, name, usage and usage examples")
+    fields: str | None = Query(None, description="Comma separated fields to return")
+    exclude: str | None = Query(None, description="Comma separated fields to omit, for example content")
+    offset: int = Query(0, ge=0)
+    limit: int | None = Query(None, ge=0)
+
+
+def _split(value: str | None) -> set[str] | None:
+    return {part.strip() for part in value.split(",") if part.strip()} if value else None
+
+
+def _matches(asset: Asset, query: AssetListQuery) -> bool:
+    if query.content_type and (not isinstance(asset, Material) or asset.content_type != query.content_type):
+        return False
+
+    if query.location and asset.defined_in != query.location:
+        return False
+
+    text = query.q.strip().lower()
+    if text and not any(text in field.lower() for field in [asset.id, asset.name, asset.usage, *asset.usage_examples]):
+        return False
+
+    return True
+
+
+async def asset_list(request: Request, asset_type: AssetType, query: AssetListQuery):
+    """
+    Lists the assets matching the query with their statuses, the total count before paging
+    is in the X-Total-Count header.
+
+    Responses have an ETag and are sent with 304 Not Modified if it matches If-None-Match.
+    """
+
+    if asset_type == AssetType.AGENT:
+        assets = project.get_project_agents()
+    elif asset_type == AssetType.MATERIAL:
+        assets = project.get_project_materials()
+    else:
+        raise ValueError(f"Invalid asset type: {asset_type}")
+
+    listed = assets.assets_with_status(query.status) if query.status else assets.all_assets()
+    listed = [asset for asset in listed if _matches(asset, query)]
+
+    total_count = len(listed)
+    page = listed[query.offset : None if query.limit is None else query.offset + query.limit]
+
+    fields = _split(query.fields)
+    exclude = _split(query.exclude) or set()
+
+    items = []
+    for asset in page:
+        item = {
+            **asset.model_dump(exclude_none=True, include=fields, exclude=exclude),
+            "id": asset.id,
+        }
+
+        if (fields is None or "status" in fields) and "status" not in exclude:
+            item["status"] = assets.get_status(asset_type, asset.id)
+
+        items.append(item)
+
+    response = JSONResponse(items)
+    etag = f'"{hashlib.sha256(response.body).hexdigest()[:32]}"'
+    response.headers.update(
+        {
+            "ETag": etag,
+            "X-Total-Count": str(total_count),
+            # Lets browsers revalidate the cached list with If-None-Match instead of downloading it again
+            "Cache-Control": "no-cache",
+        }
+    )
+
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers={key: response.headers[key] for key in ["ETag", "Cache-Control"]})
+
+    return response
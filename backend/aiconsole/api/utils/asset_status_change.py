@@ -1,7 +1,10 @@
 from fastapi import HTTPException
 from fastapi.responses import JSONResponse
 
-from aiconsole.api.utils.status_change_post_body import StatusChangePostBody
+from aiconsole.api.utils.status_change_post_body import (
+    BulkStatusChangePostBody,
+    StatusChangePostBody,
+)
 from aiconsole.core.assets.assets import Assets
 from aiconsole.core.assets.types import AssetType
 
@@ -12,3 +15,11 @@ async def asset_status_change(asset_type: AssetType, asset_id: str, body: Status
         return JSONResponse({"status": "ok"})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+async def asset_bulk_status_change(asset_type: AssetType, body: BulkStatusChangePostBody):
+    try:
+        Assets.set_statuses(asset_type, statuses=body.statuses, to_global=body.to_global)
+        return JSONResponse({"status": "ok"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
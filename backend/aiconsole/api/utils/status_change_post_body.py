@@ -6,3 +6,8 @@ from aiconsole.core.assets.types import AssetStatus
 class StatusChangePostBody(BaseModel):
     status: AssetStatus
     to_global: bool
+
+
+class BulkStatusChangePostBody(BaseModel):
+    statuses: dict[str, AssetStatus]
+    to_global: bool
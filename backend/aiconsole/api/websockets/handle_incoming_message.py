@@ -188,7 +188,7 @@ async def _handle_stop_chat_ws_message(connection: AICConnection, json: dict):
     message: StopChatClientMessage | None = None
     try:
         message = StopChatClientMessage(**json)
-        reset_code_interpreters(chat_id=message.chat_id)
+        await reset_code_interpreters(chat_id=message.chat_id)
         for task in _running_tasks[message.chat_id].values():
             task.cancel()
         await connection.send(
@@ -8,6 +8,9 @@ from aiconsole.core.assets.materials.content_evaluation_context import (
     ContentEvaluationContext,
 )
 from aiconsole.core.assets.materials.material import Material, MaterialRenderErrorEvent
+from aiconsole.core.assets.materials.render_materials_concurrently import (
+    render_materials_concurrently,
+)
 from aiconsole.core.assets.materials.rendered_material import RenderedMaterial
 from aiconsole.core.chat.types import Chat
 from aiconsole.core.project import project
@@ -49,10 +52,7 @@ async def render_materials(
             relevant_materials=relevant_materials,
         )
 
-        rendered_materials = []
-        for material in relevant_materials:
-            rendered_material = await material.render(content_context)
-            rendered_materials.append(rendered_material)
+        rendered_materials = await render_materials_concurrently(relevant_materials, content_context)
 
         return MaterialsAndRenderedMaterials(materials=relevant_materials, rendered_materials=rendered_materials)
     finally:
@@ -57,6 +57,15 @@ class AssetsUpdatedServerMessage(BaseServerMessage):
     initial: bool
     asset_type: AssetType
     count: int
+    # Seconds spent in each loading phase
+    timings: dict[str, float] = {}
+
+
+class AssetsChangedServerMessage(BaseServerMessage):
+    silent: bool
+    asset_type: AssetType
+    changed_ids: list[str]
+    removed_ids: list[str]
 
 
 class SettingsServerMessage(BaseServerMessage):
@@ -58,6 +58,8 @@ def app():
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Paging total and validator of asset listings
+        expose_headers=["X-Total-Count", "ETag"],
     )
 
     app.include_router(app_router)
@@ -45,6 +45,14 @@ def AICONSOLE_USER_CONFIG_DIR() -> Path:
     return path
 
 
+def AICONSOLE_USER_CACHE_DIR() -> Path:
+    from platformdirs import user_cache_dir
+
+    path = Path(user_cache_dir(APPLICATION_NAME))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
 HISTORY_LIMIT: int = 1000
 COMMANDS_HISTORY_JSON: str = "command_history.json"
 
@@ -25,6 +25,9 @@ class AICAgent(Asset):
     gpt_mode: GPTMode = QUALITY_GPT_MODE
     execution_mode: str = "aiconsole.core.chat.execution_modes.normal:execution_mode"
 
+    # Tokens the rendered materials can take in the prompt, a share of the model context if None
+    materials_max_tokens: int | None = None
+
 
 class AgentWithStatus(AICAgent):
     status: AssetStatus = AssetStatus.ENABLED
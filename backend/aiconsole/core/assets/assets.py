@@ -13,24 +13,36 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 import datetime
 import logging
+from pathlib import Path
+from typing import Collection
 
 import watchdog.events
 import watchdog.observers
 
 from aiconsole.api.websockets.connection_manager import connection_manager
-from aiconsole.api.websockets.server_messages import AssetsUpdatedServerMessage
+from aiconsole.api.websockets.server_messages import (
+    AssetsChangedServerMessage,
+    AssetsUpdatedServerMessage,
+)
 from aiconsole.core.assets.fs.delete_asset_from_fs import delete_asset_from_fs
 from aiconsole.core.assets.fs.move_asset_in_fs import move_asset_in_fs
 from aiconsole.core.assets.fs.project_asset_exists_fs import project_asset_exists_fs
 from aiconsole.core.assets.fs.save_asset_to_fs import save_asset_to_fs
+from aiconsole.core.assets.materials.material_search_index import material_search_index
+from aiconsole.core.assets.materials.rendered_material_cache import (
+    rendered_material_cache,
+)
 from aiconsole.core.assets.types import Asset, AssetLocation, AssetStatus, AssetType
 from aiconsole.core.project import project
 from aiconsole.core.project.paths import get_project_assets_directory
 from aiconsole.core.settings.settings import settings
 from aiconsole.utils.BatchingWatchDogHandler import BatchingWatchDogHandler
+from aiconsole.utils.metrics import metrics
 from aiconsole_toolkit.settings.partial_settings_data import PartialSettingsData
+from aiconsole_toolkit.settings.settings_data import SettingsData
 
 _log = logging.getLogger(__name__)
 
@@ -44,12 +56,18 @@ class Assets:
         self._suppress_notification_until: datetime.datetime | None = None
         self.asset_type = asset_type
         self._assets = {}
+        # Assets by status and id, along with the assets and settings snapshot they are up to date with
+        self._status_index: dict[AssetStatus, dict[str, Asset]] = {}
+        self._status_index_key: tuple[dict[str, list[Asset]], SettingsData] | None = None
+        # Reloads build a new dict and swap it in, so readers never see a partially loaded state
+        self._reload_lock = asyncio.Lock()
 
         self.observer = watchdog.observers.Observer()
+        self._watchdog_handler = BatchingWatchDogHandler(self.reload_changed, name=f"{asset_type.value}s")
 
         get_project_assets_directory(asset_type).mkdir(parents=True, exist_ok=True)
         self.observer.schedule(
-            BatchingWatchDogHandler(self.reload),
+            self._watchdog_handler,
             get_project_assets_directory(asset_type),
             recursive=True,
         )
@@ -57,6 +75,7 @@ class Assets:
 
     def stop(self):
         self.observer.stop()
+        self._watchdog_handler.stop()
 
     def all_assets(self) -> list[Asset]:
         """
@@ -68,9 +87,61 @@ class Assets:
         """
         Return all loaded assets with a specific status.
         """
-        return [
-            assets[0] for assets in self._assets.values() if self.get_status(self.asset_type, assets[0].id) == status
-        ]
+        return list(self._assets_by_status().get(status, {}).values())
+
+    def _statuses(self, s: SettingsData) -> dict[str, AssetStatus]:
+        return s.materials if self.asset_type == AssetType.MATERIAL else s.agents
+
+    def _assets_by_status(self) -> dict[AssetStatus, dict[str, Asset]]:
+        """
+        Index of assets by status. Changes made through this class update it in place, it is rebuilt
+        when assets are reloaded or settings change otherwise (e.g. the settings file is edited).
+
+        Both the assets dict and the settings snapshot are replaced rather than modified on every change,
+        so comparing them by identity tells whether the index is still valid.
+        """
+
+        s = settings().unified_settings
+        assets = self._assets
+
+        key = self._status_index_key
+        if key is not None and key[0] is assets and key[1] is s:
+            return self._status_index
+
+        statuses = self._statuses(s)
+
+        index: dict[AssetStatus, dict[str, Asset]] = {status: {} for status in AssetStatus}
+        for id, id_assets in assets.items():
+            index[statuses.get(id, id_assets[0].default_status)][id] = id_assets[0]
+
+        self._status_index = index
+        self._status_index_key = (assets, s)
+
+        return index
+
+    def _update_status_index(
+        self, ids: Collection[str], assets_before: dict[str, list[Asset]], settings_before: SettingsData
+    ):
+        """
+        Moves the given assets to their current status, if the index was up to date before they changed.
+        """
+
+        key = self._status_index_key
+        if key is None or key[0] is not assets_before or key[1] is not settings_before:
+            return
+
+        s = settings().unified_settings
+        statuses = self._statuses(s)
+
+        for id in ids:
+            for by_id in self._status_index.values():
+                by_id.pop(id, None)
+
+            id_assets = self._assets.get(id)
+            if id_assets:
+                self._status_index[statuses.get(id, id_assets[0].default_status)][id] = id_assets[0]
+
+        self._status_index_key = (self._assets, s)
 
     async def save_asset(self, asset: Asset, old_asset_id: str, create: bool):
         if asset.defined_in != AssetLocation.PROJECT_DIR and not create:
@@ -93,37 +164,54 @@ class Assets:
 
         new_asset = await save_asset_to_fs(asset, old_asset_id)
 
-        if asset.id not in self._assets:
-            self._assets[asset.id] = []
+        id_assets = list(self._assets.get(asset.id, []))
 
         # integrity checks and deleting old assets from structure
         if not create:
-            if not self._assets[asset.id] or self._assets[asset.id][0].defined_in != AssetLocation.PROJECT_DIR:
+            if not id_assets or id_assets[0].defined_in != AssetLocation.PROJECT_DIR:
                 raise Exception(f"Asset {asset.id} cannot be edited")
-            self._assets[asset.id].pop(0)
+            id_assets.pop(0)
         else:
-            if self._assets[asset.id] and self._assets[asset.id][0].defined_in == AssetLocation.PROJECT_DIR:
+            if id_assets and id_assets[0].defined_in == AssetLocation.PROJECT_DIR:
                 raise Exception(f"Asset {asset.id} already exists")
 
-        self._assets[asset.id].insert(0, new_asset)
+        id_assets.insert(0, new_asset)
+        assets_before = self._assets
+        self._assets = {**self._assets, asset.id: id_assets}
 
+        self._update_status_index([asset.id], assets_before, settings().unified_settings)
+        self._invalidate_caches()
         self._suppress_notification()
 
         return rename
 
     async def delete_asset(self, asset_id):
-        self._assets[asset_id].pop(0)
+        assets = dict(self._assets)
+        assets[asset_id] = assets[asset_id][1:]
 
-        if len(self._assets[asset_id]) == 0:
-            del self._assets[asset_id]
+        if len(assets[asset_id]) == 0:
+            del assets[asset_id]
+
+        assets_before = self._assets
+        self._assets = assets
 
         delete_asset_from_fs(self.asset_type, asset_id)
 
+        self._update_status_index([asset_id], assets_before, settings().unified_settings)
+        self._invalidate_caches()
         self._suppress_notification()
 
+    def _invalidate_caches(self, ids: Collection[str] | None = None):
+        if self.asset_type == AssetType.MATERIAL:
+            rendered_material_cache().clear()
+            material_search_index().invalidate(ids)
+
     def _suppress_notification(self):
         self._suppress_notification_until = datetime.datetime.now() + datetime.timedelta(seconds=10)
 
+    def _is_notification_suppressed(self) -> bool:
+        return bool(self._suppress_notification_until and self._suppress_notification_until >= datetime.datetime.now())
+
     def get_asset(self, id, location: AssetLocation | None = None):
         """
         Get a specific asset.
@@ -138,23 +226,64 @@ class Assets:
         return None
 
     async def reload(self, initial: bool = False):
-        from aiconsole.core.assets.load_all_assets import load_all_assets
+        from aiconsole.core.assets.load_all_assets import load_all_assets_timed
 
         _log.info(f"Reloading {self.asset_type}s ...")
 
-        self._assets = await load_all_assets(self.asset_type)
+        async with self._reload_lock:
+            self._assets, timings = await load_all_assets_timed(self.asset_type)
+            self._invalidate_caches()
+
+        for phase, seconds in timings.items():
+            metrics().histogram("asset_load_seconds", asset_type=self.asset_type.value, phase=phase).observe(seconds)
+
+        _log.info(
+            f"Loaded {len(self._assets)} {self.asset_type}s "
+            f"({', '.join(f'{phase} {seconds:.3f}s' for phase, seconds in timings.items())})"
+        )
 
         await connection_manager().send_to_all(
             AssetsUpdatedServerMessage(
-                initial=(
-                    initial
-                    or not (
-                        not self._suppress_notification_until
-                        or self._suppress_notification_until < datetime.datetime.now()
-                    )
-                ),
+                initial=initial or self._is_notification_suppressed(),
                 asset_type=self.asset_type,
                 count=len(self._assets),
+                timings=timings,
+            )
+        )
+
+    async def reload_changed(self, changed_paths: set[Path]):
+        """
+        Reloads only the assets whose files have changed, and tells clients which ones did.
+        """
+
+        from aiconsole.core.assets.load_all_assets import load_assets
+
+        ids = {path.stem for path in changed_paths}
+
+        _log.info(f"Reloading {self.asset_type}s {', '.join(sorted(ids))} ...")
+
+        async with self._reload_lock:
+            loaded_assets = await load_assets(self.asset_type, ids)
+
+            assets_before = self._assets
+            assets = dict(assets_before)
+            removed_ids = []
+            for id, id_assets in loaded_assets.items():
+                if id_assets:
+                    assets[id] = id_assets
+                elif assets.pop(id, None):
+                    removed_ids.append(id)
+            self._assets = assets
+
+            self._update_status_index(loaded_assets.keys(), assets_before, settings().unified_settings)
+            self._invalidate_caches(ids)
+
+        await connection_manager().send_to_all(
+            AssetsChangedServerMessage(
+                silent=self._is_notification_suppressed(),
+                asset_type=self.asset_type,
+                changed_ids=[id for id, id_assets in loaded_assets.items() if id_assets],
+                removed_ids=removed_ids,
             )
         )
 
@@ -180,13 +309,27 @@ class Assets:
 
     @staticmethod
     def set_status(asset_type: AssetType, id: str, status: AssetStatus, to_global: bool = False) -> None:
+        Assets.set_statuses(asset_type, {id: status}, to_global=to_global)
+
+    @staticmethod
+    def set_statuses(asset_type: AssetType, statuses: dict[str, AssetStatus], to_global: bool = False) -> None:
+        """
+        Sets statuses of many assets with a single write of the settings file.
+        """
+
         if asset_type == AssetType.MATERIAL:
-            settings().save(PartialSettingsData(materials={id: status}), to_global=to_global)
+            assets = project.get_project_materials()
+            partial_settings = PartialSettingsData(materials=statuses)
         elif asset_type == AssetType.AGENT:
-            settings().save(PartialSettingsData(agents={id: status}), to_global=to_global)
+            assets = project.get_project_agents()
+            partial_settings = PartialSettingsData(agents=statuses)
         else:
             raise ValueError(f"Unknown asset type {asset_type}")
 
+        settings_before = settings().unified_settings
+        settings().save(partial_settings, to_global=to_global)
+        assets._update_status_index(statuses.keys(), assets._assets, settings_before)
+
     @staticmethod
     def rename_asset(asset_type: AssetType, old_id: str, new_id: str):
         if asset_type == AssetType.MATERIAL:
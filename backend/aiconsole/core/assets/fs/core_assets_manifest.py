@@ -0,0 +1,137 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+
+from aiconsole.consts import AICONSOLE_USER_CACHE_DIR
+from aiconsole.core.assets.agents.agent import AICAgent
+from aiconsole.core.assets.fs.load_asset_from_fs import parse_asset_file
+from aiconsole.core.assets.materials.material import Material
+from aiconsole.core.assets.types import Asset, AssetLocation, AssetType
+
+_log = logging.getLogger(__name__)
+
+MANIFEST_FORMAT = 1
+
+_ASSET_CLASSES: dict[AssetType, type[Asset]] = {
+    AssetType.MATERIAL: Material,
+    AssetType.AGENT: AICAgent,
+}
+
+
+class CoreAssetsManifest:
+    """
+    Parsed preinstalled assets, stored as json in the user cache directory and keyed by the package version
+    and hashes of the asset files, so their TOML is parsed only once per release.
+
+    Within a process the manifest is kept in memory, and the files are hashed again only when their size or
+    modification time changes.
+    """
+
+    def __init__(self):
+        self._entries: dict[AssetType, tuple[tuple, list[dict]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _package_version() -> str:
+        try:
+            return metadata.version("aiconsole")
+        except metadata.PackageNotFoundError:
+            return "unknown"
+
+    @staticmethod
+    def _manifest_path(asset_type: AssetType) -> Path:
+        return AICONSOLE_USER_CACHE_DIR() / f"core_{asset_type.value}s_manifest.json"
+
+    def _key(self, files: dict[str, Path]) -> str:
+        hash = hashlib.sha256(f"{MANIFEST_FORMAT} {self._package_version()}".encode())
+
+        for id, path in sorted(files.items()):
+            hash.update(f"\0{id}\0".encode())
+            hash.update(hashlib.sha256(path.read_bytes()).digest())
+
+        return hash.hexdigest()
+
+    def _read(self, asset_type: AssetType, key: str) -> list[dict] | None:
+        try:
+            with open(self._manifest_path(asset_type), "r", encoding="utf8") as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(manifest, dict) or manifest.get("key") != key:
+            return None
+
+        return manifest.get("assets")
+
+    def _write(self, asset_type: AssetType, key: str, assets: list[dict]):
+        path = self._manifest_path(asset_type)
+        tmp_path = path.with_suffix(".tmp")
+
+        try:
+            with open(tmp_path, "w", encoding="utf8") as file:
+                json.dump({"key": key, "assets": assets}, file, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError:
+            _log.exception(f"Could not write the manifest of core {asset_type}s")
+
+    def _build(self, asset_type: AssetType, files: dict[str, Path]) -> list[dict]:
+        assets: list[dict] = []
+
+        for id, path in sorted(files.items()):
+            asset = parse_asset_file(asset_type, path, AssetLocation.AICONSOLE_CORE, override=False)
+            assets.append(asset.model_dump(mode="json"))
+
+        return assets
+
+    def load(self, asset_type: AssetType, files: dict[str, Path]) -> dict[str, Asset]:
+        """
+        Returns fresh instances of the core assets in files, parsing them and refreshing the manifest if needed.
+        Blocking, meant to be run in a thread.
+        """
+
+        stats = {id: path.stat() for id, path in sorted(files.items())}
+        fingerprint = tuple((id, stat.st_size, stat.st_mtime_ns) for id, stat in stats.items())
+
+        with self._lock:
+            entry = self._entries.get(asset_type)
+
+            if entry is None or entry[0] != fingerprint:
+                key = self._key(files)
+                assets = self._read(asset_type, key)
+
+                if assets is None:
+                    _log.info(f"Building the manifest of core {asset_type}s")
+                    assets = self._build(asset_type, files)
+                    self._write(asset_type, key, assets)
+
+                entry = (fingerprint, assets)
+                self._entries[asset_type] = entry
+
+        asset_class = _ASSET_CLASSES[asset_type]
+        return {data["id"]: asset_class.model_validate(data) for data in entry[1]}
+
+
+@lru_cache
+def core_assets_manifest() -> CoreAssetsManifest:
+    return CoreAssetsManifest()
@@ -16,6 +16,7 @@
 
 import logging
 import os
+from pathlib import Path
 
 import rtoml
 
@@ -36,10 +37,6 @@ _USER_AGENT_ID = "user"
 
 
 async def load_asset_from_fs(asset_type: AssetType, asset_id: str, location: AssetLocation | None = None) -> Asset:
-    if asset_type == AssetType.AGENT:
-        if asset_id == _USER_AGENT_ID:
-            raise UserIsAnInvalidAgentIdError()
-
     project_dir_path = get_project_assets_directory(asset_type)
     core_resource_path = get_core_assets_directory(asset_type)
 
@@ -58,11 +55,25 @@ async def load_asset_from_fs(asset_type: AssetType, asset_id: str, location: Ass
     else:
         raise KeyError(f"Asset {asset_id} not found")
 
-    with open(path, "r", encoding="utf8", errors="replace") as file:
-        tomldoc = rtoml.loads(file.read())
+    override = location == AssetLocation.PROJECT_DIR and (core_resource_path / f"{asset_id}.toml").exists()
+
+    return parse_asset_file(asset_type, path, location, override)
+
+
+def parse_asset_file(asset_type: AssetType, path: Path, location: AssetLocation, override: bool) -> Asset:
+    """
+    Reads and parses a single asset file, does only blocking work so it can be run in a thread.
+    """
 
     asset_id = os.path.splitext(os.path.basename(path))[0]
 
+    if asset_type == AssetType.AGENT:
+        if asset_id == _USER_AGENT_ID:
+            raise UserIsAnInvalidAgentIdError()
+
+    with open(path, "r", encoding="utf8", errors="replace") as file:
+        tomldoc = rtoml.loads(file.read())
+
     params = {
         "id": asset_id,
         "name": str(tomldoc.get("name", asset_id)).strip(),
@@ -71,7 +82,7 @@ async def load_asset_from_fs(asset_type: AssetType, asset_id: str, location: Ass
         "usage": str(tomldoc["usage"]).strip(),
         "usage_examples": tomldoc.get("usage_examples", []),
         "default_status": AssetStatus(str(tomldoc.get("default_status", "enabled")).strip()),
-        "override": location == AssetLocation.PROJECT_DIR and (core_resource_path / f"{asset_id}.toml").exists(),
+        "override": override,
     }
 
     if asset_type == AssetType.MATERIAL:
@@ -80,6 +91,12 @@ async def load_asset_from_fs(asset_type: AssetType, asset_id: str, location: Ass
             content_type=MaterialContentType(str(tomldoc["content_type"]).strip()),
         )
 
+        if "cache_ttl" in tomldoc:
+            material.cache_ttl = float(tomldoc["cache_ttl"])
+
+        if "trusted" in tomldoc:
+            material.trusted = bool(tomldoc["trusted"])
+
         if "content" in tomldoc:
             material.content = str(tomldoc["content"]).strip()
 
@@ -103,6 +120,9 @@ async def load_asset_from_fs(asset_type: AssetType, asset_id: str, location: Ass
         if "execution_mode" in tomldoc:
             params["execution_mode"] = str(tomldoc["execution_mode"]).strip()
 
+        if "materials_max_tokens" in tomldoc:
+            params["materials_max_tokens"] = int(tomldoc["materials_max_tokens"])
+
         agent = AICAgent(**params)
 
         return agent
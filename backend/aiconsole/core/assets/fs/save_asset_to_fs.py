@@ -103,11 +103,20 @@ async def save_asset_to_fs(asset: Asset, old_asset_id: str) -> Asset:
                 ),
             }[asset.content_type]()
 
+            if material.cache_ttl is not None:
+                doc.append("cache_ttl", tomlkit.item(material.cache_ttl))
+
+            if material.trusted:
+                doc.append("trusted", tomlkit.item(True))
+
         if isinstance(asset, AICAgent):
             doc.append("system", tomlkit.string(asset.system))
             doc.append("gpt_mode", tomlkit.string(asset.gpt_mode))
             doc.append("execution_mode", tomlkit.string(asset.execution_mode))
 
+            if asset.materials_max_tokens is not None:
+                doc.append("materials_max_tokens", tomlkit.item(asset.materials_max_tokens))
+
         file.write(doc.as_string())
 
     extensions = [".jpeg", ".jpg", ".png", ".gif", ".SVG"]
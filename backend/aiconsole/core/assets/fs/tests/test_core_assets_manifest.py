@@ -0,0 +1,50 @@
+from pathlib import Path
+
+import pytest
+
+from aiconsole.core.assets.fs import core_assets_manifest as manifest_module
+from aiconsole.core.assets.fs.core_assets_manifest import CoreAssetsManifest
+from aiconsole.core.assets.materials.material import Material
+from aiconsole.core.assets.types import AssetLocation, AssetType
+
+
+def _write_material(dir: Path, id: str, usage: str) -> Path:
+    path = dir / f"{id}.toml"
+    path.write_text(f'name = "{id}"\nusage = "{usage}"\ncontent_type = "static_text"\ncontent = "Content of {id}"\n')
+    return path
+
+
+@pytest.fixture
+def core_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(manifest_module, "AICONSOLE_USER_CACHE_DIR", lambda: tmp_path)
+
+    core_dir = tmp_path / "core"
+    core_dir.mkdir()
+
+    return {id: _write_material(core_dir, id, f"Usage of {id}") for id in ["first", "second"]}
+
+
+def test_manifest_is_reused_across_processes(core_files: dict[str, Path], monkeypatch: pytest.MonkeyPatch):
+    assets = CoreAssetsManifest().load(AssetType.MATERIAL, core_files)
+
+    assert isinstance(assets["first"], Material)
+    assert assets["first"].content == "Content of first"
+    assert assets["second"].defined_in == AssetLocation.AICONSOLE_CORE
+
+    def parse_asset_file(*args, **kwargs):
+        raise AssertionError("Core assets should be loaded from the manifest")
+
+    monkeypatch.setattr(manifest_module, "parse_asset_file", parse_asset_file)
+
+    # A new instance has nothing in memory, as in a new process
+    assert CoreAssetsManifest().load(AssetType.MATERIAL, core_files) == assets
+
+
+def test_manifest_is_rebuilt_when_a_file_changes(core_files: dict[str, Path]):
+    manifest = CoreAssetsManifest()
+    manifest.load(AssetType.MATERIAL, core_files)
+
+    _write_material(core_files["first"].parent, "first", "Changed usage")
+
+    assert manifest.load(AssetType.MATERIAL, core_files)["first"].usage == "Changed usage"
+    assert CoreAssetsManifest().load(AssetType.MATERIAL, core_files)["first"].usage == "Changed usage"
@@ -1,52 +1,161 @@
+import asyncio
+import logging
 import os
+import time
 from pathlib import Path
+from typing import cast
 
 from aiconsole.api.websockets.connection_manager import connection_manager
 from aiconsole.api.websockets.server_messages import ErrorServerMessage
 from aiconsole.core.assets.assets import Assets
-from aiconsole.core.assets.fs.load_asset_from_fs import load_asset_from_fs
+from aiconsole.core.assets.fs.core_assets_manifest import core_assets_manifest
+from aiconsole.core.assets.fs.load_asset_from_fs import parse_asset_file
 from aiconsole.core.assets.types import Asset, AssetLocation, AssetStatus, AssetType
 from aiconsole.core.project.paths import (
     get_core_assets_directory,
     get_project_assets_directory,
 )
-from aiconsole.utils.list_files_in_file_system import list_files_in_file_system
 
+_log = logging.getLogger(__name__)
 
-async def load_all_assets(asset_type: AssetType) -> dict[str, list[Asset]]:
-    _assets: dict[str, list[Asset]] = {}
 
-    locations = [
-        [AssetLocation.PROJECT_DIR, get_project_assets_directory(asset_type)],
-        [AssetLocation.AICONSOLE_CORE, get_core_assets_directory(asset_type)],
+def _list_asset_files(dir: Path) -> dict[str, Path]:
+    """
+    Maps ids to paths of all asset files in dir and its subdirectories, listed with a single scandir per directory.
+    """
+
+    files: dict[str, Path] = {}
+
+    try:
+        entries = sorted(os.scandir(dir), key=lambda entry: entry.name)
+    except FileNotFoundError:
+        return files
+
+    for entry in entries:
+        if entry.is_dir():
+            for id, path in _list_asset_files(Path(entry.path)).items():
+                files.setdefault(id, path)
+        elif entry.name.endswith(".toml"):
+            files.setdefault(entry.name[: -len(".toml")], Path(entry.path))
+
+    return files
+
+
+def _list_locations(asset_type: AssetType) -> list[tuple[AssetLocation, dict[str, Path]]]:
+    # Project assets come first, as they override the core ones
+    return [
+        (AssetLocation.PROJECT_DIR, _list_asset_files(get_project_assets_directory(asset_type))),
+        (AssetLocation.AICONSOLE_CORE, _list_asset_files(get_core_assets_directory(asset_type))),
     ]
 
-    for [location, dir] in locations:
-        ids = set(
-            [
-                os.path.splitext(os.path.basename(path))[0]
-                for path in list_files_in_file_system(dir)
-                if os.path.splitext(Path(path))[-1] == ".toml"
-            ]
-        )
-
-        for id in ids:
-            try:
-                asset = await load_asset_from_fs(asset_type, id, location)
-
-                # Legacy support (for v. prior to 0.2.11)
-                if Assets.get_status(asset.type, asset.id) == AssetStatus.FORCED:
-                    Assets.set_status(asset.type, asset.id, AssetStatus.ENABLED)
-
-                if id not in _assets:
-                    _assets[id] = []
-                _assets[id].append(asset)
-            except Exception as e:
-                await connection_manager().send_to_all(
-                    ErrorServerMessage(
-                        error=f"Invalid {asset_type} {id} {e}",
-                    )
+
+async def _parse_assets(
+    asset_type: AssetType, locations: list[tuple[AssetLocation, dict[str, Path]]], ids: set[str] | None = None
+) -> dict[str, list[Asset]]:
+    """
+    Parses asset files concurrently in the default thread pool, reporting invalid ones to clients.
+    Core assets come from their manifest, and are parsed only if it can not be built.
+    """
+
+    core_files = dict(locations).get(AssetLocation.AICONSOLE_CORE, {})
+
+    core_assets: dict[str, Asset] | None = None
+    if core_files:
+        try:
+            core_assets = await asyncio.to_thread(core_assets_manifest().load, asset_type, core_files)
+        except Exception:
+            _log.exception(f"Could not load core {asset_type}s from the manifest, parsing them instead")
+
+    jobs: list[tuple[str, AssetLocation, Path]] = [
+        (id, location, path)
+        for location, files in locations
+        # Sorted so the order of assets, and prompts built from them, does not change between runs
+        for id, path in sorted(files.items())
+        if ids is None or id in ids
+    ]
+
+    parse_jobs = [job for job in jobs if core_assets is None or job[1] != AssetLocation.AICONSOLE_CORE]
+
+    parsed = await asyncio.gather(
+        *(
+            asyncio.to_thread(
+                parse_asset_file,
+                asset_type,
+                path,
+                location,
+                location == AssetLocation.PROJECT_DIR and id in core_files,
+            )
+            for id, location, path in parse_jobs
+        ),
+        return_exceptions=True,
+    )
+    results = dict(zip(parse_jobs, parsed))
+
+    _assets: dict[str, list[Asset]] = {}
+
+    for job in jobs:
+        id = job[0]
+        result = results[job] if job in results else cast(dict[str, Asset], core_assets)[id]
+
+        if isinstance(result, Exception):
+            await connection_manager().send_to_all(
+                ErrorServerMessage(
+                    error=f"Invalid {asset_type} {id} {result}",
                 )
-                continue
+            )
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            _assets.setdefault(id, []).append(result)
 
     return _assets
+
+
+def _migrate_statuses(asset_type: AssetType, assets: dict[str, list[Asset]]):
+    # Legacy support (for v. prior to 0.2.11)
+    forced_ids = {id for id in assets if Assets.get_status(asset_type, id) == AssetStatus.FORCED}
+
+    if forced_ids:
+        Assets.set_statuses(asset_type, {id: AssetStatus.ENABLED for id in forced_ids})
+
+
+async def load_all_assets(asset_type: AssetType) -> dict[str, list[Asset]]:
+    """
+    Loads all assets of the given type.
+    """
+
+    return (await load_all_assets_timed(asset_type))[0]
+
+
+async def load_all_assets_timed(asset_type: AssetType) -> tuple[dict[str, list[Asset]], dict[str, float]]:
+    """
+    Loads all assets of the given type, returns them together with the time spent in each phase, in seconds.
+    """
+
+    timings: dict[str, float] = {}
+
+    started_at = time.perf_counter()
+    locations = await asyncio.to_thread(_list_locations, asset_type)
+    timings["list"] = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    _assets = await _parse_assets(asset_type, locations)
+    timings["parse"] = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    _migrate_statuses(asset_type, _assets)
+    timings["statuses"] = time.perf_counter() - started_at
+
+    return _assets, timings
+
+
+async def load_assets(asset_type: AssetType, ids: set[str]) -> dict[str, list[Asset]]:
+    """
+    Loads only the given assets, an id is mapped to an empty list if the asset no longer exists.
+    """
+
+    locations = await asyncio.to_thread(_list_locations, asset_type)
+    loaded_assets = await _parse_assets(asset_type, locations, ids)
+    _migrate_statuses(asset_type, loaded_assets)
+
+    return {id: loaded_assets.get(id, []) for id in sorted(ids)}
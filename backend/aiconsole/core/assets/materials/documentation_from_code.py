@@ -17,8 +17,11 @@
 import importlib.util
 import inspect
 import logging
+from functools import lru_cache
 from typing import TYPE_CHECKING
 
+from aiconsole.utils.compile_cached import compile_cached
+
 if TYPE_CHECKING:
     from aiconsole.core.assets.materials.material import Material
 
@@ -31,50 +34,61 @@ def documentation_from_code(material: "Material", source: str):
     """
 
     def create_content(context):
-        # Create a new module
-        spec = importlib.util.spec_from_loader("temp_module", loader=None)
-
-        if not spec:
-            raise Exception("Could not create spec for temp_module")
-
-        # Load the new module into memory
-        python_module = importlib.util.module_from_spec(spec)
-
-        # Compile the source into a code object that can be executed by exec()
-        code_object = compile(source, "temp_module", "exec")
-
-        # Define a new, blank namespace and execute the code object within it
-        exec(code_object, python_module.__dict__)
-
-        function_list = []
-        for name, obj in inspect.getmembers(python_module):
-            # take only locally defined exports, no imports
-            if name.startswith("_"):
-                continue
-
-            # if is imported from somewhere else, skip
-            if not hasattr(obj, "__module__") or obj.__module__ != "temp_module":
-                continue
-
-            if inspect.isfunction(obj):
-                # Extract function signature
-                async_prefix = "async " if inspect.iscoroutinefunction(obj) else ""
-                signature = inspect.signature(obj)
-                function_declaration = f"{async_prefix}def {name}{signature}"
-                doc = inspect.getdoc(obj) or ""
-                function_list.append(
-                    f"""
+        return generate_documentation(source)
+
+    return create_content
+
+
+@lru_cache(maxsize=256)
+def generate_documentation(source: str) -> str:
+    """
+    Documentation depends only on the source, so it is generated once per source.
+    """
+
+    # Create a new module
+    spec = importlib.util.spec_from_loader("temp_module", loader=None)
+
+    if not spec:
+        raise Exception("Could not create spec for temp_module")
+
+    # Load the new module into memory
+    python_module = importlib.util.module_from_spec(spec)
+
+    # Compile the source into a code object that can be executed by exec()
+    code_object = compile_cached(source, "temp_module")
+
+    # Define a new, blank namespace and execute the code object within it
+    exec(code_object, python_module.__dict__)
+
+    function_list = []
+    for name, obj in inspect.getmembers(python_module):
+        # take only locally defined exports, no imports
+        if name.startswith("_"):
+            continue
+
+        # if is imported from somewhere else, skip
+        if not hasattr(obj, "__module__") or obj.__module__ != "temp_module":
+            continue
+
+        if inspect.isfunction(obj):
+            # Extract function signature
+            async_prefix = "async " if inspect.iscoroutinefunction(obj) else ""
+            signature = inspect.signature(obj)
+            function_declaration = f"{async_prefix}def {name}{signature}"
+            doc = inspect.getdoc(obj) or ""
+            function_list.append(
+                f"""
 {function_declaration}
 {doc}
 """.strip()
-                    + "\n\n\n"
-                )
+                + "\n\n\n"
+            )
 
-        # get main docstring
-        docstring = inspect.getdoc(python_module)
+    # get main docstring
+    docstring = inspect.getdoc(python_module)
 
-        newline = "\n"
-        final_doc = f"""
+    newline = "\n"
+    final_doc = f"""
 {docstring + newline + newline if docstring else ''}
 
 ## Variables and Functions Available When Executing Python Code, you have the below functions available and can use them without import.
@@ -82,6 +96,4 @@ def documentation_from_code(material: "Material", source: str):
 {(newline + newline).join(function_list)}
 """.strip()
 
-        return final_doc
-
-    return create_content
+    return final_doc
@@ -13,16 +13,25 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import hashlib
 import traceback
 from dataclasses import dataclass
 from enum import Enum
-from typing import TYPE_CHECKING
+from pathlib import Path
+from typing import TYPE_CHECKING, Hashable
 
 from aiconsole.core.assets.materials.documentation_from_code import (
     documentation_from_code,
 )
+from aiconsole.core.assets.materials.material_sandbox import material_sandbox
 from aiconsole.core.assets.materials.rendered_material import RenderedMaterial
+from aiconsole.core.assets.materials.rendered_material_cache import (
+    read_content_file,
+    rendered_material_cache,
+)
 from aiconsole.core.assets.types import Asset, AssetLocation, AssetStatus, AssetType
+from aiconsole.core.settings.settings import settings
+from aiconsole.utils.compile_cached import compile_cached
 from aiconsole.utils.events import InternalEvent, internal_events
 
 if TYPE_CHECKING:
@@ -54,41 +63,93 @@ class Material(Asset):
     content_type: MaterialContentType = MaterialContentType.STATIC_TEXT
     content: str = ""
 
+    # Seconds a rendered DYNAMIC_TEXT material can be reused for, not cached if None
+    cache_ttl: float | None = None
+
+    # Trusted materials run their code in the server process, others in the material sandbox
+    trusted: bool = False
+
     def __hash__(self):
         return hash(self.id + self.version + self.name + self.usage + self.content_type + self.content)
 
+    def _content_file_path(self) -> Path | None:
+        # if starts with file:// then load the file, take into account file://./relative paths
+        if not self.content.startswith("file://"):
+            return None
+
+        content_file = self.content[len("file://") :]
+
+        from aiconsole.core.project.paths import (
+            get_core_assets_directory,
+            get_project_assets_directory,
+        )
+
+        project_dir_path = get_project_assets_directory(self.type)
+        core_resource_path = get_core_assets_directory(self.type)
+        # TODO: content_file path is relative. If material is default, only .toml file is copied to project
+        #  directory, so content_file is not found. If material is in project, then content_file is found.
+        # if self.defined_in == AssetLocation.PROJECT_DIR:
+        #     base_search_path = project_dir_path
+        # else:
+        #     base_search_path = core_resource_path
+
+        # This is a workaround for now, but it should be fixed in the future
+        if (project_dir_path / content_file).exists():
+            base_search_path = project_dir_path
+        else:
+            base_search_path = core_resource_path
+
+        return base_search_path / content_file
+
+    @property
+    def runs_in_sandbox(self) -> bool:
+        # Core materials use the in-process project API, so they have to run in the server process
+        if self.trusted or self.defined_in == AssetLocation.AICONSOLE_CORE:
+            return False
+
+        return settings().unified_settings.material_sandbox_enabled
+
     @property
     def inlined_content(self):
-        # if starts with file:// then load the file, take into account file://./relative paths
-        if self.content.startswith("file://"):
-            content_file = self.content[len("file://") :]
-
-            from aiconsole.core.project.paths import (
-                get_core_assets_directory,
-                get_project_assets_directory,
-            )
-
-            project_dir_path = get_project_assets_directory(self.type)
-            core_resource_path = get_core_assets_directory(self.type)
-            # TODO: content_file path is relative. If material is default, only .toml file is copied to project
-            #  directory, so content_file is not found. If material is in project, then content_file is found.
-            # if self.defined_in == AssetLocation.PROJECT_DIR:
-            #     base_search_path = project_dir_path
-            # else:
-            #     base_search_path = core_resource_path
-
-            # This is a workaround for now, but it should be fixed in the future
-            if (project_dir_path / content_file).exists():
-                base_search_path = project_dir_path
-            else:
-                base_search_path = core_resource_path
+        content_file_path = self._content_file_path()
 
-            with open(base_search_path / content_file, "r", encoding="utf8", errors="replace") as file:
-                return file.read()
+        if content_file_path:
+            return read_content_file(content_file_path)[0]
 
         return self.content
 
+    def _render_cache_key(self, context: "ContentEvaluationContext") -> Hashable | None:
+        match self.content_type:
+            case MaterialContentType.STATIC_TEXT:
+                content_file_path = self._content_file_path()
+                content_file_mtime = read_content_file(content_file_path)[1] if content_file_path else None
+                return (self.content_type, self.id, self.version, self.name, _hash(self.content), content_file_mtime)
+            case MaterialContentType.API:
+                return (self.content_type, self.id, self.name, _hash(self.inlined_content))
+            case MaterialContentType.DYNAMIC_TEXT if self.cache_ttl is not None:
+                # Dynamic content can depend on the context, so a cached result is reused only for the same agent
+                source_hash = _hash(self.inlined_content)
+                return (self.content_type, self.id, self.version, self.name, source_hash, context.agent.id)
+            case _:
+                return None
+
     async def render(self, context: "ContentEvaluationContext"):
+        cache_key = self._render_cache_key(context)
+
+        if cache_key is not None:
+            rendered_material = rendered_material_cache().get(cache_key, self.content_type.value)
+            if rendered_material is not None:
+                return rendered_material
+
+        rendered_material = await self._render(context)
+
+        if cache_key is not None:
+            ttl = self.cache_ttl if self.content_type == MaterialContentType.DYNAMIC_TEXT else None
+            rendered_material_cache().put(cache_key, rendered_material, ttl)
+
+        return rendered_material
+
+    async def _render(self, context: "ContentEvaluationContext") -> RenderedMaterial:
         header = f"# {self.name}\n\n"
 
         match self.content_type:
@@ -103,7 +164,11 @@ class Material(Asset):
 
     async def _handle_dynamic_text_content(self, context, header):
         try:
-            source_code = compile(self.inlined_content, "<string>", "exec")
+            if self.runs_in_sandbox:
+                content = await material_sandbox().render_dynamic_text(self.inlined_content, context)
+                return RenderedMaterial(id=self.id, content=header + content, error="")
+
+            source_code = compile_cached(self.inlined_content, "<string>")
             local_vars = {}
             exec(source_code, local_vars)
             content_func = local_vars.get("content")
@@ -119,8 +184,10 @@ class Material(Asset):
 
     async def _handle_api_content(self, context, header):
         try:
-            compile(self.inlined_content, "temp_module", "exec")
-            content = documentation_from_code(self, self.inlined_content)(context)
+            if self.runs_in_sandbox:
+                content = await material_sandbox().api_documentation(self.inlined_content)
+            else:
+                content = documentation_from_code(self, self.inlined_content)(context)
             return RenderedMaterial(id=self.id, content=header + content, error="")
         except Exception:
             await internal_events().emit(MaterialRenderErrorEvent(), details=f"Error in API material `{self.id}`")
@@ -128,5 +195,9 @@ class Material(Asset):
             raise ValueError("Error in Python API material", error_details)
 
 
+def _hash(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
 class MaterialWithStatus(Material):
     status: AssetStatus = AssetStatus.ENABLED
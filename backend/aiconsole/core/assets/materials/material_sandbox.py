@@ -0,0 +1,147 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable
+
+from aiconsole.core.assets.materials import material_sandbox_worker
+from aiconsole.core.settings.settings import settings
+
+if TYPE_CHECKING:
+    from aiconsole.core.assets.materials.content_evaluation_context import (
+        ContentEvaluationContext,
+    )
+
+_log = logging.getLogger(__name__)
+
+
+class MaterialSandbox:
+    """
+    Runs material code in a pool of worker processes, so user code can not block the event loop of the server.
+
+    Workers are spawned fresh (no state is inherited from the server), have their address space limited,
+    and the pool is replaced after a number of tasks per worker. A call that has started can not be stopped
+    in its worker, so when it times out or is cancelled (render_material cancels it on its own timeout) its pool
+    is retired: new calls go to a new pool, and the workers of the old one are killed once the other calls
+    running there finish. Replaced pools are retired the same way.
+    """
+
+    def __init__(self):
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_config: tuple | None = None
+        self._pool_tasks = 0
+        self._in_flight: dict[ProcessPoolExecutor, set[Future]] = {}
+        self._retiring: set[asyncio.Task] = set()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        s = settings().unified_settings
+        config = (s.material_sandbox_workers, s.material_sandbox_memory_limit_mb)
+
+        # max_tasks_per_child of ProcessPoolExecutor needs Python 3.11, so the whole pool is replaced instead
+        max_tasks = s.material_sandbox_workers * s.material_sandbox_max_tasks_per_worker
+        worn_out = max_tasks > 0 and self._pool_tasks >= max_tasks
+
+        if self._pool is None or self._pool_config != config or worn_out:
+            if self._pool is not None:
+                self._retire(self._pool)
+
+            self._pool = ProcessPoolExecutor(
+                max_workers=s.material_sandbox_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=material_sandbox_worker.limit_memory,
+                initargs=(s.material_sandbox_memory_limit_mb * 1024 * 1024,),
+            )
+            self._pool_config = config
+            self._pool_tasks = 0
+
+        self._pool_tasks += 1
+        return self._pool
+
+    def _retire(self, pool: ProcessPoolExecutor, stuck: Future | None = None):
+        if self._pool is pool:
+            self._pool = None
+
+        task = asyncio.create_task(self._kill_when_idle(pool, stuck))
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+
+    async def _kill_when_idle(self, pool: ProcessPoolExecutor, stuck: Future | None):
+        others = [future for future in self._in_flight.get(pool, set()) if future is not stuck]
+        if others:
+            timeout = settings().unified_settings.material_render_timeout
+            await asyncio.wait([asyncio.wrap_future(future) for future in others], timeout=timeout)
+
+        # There is no public API to stop a running call
+        for process in list(pool._processes.values()):  # type: ignore
+            process.kill()
+
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn: Callable[..., str], *args) -> str:
+        timeout = settings().unified_settings.material_render_timeout
+        pool = self._get_pool()
+
+        try:
+            future = pool.submit(fn, *args)
+        except BrokenProcessPool:
+            self._drop_broken(pool)
+            raise
+
+        in_flight = self._in_flight.setdefault(pool, set())
+        in_flight.add(future)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            _log.warning("Material code did not finish in time, replacing sandbox workers")
+            self._retire(pool, future)
+            raise
+        except asyncio.CancelledError:
+            # Cancelling drops the call if it has not started yet, a started one would keep its worker busy
+            if not future.cancel() and future.running():
+                _log.warning("Material code was cancelled while running, replacing sandbox workers")
+                self._retire(pool, future)
+            raise
+        except BrokenProcessPool:
+            _log.warning("Material sandbox worker died, most likely it exceeded the memory limit")
+            self._drop_broken(pool)
+            raise
+        finally:
+            in_flight.discard(future)
+            if not in_flight and self._in_flight.get(pool) is in_flight:
+                del self._in_flight[pool]
+
+    def _drop_broken(self, pool: ProcessPoolExecutor):
+        # A broken pool fails all of its calls, new ones go to a new pool
+        if self._pool is pool:
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def render_dynamic_text(self, source: str, context: "ContentEvaluationContext") -> str:
+        return await self._run(material_sandbox_worker.render_dynamic_text, source, context.model_dump_json())
+
+    async def api_documentation(self, source: str) -> str:
+        return await self._run(material_sandbox_worker.api_documentation, source)
+
+
+@lru_cache
+def material_sandbox() -> MaterialSandbox:
+    return MaterialSandbox()
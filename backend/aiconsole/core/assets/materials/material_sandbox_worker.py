@@ -0,0 +1,60 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Functions executed in the material sandbox worker processes, keep the imports light as they are done in every worker.
+"""
+
+import asyncio
+
+
+def limit_memory(max_bytes: int | None):
+    if not max_bytes:
+        return
+
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return
+
+    resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
+
+
+def render_dynamic_text(source: str, context_json: str) -> str:
+    from aiconsole.core.assets.materials.content_evaluation_context import (
+        ContentEvaluationContext,
+    )
+    from aiconsole.utils.compile_cached import compile_cached
+
+    context = ContentEvaluationContext.model_validate_json(context_json)
+
+    local_vars = {}
+    exec(compile_cached(source, "<string>"), local_vars)
+    content_func = local_vars.get("content")
+
+    if not callable(content_func):
+        raise ValueError("No callable content function found!")
+
+    return asyncio.run(content_func(context))
+
+
+def api_documentation(source: str) -> str:
+    from aiconsole.core.assets.materials.documentation_from_code import (
+        generate_documentation,
+    )
+
+    return generate_documentation(source)
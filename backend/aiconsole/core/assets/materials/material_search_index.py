@@ -0,0 +1,146 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable
+
+from aiconsole.core.assets.materials.material import Material
+
+_log = logging.getLogger(__name__)
+
+# BM25 parameters, the usual defaults
+K1 = 1.5
+B = 0.75
+
+# Usage describes when a material is needed, so it counts more than the content
+USAGE_WEIGHT = 3
+USAGE_EXAMPLES_WEIGHT = 2
+
+MAX_CONTENT_CHARS = 20_000
+
+_TOKEN_RE = re.compile(r"[a-z0-9]{2,}")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+@dataclass(frozen=True)
+class _Document:
+    term_frequencies: Counter[str]
+    length: int
+
+
+class MaterialSearchIndex:
+    """
+    BM25 index over usage, usage examples and content of materials, used to preselect the materials
+    that are relevant to a conversation before the director sees them.
+
+    Documents are built lazily and dropped when their materials change.
+    """
+
+    def __init__(self):
+        self._documents: dict[str, _Document] = {}
+        self._lock = threading.Lock()
+
+    def _document(self, material: Material) -> _Document:
+        with self._lock:
+            document = self._documents.get(material.id)
+
+        if document is not None:
+            return document
+
+        try:
+            content = material.inlined_content[:MAX_CONTENT_CHARS]
+        except OSError:
+            _log.warning(f"Could not read content of material {material.id}, indexing it without content")
+            content = ""
+
+        term_frequencies: Counter[str] = Counter()
+        for _ in range(USAGE_WEIGHT):
+            term_frequencies.update(tokenize(material.usage))
+        for _ in range(USAGE_EXAMPLES_WEIGHT):
+            term_frequencies.update(tokenize(" ".join(material.usage_examples)))
+        term_frequencies.update(tokenize(content))
+
+        document = _Document(term_frequencies=term_frequencies, length=sum(term_frequencies.values()))
+
+        with self._lock:
+            self._documents[material.id] = document
+
+        return document
+
+    def invalidate(self, ids: Iterable[str] | None = None):
+        with self._lock:
+            if ids is None:
+                self._documents.clear()
+                return
+
+            for id in ids:
+                self._documents.pop(id, None)
+
+    def scores(self, materials: list[Material], query: str) -> dict[str, float]:
+        """
+        Scores the materials against the query, statistics are computed over the given materials only.
+        """
+
+        documents = {material.id: self._document(material) for material in materials}
+        query_terms = set(tokenize(query))
+
+        if not documents or not query_terms:
+            return {material_id: 0.0 for material_id in documents}
+
+        average_length = sum(document.length for document in documents.values()) / len(documents) or 1
+        document_frequencies = Counter(
+            term for document in documents.values() for term in query_terms if term in document.term_frequencies
+        )
+
+        scores = {}
+        for material_id, document in documents.items():
+            score = 0.0
+            for term, document_frequency in document_frequencies.items():
+                frequency = document.term_frequencies.get(term, 0)
+                if not frequency:
+                    continue
+
+                idf = math.log(1 + (len(documents) - document_frequency + 0.5) / (document_frequency + 0.5))
+                norm = K1 * (1 - B + B * document.length / average_length)
+                score += idf * frequency * (K1 + 1) / (frequency + norm)
+            scores[material_id] = score
+
+        return scores
+
+    def top_k(self, materials: list[Material], query: str, k: int) -> list[Material]:
+        """
+        Returns up to k materials most relevant to the query, best first, ties are broken by id.
+        """
+
+        if len(materials) <= k:
+            return materials
+
+        scores = self.scores(materials, query)
+        return sorted(materials, key=lambda material: (-scores[material.id], material.id))[:k]
+
+
+@lru_cache
+def material_search_index() -> MaterialSearchIndex:
+    return MaterialSearchIndex()
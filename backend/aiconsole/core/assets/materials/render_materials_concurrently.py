@@ -0,0 +1,74 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from typing import TYPE_CHECKING, Awaitable, Callable, cast
+
+from aiconsole.core.assets.materials.material import Material, MaterialRenderErrorEvent
+from aiconsole.core.assets.materials.rendered_material import RenderedMaterial
+from aiconsole.core.settings.settings import settings
+from aiconsole.utils.events import internal_events
+
+if TYPE_CHECKING:
+    from aiconsole.core.assets.materials.content_evaluation_context import (
+        ContentEvaluationContext,
+    )
+
+
+class MaterialRenderTimeoutError(ValueError):
+    pass
+
+
+async def render_material(material: Material, context: "ContentEvaluationContext") -> RenderedMaterial:
+    """
+    Renders the material, giving up after the configured timeout, errors are reported the same way as by render.
+    """
+
+    timeout = settings().unified_settings.material_render_timeout
+
+    try:
+        return await asyncio.wait_for(material.render(context), timeout)
+    except asyncio.TimeoutError:
+        await internal_events().emit(
+            MaterialRenderErrorEvent(), details=f"Material `{material.id}` did not render within {timeout}s"
+        )
+        error_details = RenderedMaterial(id=material.id, content="", error=f"Rendering timed out after {timeout}s")
+        raise MaterialRenderTimeoutError("Material rendering timed out", error_details)
+
+
+async def render_materials_concurrently(
+    materials: list[Material],
+    context: "ContentEvaluationContext",
+    render: Callable[[Material, "ContentEvaluationContext"], Awaitable[RenderedMaterial]] = render_material,
+) -> list[RenderedMaterial]:
+    """
+    Renders materials concurrently, up to the configured number at a time, keeping their order.
+    All materials are rendered even if some fail, then the error of the first failed one is raised.
+    """
+
+    semaphore = asyncio.Semaphore(settings().unified_settings.material_render_concurrency)
+
+    async def _render(material: Material):
+        async with semaphore:
+            return await render(material, context)
+
+    results = await asyncio.gather(*(_render(material) for material in materials), return_exceptions=True)
+
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    return cast(list[RenderedMaterial], results)
@@ -0,0 +1,112 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Hashable
+
+from aiconsole.core.assets.materials.rendered_material import RenderedMaterial
+from aiconsole.utils.metrics import metrics
+
+_log = logging.getLogger(__name__)
+
+MAX_CACHED_RENDERED_MATERIALS = 256
+
+
+class RenderedMaterialCache:
+    """
+    Keeps rendered materials between turns, keys are built by the material from everything the content depends on,
+    entries can have a time to live.
+    """
+
+    def __init__(self, max_size: int = MAX_CACHED_RENDERED_MATERIALS):
+        self._max_size = max_size
+        self._entries: OrderedDict[Hashable, tuple[RenderedMaterial, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, content_type: str) -> RenderedMaterial | None:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[1] is not None and entry[1] < time.monotonic():
+                del self._entries[key]
+                entry = None
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None:
+            metrics().counter("material_render_cache_misses_total", content_type=content_type).inc()
+            return None
+
+        metrics().counter("material_render_cache_hits_total", content_type=content_type).inc()
+        return entry[0]
+
+    def put(self, key: Hashable, rendered_material: RenderedMaterial, ttl: float | None = None):
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._entries[key] = (rendered_material, expires_at)
+            self._entries.move_to_end(key)
+
+            if len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+        _log.debug("Rendered material cache cleared")
+
+
+@lru_cache
+def rendered_material_cache() -> RenderedMaterialCache:
+    return RenderedMaterialCache()
+
+
+_content_files: OrderedDict[Path, tuple[int, str]] = OrderedDict()
+_content_files_lock = threading.Lock()
+
+
+def read_content_file(path: Path) -> tuple[str, int]:
+    """
+    Reads a file referenced by material content, returns the content and its mtime.
+    The file is only read again when it changes, the most recently read files are kept, as many as rendered materials.
+    """
+
+    mtime = path.stat().st_mtime_ns
+
+    with _content_files_lock:
+        cached = _content_files.get(path)
+        if cached is not None and cached[0] == mtime:
+            _content_files.move_to_end(path)
+            return cached[1], mtime
+
+    with open(path, "r", encoding="utf8", errors="replace") as file:
+        content = file.read()
+
+    with _content_files_lock:
+        _content_files[path] = (mtime, content)
+        _content_files.move_to_end(path)
+
+        if len(_content_files) > MAX_CACHED_RENDERED_MATERIALS:
+            _content_files.popitem(last=False)
+
+    return content, mtime
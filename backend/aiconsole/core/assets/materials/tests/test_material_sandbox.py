@@ -0,0 +1,57 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from aiconsole.core.assets.materials import material_sandbox as sandbox_module
+from aiconsole.core.assets.materials import (
+    render_materials_concurrently as render_module,
+)
+from aiconsole.core.assets.materials.material_sandbox import MaterialSandbox
+from aiconsole.core.assets.materials.render_materials_concurrently import (
+    MaterialRenderTimeoutError,
+    render_material,
+)
+from aiconsole_toolkit.settings.settings_data import SettingsData
+
+HANGING_SOURCE = "import time\ntime.sleep(60)"
+
+
+class FakeMaterial:
+    id = "hanging"
+
+    def __init__(self, sandbox: MaterialSandbox, source: str):
+        self.sandbox = sandbox
+        self.source = source
+
+    async def render(self, context):
+        return await self.sandbox.api_documentation(self.source)
+
+
+@pytest.fixture
+def sandbox(monkeypatch: pytest.MonkeyPatch):
+    configured = SimpleNamespace(unified_settings=SettingsData(material_render_timeout=1, material_sandbox_workers=1))
+    monkeypatch.setattr(sandbox_module, "settings", lambda: configured)
+    monkeypatch.setattr(render_module, "settings", lambda: configured)
+
+    return MaterialSandbox()
+
+
+def test_workers_of_materials_timed_out_by_render_material_are_killed(sandbox: MaterialSandbox):
+    async def scenario():
+        # Starts the worker, so the hanging call is running when it times out
+        await sandbox.api_documentation("")
+        workers = list(sandbox._pool._processes.values())  # type: ignore
+
+        with pytest.raises(MaterialRenderTimeoutError):
+            await render_material(FakeMaterial(sandbox, HANGING_SOURCE), None)  # type: ignore
+
+        await asyncio.gather(*sandbox._retiring)
+        return workers
+
+    workers = asyncio.run(scenario())
+
+    for worker in workers:
+        worker.join(5)
+        assert not worker.is_alive()
+    assert sandbox._pool is None
@@ -0,0 +1,44 @@
+from aiconsole.core.assets.materials.material import Material
+from aiconsole.core.assets.materials.material_search_index import MaterialSearchIndex
+from aiconsole.core.assets.types import AssetLocation
+
+
+def create_material(id: str, usage: str, content: str = "") -> Material:
+    return Material(
+        id=id,
+        name=id,
+        usage=usage,
+        usage_examples=[],
+        defined_in=AssetLocation.PROJECT_DIR,
+        override=False,
+        content=content,
+    )
+
+
+def test_top_k_prefers_materials_matching_the_conversation():
+    materials = [
+        create_material("plotting", "When plotting charts with matplotlib"),
+        create_material("email", "When sending an email", "Use smtplib to send an email."),
+        create_material("pdf", "When reading PDF files"),
+    ]
+
+    top = MaterialSearchIndex().top_k(materials, "Please send an email to John with the report", 1)
+
+    assert [material.id for material in top] == ["email"]
+
+
+def test_top_k_is_deterministic_without_matches():
+    materials = [create_material(id, "Unrelated") for id in ["c", "a", "b"]]
+
+    assert [material.id for material in MaterialSearchIndex().top_k(materials, "weather", 2)] == ["a", "b"]
+
+
+def test_invalidate_reindexes_changed_materials():
+    index = MaterialSearchIndex()
+    materials = [create_material("a", "When cooking"), create_material("b", "When gardening")]
+    assert index.top_k(materials, "cooking", 1)[0].id == "a"
+
+    materials = [create_material("a", "When gardening"), create_material("b", "When cooking")]
+    index.invalidate()
+
+    assert index.top_k(materials, "cooking", 1)[0].id == "b"
@@ -29,6 +29,7 @@ from aiconsole.core.chat.chat_mutations import (
     SetIsSuccessfulToolCallMutation,
     SetLanguageToolCallMutation,
     SetMaterialsIdsMessageGroupMutation,
+    SetMaterialsPackingMessageGroupMutation,
     SetOutputToolCallMutation,
     SetRoleMessageGroupMutation,
     SetTaskMessageGroupMutation,
@@ -106,6 +107,12 @@ def _handle_AppendToMessageGroupMaterialsIdsMutation(chat, mutation: AppendToMat
     message_group.materials_ids.append(mutation.material_id)
 
 
+def _handle_SetMessageGroupMaterialsPackingMutation(chat, mutation: SetMaterialsPackingMessageGroupMutation) -> None:
+    message_group = _get_message_group(chat, mutation.message_group_id)
+    message_group.dropped_materials_ids = mutation.dropped_materials_ids
+    message_group.truncated_materials_ids = mutation.truncated_materials_ids
+
+
 def _handle_SetMessageGroupAnalysisMutation(chat, mutation: SetAnalysisMessageGroupMutation) -> None:
     message_group = _get_message_group(chat, mutation.message_group_id)
     message_group.analysis = mutation.analysis
@@ -266,6 +273,7 @@ MUTATION_HANDLERS: dict[str, Callable[[Chat, Any], None]] = {
     SetActorIdMessageGroupMutation.__name__: _handle_SetMessageGroupAgentIdMutation,
     SetMaterialsIdsMessageGroupMutation.__name__: _handle_SetMessageGroupMaterialsIdsMutation,
     AppendToMaterialsIdsMessageGroupMutation.__name__: _handle_AppendToMessageGroupMaterialsIdsMutation,
+    SetMaterialsPackingMessageGroupMutation.__name__: _handle_SetMessageGroupMaterialsPackingMutation,
     SetAnalysisMessageGroupMutation.__name__: _handle_SetMessageGroupAnalysisMutation,
     AppendToAnalysisMessageGroupMutation.__name__: _handle_AppendToMessageGroupAnalysisMutation,
     CreateMessageMutation.__name__: _handle_CreateMessageMutation,
@@ -74,6 +74,13 @@ class AppendToMaterialsIdsMessageGroupMutation(BaseModel):
     material_id: str
 
 
+class SetMaterialsPackingMessageGroupMutation(BaseModel):
+    type: Literal["SetMaterialsPackingMessageGroupMutation"] = "SetMaterialsPackingMessageGroupMutation"
+    message_group_id: str
+    dropped_materials_ids: list[str]
+    truncated_materials_ids: list[str]
+
+
 class SetAnalysisMessageGroupMutation(BaseModel):
     type: Literal["SetAnalysisMessageGroupMutation"] = "SetAnalysisMessageGroupMutation"
     message_group_id: str
@@ -211,6 +218,7 @@ ChatMutation = (
     | SetActorIdMessageGroupMutation
     | SetMaterialsIdsMessageGroupMutation
     | AppendToMaterialsIdsMessageGroupMutation
+    | SetMaterialsPackingMessageGroupMutation
     | SetAnalysisMessageGroupMutation
     | AppendToAnalysisMessageGroupMutation
     | CreateMessageMutation
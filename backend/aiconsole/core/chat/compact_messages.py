@@ -0,0 +1,220 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Callable
+
+from aiconsole.core.chat.convert_messages import convert_message_groups
+from aiconsole.core.chat.types import AICMessageGroup, Chat
+from aiconsole.core.gpt.consts import GPTMode
+from aiconsole.core.gpt.request import (
+    EXTRA_BUFFER_FOR_ENCODING_OVERHEAD,
+    count_message_tokens,
+    count_tools_tokens,
+    get_encoding,
+    get_gpt_mode_config,
+)
+from aiconsole.core.gpt.tool_definition import ToolDefinition
+from aiconsole.core.gpt.types import (
+    GPTRequestMessage,
+    GPTRequestTextMessage,
+    GPTRequestToolMessage,
+)
+
+_log = logging.getLogger(__name__)
+
+# Number of most recent message groups that are never summarized
+RECENT_GROUPS_TO_KEEP = 4
+
+OLD_TOOL_OUTPUT_MAX_CHARS = 1000
+RECENT_TOOL_OUTPUT_MAX_CHARS = 4000
+SUMMARY_SNIPPET_MAX_CHARS = 300
+SUMMARY_CACHE_SIZE = 1000
+
+_summary_cache: OrderedDict[tuple[str, str], GPTRequestTextMessage] = OrderedDict()
+
+
+def _truncate_text(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+
+    half = max_chars // 2
+    return f"{text[:half]}\n... [{len(text) - 2 * half} characters truncated] ...\n{text[-half:]}"
+
+
+def _truncate_tool_outputs(messages: list[GPTRequestMessage], max_chars: int) -> list[GPTRequestMessage]:
+    return [
+        (
+            message.model_copy(update={"content": _truncate_text(message.content, max_chars)})
+            if isinstance(message, GPTRequestToolMessage) and message.content and len(message.content) > max_chars
+            else message
+        )
+        for message in messages
+    ]
+
+
+def summarize_message_group(group: AICMessageGroup, messages: list[GPTRequestMessage]) -> GPTRequestTextMessage:
+    """
+    Creates a short extractive summary of a message group, summaries are cached per group and content,
+    so a group is summarized only once as long as it does not change.
+    """
+
+    content_hash = hashlib.sha256(
+        json.dumps([message.model_dump(exclude_none=True) for message in messages]).encode()
+    ).hexdigest()
+    key = (group.id, content_hash)
+
+    if key in _summary_cache:
+        _summary_cache.move_to_end(key)
+        return _summary_cache[key]
+
+    lines: list[str] = []
+    for message in group.messages:
+        if message.content:
+            lines.append(_truncate_text(message.content.strip(), SUMMARY_SNIPPET_MAX_CHARS))
+        for tool_call in message.tool_calls:
+            line = f"Ran {tool_call.language or 'code'}"
+            if tool_call.output:
+                line += f", output: {_truncate_text(tool_call.output.strip(), SUMMARY_SNIPPET_MAX_CHARS)}"
+            lines.append(line)
+
+    summary = GPTRequestTextMessage(
+        role="system",
+        name="summary",
+        content=f"Summary of an earlier part of the conversation ({group.actor_id.id}):\n" + "\n".join(lines),
+    )
+
+    _summary_cache[key] = summary
+    if len(_summary_cache) > SUMMARY_CACHE_SIZE:
+        _summary_cache.popitem(last=False)
+
+    return summary
+
+
+def _director_messages(messages: list[GPTRequestMessage]) -> list[GPTRequestMessage]:
+    return [
+        message
+        for message in messages
+        if isinstance(message, GPTRequestTextMessage) and message.role == "system" and message.name == "director"
+    ]
+
+
+def fit_message_groups(
+    converted_groups: list[tuple[AICMessageGroup, list[GPTRequestMessage]]],
+    budget: int,
+    count_tokens: Callable[[GPTRequestMessage], int],
+    recent_groups_to_keep: int = RECENT_GROUPS_TO_KEEP,
+) -> list[GPTRequestMessage]:
+    """
+    Fits the converted message groups into the token budget, by applying increasingly lossy steps:
+
+    1. Truncating tool outputs of older groups
+    2. Summarizing older groups
+    3. Dropping summaries of older groups
+    4. Truncating tool outputs of recent groups
+    5. Dropping recent groups, except the last one
+
+    Director messages are sent only when they change, so a summarized or dropped group keeps its director
+    message unless the next group carries its own.
+
+    Stops as soon as the messages fit, the result might still not fit if the last group alone is too big.
+    """
+
+    groups = [messages for _, messages in converted_groups]
+    group_tokens = [sum(count_tokens(message) for message in messages) for messages in groups]
+    total = sum(group_tokens)
+
+    if total <= budget:
+        return [message for messages in groups for message in messages]
+
+    _log.info(f"Compacting chat history, used tokens: {total}, budget: {budget}")
+
+    def replace(index: int, messages: list[GPTRequestMessage]) -> bool:
+        nonlocal total
+        tokens = sum(count_tokens(message) for message in messages)
+        total += tokens - group_tokens[index]
+        groups[index] = messages
+        group_tokens[index] = tokens
+        return total <= budget
+
+    def fitted() -> list[GPTRequestMessage]:
+        _log.info(f"Chat history compacted to {total} tokens")
+        return [message for messages in groups for message in messages]
+
+    def kept_director_messages(index: int) -> list[GPTRequestMessage]:
+        if index + 1 < len(groups) and _director_messages(converted_groups[index + 1][1]):
+            return []
+        return _director_messages(converted_groups[index][1])
+
+    old_indexes = range(max(0, len(groups) - recent_groups_to_keep))
+    recent_indexes = range(len(old_indexes), len(groups))
+
+    for index in old_indexes:
+        if replace(index, _truncate_tool_outputs(groups[index], OLD_TOOL_OUTPUT_MAX_CHARS)):
+            return fitted()
+
+    for index in old_indexes:
+        group, messages = converted_groups[index]
+        if replace(index, [*kept_director_messages(index), summarize_message_group(group, messages)]):
+            return fitted()
+
+    for index in old_indexes:
+        if replace(index, kept_director_messages(index)):
+            return fitted()
+
+    for index in recent_indexes:
+        if replace(index, _truncate_tool_outputs(groups[index], RECENT_TOOL_OUTPUT_MAX_CHARS)):
+            return fitted()
+
+    for index in recent_indexes[:-1]:
+        if replace(index, kept_director_messages(index)):
+            return fitted()
+
+    _log.warning(f"Could not fit chat history into the budget, used tokens: {total}, budget: {budget}")
+    return fitted()
+
+
+def compact_messages(
+    chat: Chat,
+    gpt_mode: GPTMode,
+    system_message: str,
+    tools: list[ToolDefinition] = [],
+    trailing_messages: list[GPTRequestMessage] = [],
+    min_tokens: int = 0,
+) -> list[GPTRequestMessage]:
+    """
+    Converts the chat into GPT messages that fit into the context window of the given GPT mode,
+    leaving room for the system message, tools, trailing messages and at least min_tokens of the response.
+    """
+
+    encoding = get_encoding(gpt_mode)
+
+    def count_tokens(message: GPTRequestMessage) -> int:
+        return count_message_tokens(encoding, message)
+
+    fixed_tokens = count_tools_tokens(encoding, tools) + sum(count_tokens(message) for message in trailing_messages)
+    if system_message:
+        fixed_tokens += count_tokens(GPTRequestTextMessage(role="system", content=system_message))
+
+    budget = get_gpt_mode_config(gpt_mode).max_tokens - EXTRA_BUFFER_FOR_ENCODING_OVERHEAD - min_tokens - fixed_tokens
+
+    return [
+        *fit_message_groups(convert_message_groups(chat), budget, count_tokens),
+        *trailing_messages,
+    ]
@@ -72,12 +72,18 @@ def convert_message(group: AICMessageGroup, message: AICMessage) -> list[GPTRequ
     return result
 
 
-def convert_messages(chat: Chat) -> list[GPTRequestMessage]:
+def convert_message_groups(chat: Chat) -> list[tuple[AICMessageGroup, list[GPTRequestMessage]]]:
+    """
+    Converts the chat into GPT messages, keeping track of which message group each of them came from.
+    """
+
     last_system_message = None
 
-    messages: list[GPTRequestMessage] = []
+    converted_groups: list[tuple[AICMessageGroup, list[GPTRequestMessage]]] = []
 
     for message_group in chat.message_groups:
+        messages: list[GPTRequestMessage] = []
+
         is_last_group = message_group == chat.message_groups[-1]
         if message_group.task:
             # Augment the messages with system messages with meta data about which agent is speaking and what materials were available
@@ -102,7 +108,13 @@ As a director I have assigned you ({message_group.actor_id.id}) and given you ac
         for message in message_group.messages:
             messages.extend(convert_message(message_group, message))
 
+        converted_groups.append((message_group, messages))
+
         if is_last_group:
             break
 
-    return messages
+    return converted_groups
+
+
+def convert_messages(chat: Chat) -> list[GPTRequestMessage]:
+    return [message for _, messages in convert_message_groups(chat) for message in messages]
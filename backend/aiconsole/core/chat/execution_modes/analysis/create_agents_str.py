@@ -14,16 +14,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import random
-
 from aiconsole.core.chat.execution_modes.analysis.agents_to_choose_from import (
     agents_to_choose_from,
 )
+from aiconsole.core.chat.execution_modes.analysis.order_for_prompt import (
+    order_for_prompt,
+)
 
 
-def create_agents_str(agent_id) -> str:
+def create_agents_str(agent_id, chat_id: str) -> str:
     """
-    Randomization of agents is done because LLMs have a tendency to overfit to the first few examples.
+    Ordering of agents is done because LLMs have a tendency to overfit to the first few examples, see order_for_prompt.
     """
 
     # Forced agents if available or enabled agents otherwise
@@ -33,8 +34,8 @@ def create_agents_str(agent_id) -> str:
         possible_agent_choices = agents_to_choose_from()
 
     new_line = "\n"
-    random_agents = new_line.join(
-        [f"* {c.id} - {c.usage}" for c in random.sample(possible_agent_choices, len(possible_agent_choices))]
+    ordered_agents = new_line.join(
+        [f"* {c.id} - {c.usage}" for c in order_for_prompt(possible_agent_choices, chat_id)]
     )
 
-    return random_agents
+    return ordered_agents
@@ -14,33 +14,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import random
+from aiconsole.core.assets.materials.material import Material
+from aiconsole.core.chat.execution_modes.analysis.order_for_prompt import (
+    order_for_prompt,
+)
 
-from aiconsole.core.assets.types import AssetStatus
-from aiconsole.core.project import project
 
-
-def create_materials_str(materials_ids: list | None, let_ai_add_extra_materials: bool) -> str:
+def create_materials_str(available_materials: list[Material], chat_id: str) -> str:
     new_line = "\n"
 
-    # We add forced becuase it may influence the choice of enabled materials
-    available_materials = []
-    if materials_ids:
-        for material in project.get_project_materials()._assets.values():
-            if material[0].id in materials_ids:
-                available_materials.append(material[0])
-
-    if let_ai_add_extra_materials:
-        available_materials = [
-            *available_materials,
-            *project.get_project_materials().assets_with_status(AssetStatus.FORCED),
-            *project.get_project_materials().assets_with_status(AssetStatus.ENABLED),
-        ]
-
-    random_materials = (
-        new_line.join([f"* {c.id} - {c.usage}" for c in random.sample(available_materials, len(available_materials))])
+    ordered_materials = (
+        new_line.join([f"* {c.id} - {c.usage}" for c in order_for_prompt(available_materials, chat_id)])
         if available_materials
         else ""
     )
 
-    return random_materials
+    return ordered_materials
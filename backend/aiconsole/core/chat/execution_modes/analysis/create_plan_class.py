@@ -14,14 +14,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import random
-
 from pydantic import Field
 
+from aiconsole.core.chat.execution_modes.analysis.order_for_prompt import (
+    order_for_prompt,
+)
 from aiconsole.core.gpt.function_calls import OpenAISchema
 
 
-def create_plan_class(available_agents, available_materials):
+def create_plan_class(available_agents, available_materials, chat_id: str):
     class Plan(OpenAISchema):
         """
         Plan what should happen next.
@@ -52,7 +53,7 @@ def create_plan_class(available_agents, available_materials):
 
         agent_id: str = Field(
             description="Chosen agent to perform the next step.",
-            json_schema_extra={"enum": [s.id for s in random.sample(available_agents, len(available_agents))]},
+            json_schema_extra={"enum": [s.id for s in order_for_prompt(available_agents, chat_id)]},
         )
 
         relevant_material_ids: list[str] = Field(
@@ -60,7 +61,7 @@ def create_plan_class(available_agents, available_materials):
             description="Chosen material ids relevant for the task",
             json_schema_extra={
                 "items": {
-                    "enum": [k.id for k in random.sample(available_materials, len(available_materials))],
+                    "enum": [k.id for k in order_for_prompt(available_materials, chat_id)],
                     "type": "string",
                 }
             },
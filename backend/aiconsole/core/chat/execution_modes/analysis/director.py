@@ -23,6 +23,12 @@ from aiconsole.core.chat.execution_modes.analysis.create_materials_str import (
 from aiconsole.core.chat.execution_modes.analysis.gpt_analysis_function_step import (
     gpt_analysis_function_step,
 )
+from aiconsole.core.chat.execution_modes.analysis.materials_to_choose_from import (
+    materials_to_choose_from,
+)
+from aiconsole.core.chat.execution_modes.analysis.speculative_material_renderer import (
+    SpeculativeMaterialRenderer,
+)
 from aiconsole.core.gpt.consts import ANALYSIS_GPT_MODE
 
 INITIAL_SYSTEM_PROMPT = """
@@ -100,22 +106,17 @@ Now analyse the chat.
 """.strip()
 
 
-async def director_analyse(chat_mutator: ChatMutator, message_group_id: str):
-    initial_system_prompt = INITIAL_SYSTEM_PROMPT.format(
-        agents=create_agents_str(agent_id=chat_mutator.chat.chat_options.agent_id),
-        materials=create_materials_str(
-            materials_ids=chat_mutator.chat.chat_options.materials_ids,
-            let_ai_add_extra_materials=chat_mutator.chat.chat_options.let_ai_add_extra_materials,
-        ),
-    )
+async def director_analyse(
+    chat_mutator: ChatMutator,
+    message_group_id: str,
+    material_renderer: SpeculativeMaterialRenderer | None = None,
+):
+    agents = create_agents_str(agent_id=chat_mutator.chat.chat_options.agent_id, chat_id=chat_mutator.chat.id)
+    available_materials = materials_to_choose_from(chat_mutator.chat)
+    materials = create_materials_str(available_materials=available_materials, chat_id=chat_mutator.chat.id)
 
-    last_system_prompt = LAST_SYSTEM_PROMPT.format(
-        agents=create_agents_str(agent_id=chat_mutator.chat.chat_options.agent_id),
-        materials=create_materials_str(
-            materials_ids=chat_mutator.chat.chat_options.materials_ids,
-            let_ai_add_extra_materials=chat_mutator.chat.chat_options.let_ai_add_extra_materials,
-        ),
-    )
+    initial_system_prompt = INITIAL_SYSTEM_PROMPT.format(agents=agents, materials=materials)
+    last_system_prompt = LAST_SYSTEM_PROMPT.format(agents=agents, materials=materials)
 
     return await gpt_analysis_function_step(
         message_group_id=message_group_id,
@@ -124,4 +125,6 @@ async def director_analyse(chat_mutator: ChatMutator, message_group_id: str):
         initial_system_prompt=initial_system_prompt,
         last_system_prompt=last_system_prompt,
         force_call=True,
+        available_materials=available_materials,
+        material_renderer=material_renderer,
     )
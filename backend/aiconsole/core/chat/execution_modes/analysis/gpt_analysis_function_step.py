@@ -30,13 +30,19 @@ from aiconsole.core.chat.chat_mutations import (
     SetTaskMessageGroupMutation,
 )
 from aiconsole.core.chat.chat_mutator import ChatMutator
-from aiconsole.core.chat.convert_messages import convert_messages
+from aiconsole.core.chat.compact_messages import compact_messages
 from aiconsole.core.chat.execution_modes.analysis.agents_to_choose_from import (
     agents_to_choose_from,
 )
 from aiconsole.core.chat.execution_modes.analysis.create_plan_class import (
     create_plan_class,
 )
+from aiconsole.core.chat.execution_modes.analysis.materials_to_choose_from import (
+    materials_to_choose_from,
+)
+from aiconsole.core.chat.execution_modes.analysis.speculative_material_renderer import (
+    SpeculativeMaterialRenderer,
+)
 from aiconsole.core.chat.types import Chat
 from aiconsole.core.gpt.consts import GPTMode
 from aiconsole.core.gpt.gpt_executor import GPTExecutor
@@ -91,20 +97,52 @@ def pick_agent(arguments, chat: Chat, available_agents: list[AICAgent]) -> AICAg
 
 
 def _get_relevant_materials(relevant_material_ids: list[str]) -> list[Material]:
+    """
+    Forced materials first, then the ones chosen by the director in the order of their importance,
+    materials that do not fit the budget of the agent are dropped from the end.
+    """
+
+    enabled_materials = {
+        material.id: cast(Material, material)
+        for material in project.get_project_materials().assets_with_status(AssetStatus.ENABLED)
+    }
+
     # Maximum of 5 materials
     relevant_materials = [
-        cast(Material, k)
-        for k in project.get_project_materials().assets_with_status(AssetStatus.ENABLED)
-        if k.id in relevant_material_ids
+        enabled_materials[material_id]
+        for material_id in dict.fromkeys(relevant_material_ids)
+        if material_id in enabled_materials
     ][:5]
 
-    relevant_materials += cast(
-        list[Material],
-        project.get_project_materials().assets_with_status(AssetStatus.FORCED),
+    return [
+        *cast(list[Material], project.get_project_materials().assets_with_status(AssetStatus.FORCED)),
+        *relevant_materials,
+    ]
+
+
+def _speculate_materials(
+    material_renderer: SpeculativeMaterialRenderer,
+    chat: Chat,
+    arguments_dict: dict,
+    available_agents: list[AICAgent],
+    available_materials: list[Material],
+):
+    agent = next((agent for agent in available_agents if agent.id == arguments_dict["agent_id"]), None)
+
+    # Partially parsed ids might be incomplete, only exact matches are rendered
+    material_ids = arguments_dict["relevant_material_ids"]
+    if not agent or not isinstance(material_ids, list):
+        return
+
+    material_renderer.speculate(
+        chat,
+        agent,
+        [
+            *(material for material in available_materials if material.id in material_ids),
+            *project.get_project_materials().assets_with_status(AssetStatus.FORCED),
+        ],
     )
 
-    return relevant_materials
-
 
 @dataclass
 class AnalysisResult:
@@ -121,6 +159,8 @@ async def gpt_analysis_function_step(
     initial_system_prompt: str,
     last_system_prompt: str,
     force_call: bool,
+    available_materials: list[Material] | None = None,
+    material_renderer: SpeculativeMaterialRenderer | None = None,
 ) -> AnalysisResult:
     gpt_executor = GPTExecutor()
 
@@ -134,19 +174,15 @@ async def gpt_analysis_function_step(
     if len(possible_agent_choices) == 0:
         raise ValueError("No active agents")
 
-    available_materials = []
-    forced_materials = []
-    if chat_mutator.chat.chat_options.materials_ids:
-        for material in project.get_project_materials()._assets.values():
-            if material[0].id in chat_mutator.chat.chat_options.materials_ids:
-                forced_materials.append(material[0])
+    # The director prompt lists the same materials, so the choice is limited to them
+    if available_materials is None:
+        available_materials = materials_to_choose_from(chat_mutator.chat)
 
-    if chat_mutator.chat.chat_options.let_ai_add_extra_materials:
-        available_materials = [
-            *forced_materials,
-            *project.get_project_materials().assets_with_status(AssetStatus.FORCED),
-            *project.get_project_materials().assets_with_status(AssetStatus.ENABLED),
-        ]
+    forced_materials = [
+        material
+        for material in project.get_project_materials().all_assets()
+        if chat_mutator.chat.chat_options.materials_ids and material.id in chat_mutator.chat.chat_options.materials_ids
+    ]
 
     plan_class = create_plan_class(
         [
@@ -162,24 +198,32 @@ async def gpt_analysis_function_step(
             *possible_agent_choices,
         ],
         available_materials,
+        chat_mutator.chat.id,
     )
 
+    tools = [
+        ToolDefinition(
+            type="function",
+            function=ToolFunctionDefinition(**plan_class.openai_schema()),
+        )
+    ]
+
     request = GPTRequest(
         system_message=initial_system_prompt,
         gpt_mode=gpt_mode,
-        messages=[
-            *convert_messages(chat_mutator.chat),
-            GPTRequestTextMessage(role="system", content=last_system_prompt),
-        ],
-        tools=[
-            ToolDefinition(
-                type="function",
-                function=ToolFunctionDefinition(**plan_class.openai_schema()),
-            )
-        ],
+        messages=compact_messages(
+            chat_mutator.chat,
+            gpt_mode=gpt_mode,
+            system_message=initial_system_prompt,
+            tools=tools,
+            trailing_messages=[GPTRequestTextMessage(role="system", content=last_system_prompt)],
+            min_tokens=DIRECTOR_MIN_TOKENS,
+        ),
+        tools=tools,
         presence_penalty=2,
         min_tokens=DIRECTOR_MIN_TOKENS,
         preferred_tokens=DIRECTOR_PREFERRED_TOKENS,
+        agent_id="director",
     )
 
     if force_call:
@@ -227,6 +271,15 @@ async def gpt_analysis_function_step(
                                 )
                             )
 
+                            if material_renderer and "agent_id" in arguments_dict:
+                                _speculate_materials(
+                                    material_renderer,
+                                    chat_mutator.chat,
+                                    arguments_dict,
+                                    possible_agent_choices,
+                                    available_materials,
+                                )
+
                         if "next_step" in arguments_dict:
                             await chat_mutator.mutate(
                                 SetTaskMessageGroupMutation(
@@ -287,7 +340,9 @@ async def gpt_analysis_function_step(
         await chat_mutator.mutate(
             SetMaterialsIdsMessageGroupMutation(
                 message_group_id=message_group_id,
-                materials_ids=[material.id for material in set(relevant_materials).union(forced_materials)],
+                materials_ids=list(
+                    dict.fromkeys(material.id for material in [*relevant_materials, *forced_materials])
+                ),
             )
         )
 
@@ -0,0 +1,69 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import cast
+
+from aiconsole.core.assets.materials.material import Material
+from aiconsole.core.assets.materials.material_search_index import material_search_index
+from aiconsole.core.assets.types import AssetStatus
+from aiconsole.core.chat.types import Chat
+from aiconsole.core.project import project
+from aiconsole.core.settings.settings import settings
+
+# Only the end of the conversation is used to find relevant materials
+QUERY_MESSAGE_GROUPS = 3
+MAX_QUERY_CHARS = 4000
+
+
+def conversation_query(chat: Chat) -> str:
+    parts = []
+    for group in chat.message_groups[-QUERY_MESSAGE_GROUPS:]:
+        parts.append(group.task)
+        parts.extend(message.content for message in group.messages)
+
+    return "\n".join(part for part in parts if part)[-MAX_QUERY_CHARS:]
+
+
+def materials_to_choose_from(chat: Chat) -> list[Material]:
+    """
+    Materials the director can pick from: the ones selected for the chat, the forced ones and, if the AI can add
+    materials, the enabled ones most relevant to the conversation, up to the configured number.
+    """
+
+    project_materials = project.get_project_materials()
+    chat_options = chat.chat_options
+
+    materials = [
+        cast(Material, material)
+        for material in project_materials.all_assets()
+        if chat_options.materials_ids and material.id in chat_options.materials_ids
+    ]
+
+    if chat_options.let_ai_add_extra_materials:
+        enabled_materials = cast(list[Material], project_materials.assets_with_status(AssetStatus.ENABLED))
+
+        max_candidates = settings().unified_settings.director_material_candidates
+        if max_candidates:
+            enabled_materials = material_search_index().top_k(
+                enabled_materials, conversation_query(chat), max_candidates
+            )
+
+        materials += [
+            *cast(list[Material], project_materials.assets_with_status(AssetStatus.FORCED)),
+            *enabled_materials,
+        ]
+
+    return list({material.id: material for material in materials}.values())
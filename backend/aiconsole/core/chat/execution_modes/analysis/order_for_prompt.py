@@ -0,0 +1,45 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+from typing import TypeVar
+
+from aiconsole.core.assets.types import Asset
+from aiconsole.core.gpt.consts import PromptOrdering
+from aiconsole.core.settings.settings import settings
+
+AssetT = TypeVar("AssetT", bound=Asset)
+
+
+def order_for_prompt(assets: list[AssetT], chat_id: str) -> list[AssetT]:
+    """
+    Orders agents and materials listed in the director prompts.
+
+    Shuffling is done because LLMs have a tendency to overfit to the first few examples, but a shuffle that differs
+    on every call changes the prompt prefix and defeats prompt caching, so by default it is seeded per chat.
+    """
+
+    ordering = settings().unified_settings.prompt_ordering
+
+    if ordering == PromptOrdering.RANDOM:
+        return random.sample(assets, len(assets))
+
+    ordered_assets = sorted(assets, key=lambda asset: asset.id)
+
+    if ordering == PromptOrdering.SEEDED:
+        random.Random(chat_id).shuffle(ordered_assets)
+
+    return ordered_assets
@@ -0,0 +1,99 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+
+from aiconsole.core.assets.agents.agent import AICAgent
+from aiconsole.core.assets.materials.content_evaluation_context import (
+    ContentEvaluationContext,
+)
+from aiconsole.core.assets.materials.material import Material, MaterialContentType
+from aiconsole.core.assets.materials.render_materials_concurrently import (
+    MaterialRenderTimeoutError,
+    render_material,
+    render_materials_concurrently,
+)
+from aiconsole.core.assets.materials.rendered_material import RenderedMaterial
+from aiconsole.core.chat.types import Chat
+
+_log = logging.getLogger(__name__)
+
+
+class SpeculativeMaterialRenderer:
+    """
+    Starts rendering materials as soon as the director mentions them, while the analysis is still streaming.
+
+    Only materials whose content does not depend on the evaluation context (static text and API) are rendered
+    speculatively, dynamic materials are rendered once the final context is known.
+    """
+
+    def __init__(self):
+        self._tasks: dict[str, asyncio.Task[RenderedMaterial | None]] = {}
+
+    def speculate(self, chat: Chat, agent: AICAgent, materials: list[Material]):
+        context = ContentEvaluationContext(
+            chat=chat,
+            agent=agent,
+            gpt_mode=agent.gpt_mode,
+            relevant_materials=materials,
+        )
+
+        for material in materials:
+            if material.id in self._tasks or material.content_type == MaterialContentType.DYNAMIC_TEXT:
+                continue
+
+            _log.debug(f"Speculatively rendering material {material.id}")
+            self._tasks[material.id] = asyncio.create_task(self._render(material, context))
+
+    async def _render(self, material: Material, context: ContentEvaluationContext) -> RenderedMaterial | None:
+        try:
+            return await render_material(material, context)
+        except MaterialRenderTimeoutError:
+            # A hung material would most likely hang again, there is no point in waiting for it twice
+            raise
+        except Exception:
+            # Rendered again with the final context, so the error is reported only if the material is really used
+            return None
+
+    async def _get_or_render(self, material: Material, context: ContentEvaluationContext) -> RenderedMaterial:
+        task = self._tasks.pop(material.id, None)
+
+        if task:
+            rendered_material = await task
+            if rendered_material is not None:
+                return rendered_material
+
+        return await render_material(material, context)
+
+    async def render(self, context: ContentEvaluationContext) -> list[RenderedMaterial]:
+        """
+        Renders the relevant materials of the context concurrently, reusing speculative results, keeps the order.
+        """
+
+        try:
+            return await render_materials_concurrently(context.relevant_materials, context, self._get_or_render)
+        finally:
+            self.cancel()
+
+    def cancel(self):
+        for task in self._tasks.values():
+            if task.done() and not task.cancelled():
+                # Retrieve the exception of a failed speculation, so it is not logged as never retrieved
+                task.exception()
+            task.cancel()
+
+        self._tasks.clear()
@@ -32,6 +32,9 @@ from aiconsole.core.chat.chat_mutations import (
 )
 from aiconsole.core.chat.chat_mutator import ChatMutator
 from aiconsole.core.chat.execution_modes.analysis.director import director_analyse
+from aiconsole.core.chat.execution_modes.analysis.speculative_material_renderer import (
+    SpeculativeMaterialRenderer,
+)
 from aiconsole.core.chat.execution_modes.execution_mode import ExecutionMode
 from aiconsole.core.chat.execution_modes.utils.import_and_validate_execution_mode import (
     import_and_validate_execution_mode,
@@ -71,7 +74,13 @@ async def _execution_mode_process(
             await chat_mutator.mutate(DeleteMessageGroupMutation(message_group_id=last_message_group.id))
             return
 
-    analysis = await director_analyse(chat_mutator, last_message_group.id)
+    material_renderer = SpeculativeMaterialRenderer()
+
+    try:
+        analysis = await director_analyse(chat_mutator, last_message_group.id, material_renderer)
+    except BaseException:
+        material_renderer.cancel()
+        raise
 
     if analysis.agent.id != "user" and analysis.next_step:
         content_context = ContentEvaluationContext(
@@ -81,9 +90,7 @@ async def _execution_mode_process(
             relevant_materials=analysis.relevant_materials,
         )
 
-        rendered_materials = [
-            await material.render(content_context) for material in content_context.relevant_materials
-        ]
+        rendered_materials = await material_renderer.render(content_context)
 
         execution_mode = await import_and_validate_execution_mode(analysis.agent, chat_mutator.chat.id)
 
@@ -122,6 +129,8 @@ async def _execution_mode_process(
                 rendered_materials=[],
             )
     else:
+        material_renderer.cancel()
+
         # Delete the current message group
         await chat_mutator.mutate(DeleteMessageGroupMutation(message_group_id=last_message_group.id))
 
@@ -36,7 +36,7 @@ from aiconsole.core.code_running.code_interpreters.base_code_interpreter import
     CodeExecutionError,
 )
 from aiconsole.core.code_running.run_code import (
-    get_code_interpreter,
+    reset_code_interpreters,
     run_in_code_interpreter,
 )
 
@@ -116,7 +116,7 @@ async def _execution_mode_process(
         except CodeExecutionError:
             pass
         except asyncio.CancelledError:
-            (await get_code_interpreter("python", chat_mutator.chat.id)).terminate()
+            await reset_code_interpreters(chat_mutator.chat.id)
             raise
     except Exception as e:
         await connection_manager().send_to_chat(ErrorServerMessage(error=str(e)), chat_mutator.chat.id)
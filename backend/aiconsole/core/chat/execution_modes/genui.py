@@ -30,6 +30,7 @@ from aiconsole.core.chat.execution_modes.utils.generate_response_message_with_co
 from aiconsole.core.chat.execution_modes.utils.get_agent_system_message import (
     get_agent_system_message,
 )
+from aiconsole.core.chat.execution_modes.utils.pack_materials import pack_materials
 from aiconsole.core.gpt.create_full_prompt_with_materials import (
     create_full_prompt_with_materials,
 )
@@ -78,7 +79,7 @@ async def _execution_mode_process(
 ):
     system_message = create_full_prompt_with_materials(
         intro=get_agent_system_message(agent),
-        materials=rendered_materials,
+        materials=await pack_materials(chat_mutator, agent, rendered_materials),
     )
 
     await show_prototype_warning(chat_mutator)
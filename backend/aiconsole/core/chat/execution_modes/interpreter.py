@@ -28,6 +28,7 @@ from aiconsole.core.chat.execution_modes.utils.generate_response_message_with_co
 from aiconsole.core.chat.execution_modes.utils.get_agent_system_message import (
     get_agent_system_message,
 )
+from aiconsole.core.chat.execution_modes.utils.pack_materials import pack_materials
 from aiconsole.core.chat.execution_modes.utils.run_code import run_code
 from aiconsole.core.chat.types import AICToolCallLocation
 from aiconsole.core.gpt.create_full_prompt_with_materials import (
@@ -80,7 +81,7 @@ async def _execution_mode_process(
 
     system_message = create_full_prompt_with_materials(
         intro=get_agent_system_message(agent),
-        materials=rendered_materials,
+        materials=await pack_materials(chat_mutator, agent, rendered_materials),
     )
 
     await generate_response_message_with_code(chat_mutator, agent, system_message, [python_tool, applescript_tool])
@@ -26,6 +26,7 @@ from aiconsole.core.chat.execution_modes.utils.generate_response_message_with_co
 from aiconsole.core.chat.execution_modes.utils.get_agent_system_message import (
     get_agent_system_message,
 )
+from aiconsole.core.chat.execution_modes.utils.pack_materials import pack_materials
 from aiconsole.core.gpt.create_full_prompt_with_materials import (
     create_full_prompt_with_materials,
 )
@@ -46,7 +47,7 @@ async def _execution_mode_process(
         agent,
         system_message=create_full_prompt_with_materials(
             intro=get_agent_system_message(agent),
-            materials=rendered_materials or rendered_materials,
+            materials=await pack_materials(chat_mutator, agent, rendered_materials),
         ),
         language_classes=[],
     )
@@ -15,7 +15,7 @@ from aiconsole.core.chat.chat_mutations import (
     SetIsStreamingToolCallMutation,
 )
 from aiconsole.core.chat.chat_mutator import ChatMutator
-from aiconsole.core.chat.convert_messages import convert_messages
+from aiconsole.core.chat.compact_messages import compact_messages
 from aiconsole.core.chat.execution_modes.utils.send_code import send_code
 from aiconsole.core.gpt.function_calls import OpenAISchema
 from aiconsole.core.gpt.gpt_executor import GPTExecutor
@@ -29,6 +29,9 @@ from aiconsole.core.gpt.types import (
 
 _log = logging.getLogger(__name__)
 
+# Tokens the response needs at least, the chat is compacted to leave room for them
+MIN_RESPONSE_TOKENS = 250
+
 
 async def generate_response_message_with_code(
     chat_mutator: ChatMutator,
@@ -68,21 +71,29 @@ async def generate_response_message_with_code(
                 if message.requested_format:
                     all_requested_formats.append(message.requested_format)
 
+        tools = [
+            *[
+                ToolDefinition(
+                    type="function",
+                    function=ToolFunctionDefinition(**language_cls.openai_schema()),
+                )
+                for language_cls in language_classes
+            ],
+            *all_requested_formats,
+        ]
+
         async for chunk_or_clear in executor.execute(
             GPTRequest(
                 system_message=system_message,
                 gpt_mode=agent.gpt_mode,
-                messages=[message for message in convert_messages(chat_mutator.chat)],
-                tools=[
-                    *[
-                        ToolDefinition(
-                            type="function",
-                            function=ToolFunctionDefinition(**language_cls.openai_schema()),
-                        )
-                        for language_cls in language_classes
-                    ],
-                    *all_requested_formats,
-                ],
+                messages=compact_messages(
+                    chat_mutator.chat,
+                    gpt_mode=agent.gpt_mode,
+                    system_message=system_message,
+                    tools=tools,
+                    min_tokens=MIN_RESPONSE_TOKENS,
+                ),
+                tools=tools,
                 tool_choice=(
                     EnforcedFunctionCall(
                         type="function", function=EnforcedFunctionCallFuncSpec(name=enforced_language.__name__)
@@ -90,9 +101,10 @@ async def generate_response_message_with_code(
                     if enforced_language
                     else None
                 ),
-                min_tokens=250,
+                min_tokens=MIN_RESPONSE_TOKENS,
                 preferred_tokens=2000,
                 temperature=0.2,
+                agent_id=agent.id,
             )
         ):
 
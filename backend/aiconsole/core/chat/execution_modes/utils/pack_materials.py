@@ -0,0 +1,118 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from dataclasses import dataclass, field
+
+import tiktoken
+
+from aiconsole.core.assets.agents.agent import AICAgent
+from aiconsole.core.assets.materials.rendered_material import RenderedMaterial
+from aiconsole.core.chat.chat_mutations import SetMaterialsPackingMessageGroupMutation
+from aiconsole.core.chat.chat_mutator import ChatMutator
+from aiconsole.core.gpt.request import get_encoding, get_gpt_mode_config
+
+_log = logging.getLogger(__name__)
+
+# Share of the model context that materials can take, unless the agent sets its own budget
+MATERIALS_CONTEXT_SHARE = 0.5
+
+# Truncating a material to fewer tokens than this is not worth it, it is dropped instead
+MIN_TRUNCATED_MATERIAL_TOKENS = 200
+
+# Accounts for the separator between sections of the system message
+SECTION_SEPARATOR_TOKENS = 2
+
+TRUNCATION_NOTICE = "\n\n[... truncated to fit the context window]"
+
+
+@dataclass
+class PackedMaterials:
+    rendered_materials: list[RenderedMaterial] = field(default_factory=list)
+    dropped_materials_ids: list[str] = field(default_factory=list)
+    truncated_materials_ids: list[str] = field(default_factory=list)
+
+
+def fit_materials(rendered_materials: list[RenderedMaterial], budget: int, encoding: tiktoken.Encoding):
+    """
+    Picks materials in the given order (most important first) that fit in the remaining budget.
+    A material that does not fit is truncated if enough of it fits, which uses up the budget, and dropped
+    otherwise, in which case later smaller materials can still be picked.
+    """
+
+    packed = PackedMaterials()
+    remaining_tokens = budget
+    notice_tokens = len(encoding.encode(TRUNCATION_NOTICE))
+
+    for rendered_material in rendered_materials:
+        tokens = encoding.encode(rendered_material.content)
+        material_tokens = len(tokens) + SECTION_SEPARATOR_TOKENS
+
+        if material_tokens <= remaining_tokens:
+            packed.rendered_materials.append(rendered_material)
+            remaining_tokens -= material_tokens
+            continue
+
+        tokens_to_keep = remaining_tokens - SECTION_SEPARATOR_TOKENS - notice_tokens
+        if tokens_to_keep >= MIN_TRUNCATED_MATERIAL_TOKENS:
+            content = encoding.decode(tokens[:tokens_to_keep]) + TRUNCATION_NOTICE
+            packed.rendered_materials.append(rendered_material.model_copy(update={"content": content}))
+            packed.truncated_materials_ids.append(rendered_material.id)
+            remaining_tokens = 0
+            continue
+
+        packed.dropped_materials_ids.append(rendered_material.id)
+
+    return packed
+
+
+def materials_budget(agent: AICAgent) -> int:
+    if agent.materials_max_tokens is not None:
+        return agent.materials_max_tokens
+
+    return int(get_gpt_mode_config(agent.gpt_mode).max_tokens * MATERIALS_CONTEXT_SHARE)
+
+
+async def pack_materials(
+    chat_mutator: ChatMutator, agent: AICAgent, rendered_materials: list[RenderedMaterial]
+) -> list[RenderedMaterial]:
+    """
+    Fits the rendered materials into the materials budget of the agent,
+    dropped and truncated materials are recorded on the last message group.
+    """
+
+    packed = fit_materials(rendered_materials, materials_budget(agent), get_encoding(agent.gpt_mode))
+
+    if packed.dropped_materials_ids or packed.truncated_materials_ids:
+        _log.info(
+            f"Materials did not fit the budget of {agent.id}, "
+            f"dropped: {packed.dropped_materials_ids}, truncated: {packed.truncated_materials_ids}"
+        )
+
+    message_group = chat_mutator.chat.message_groups[-1]
+    if (
+        message_group.dropped_materials_ids != packed.dropped_materials_ids
+        or message_group.truncated_materials_ids != packed.truncated_materials_ids
+    ):
+        await chat_mutator.mutate(
+            SetMaterialsPackingMessageGroupMutation(
+                message_group_id=message_group.id,
+                dropped_materials_ids=packed.dropped_materials_ids,
+                truncated_materials_ids=packed.truncated_materials_ids,
+            )
+        )
+
+    return packed.rendered_materials
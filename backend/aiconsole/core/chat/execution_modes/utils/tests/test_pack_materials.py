@@ -0,0 +1,68 @@
+from aiconsole.core.assets.materials.rendered_material import RenderedMaterial
+from aiconsole.core.chat.execution_modes.utils.pack_materials import (
+    TRUNCATION_NOTICE,
+    fit_materials,
+)
+
+
+class WordEncoding:
+    """
+    One token per word, enough to check the packing without the tokenizer files.
+    """
+
+    def encode(self, text: str) -> list[str]:
+        return text.split(" ")
+
+    def decode(self, tokens: list[str]) -> str:
+        return " ".join(tokens)
+
+
+def create_rendered_material(id: str, words: int) -> RenderedMaterial:
+    return RenderedMaterial(id=id, content=" ".join([id] * words), error="")
+
+
+def test_materials_that_fit_are_kept_in_order():
+    materials = [create_rendered_material("a", 100), create_rendered_material("b", 100)]
+
+    packed = fit_materials(materials, 1000, WordEncoding())  # type: ignore
+
+    assert packed.rendered_materials == materials
+    assert packed.dropped_materials_ids == []
+    assert packed.truncated_materials_ids == []
+
+
+def test_first_material_over_budget_is_truncated_and_the_rest_dropped():
+    materials = [
+        create_rendered_material("a", 300),
+        create_rendered_material("b", 1000),
+        create_rendered_material("c", 50),
+    ]
+
+    packed = fit_materials(materials, 800, WordEncoding())  # type: ignore
+
+    assert [material.id for material in packed.rendered_materials] == ["a", "b"]
+    assert packed.rendered_materials[1].content.endswith(TRUNCATION_NOTICE)
+    assert packed.truncated_materials_ids == ["b"]
+    assert packed.dropped_materials_ids == ["c"]
+
+
+def test_material_is_dropped_when_too_little_of_it_would_fit():
+    materials = [create_rendered_material("a", 300), create_rendered_material("b", 1000)]
+
+    packed = fit_materials(materials, 350, WordEncoding())  # type: ignore
+
+    assert [material.id for material in packed.rendered_materials] == ["a"]
+    assert packed.dropped_materials_ids == ["b"]
+
+
+def test_smaller_materials_are_kept_after_a_dropped_one():
+    materials = [
+        create_rendered_material("a", 300),
+        create_rendered_material("b", 1000),
+        create_rendered_material("c", 30),
+    ]
+
+    packed = fit_materials(materials, 350, WordEncoding())  # type: ignore
+
+    assert [material.id for material in packed.rendered_materials] == ["a", "c"]
+    assert packed.dropped_materials_ids == ["b"]
@@ -0,0 +1,94 @@
+import json
+
+from aiconsole.core.chat.actor_id import ActorId
+from aiconsole.core.chat.compact_messages import (
+    fit_message_groups,
+    summarize_message_group,
+)
+from aiconsole.core.chat.convert_messages import convert_message_groups
+from aiconsole.core.chat.types import AICMessage, AICMessageGroup, AICToolCall, Chat
+from aiconsole.core.gpt.types import GPTRequestMessage
+
+
+def count_tokens(message: GPTRequestMessage) -> int:
+    return len(json.dumps(message.model_dump(exclude_none=True)))
+
+
+def create_chat(groups_count: int, output_size: int) -> Chat:
+    return Chat(
+        id="chat",
+        name="Chat",
+        last_modified="2024-01-01T00:00:00",
+        message_groups=[
+            AICMessageGroup(
+                id=f"group-{i}",
+                actor_id=ActorId(type="agent", id="assistant"),
+                role="assistant",
+                analysis="",
+                task="",
+                materials_ids=[],
+                messages=[
+                    AICMessage(
+                        id=f"message-{i}",
+                        timestamp="",
+                        content=f"message {i}",
+                        tool_calls=[
+                            AICToolCall(
+                                id=f"tool-{i}",
+                                language="python",
+                                code="print('x')",
+                                headline="",
+                                output="x" * output_size,
+                            )
+                        ],
+                    )
+                ],
+            )
+            for i in range(groups_count)
+        ],
+    )
+
+
+def test_should_keep_messages_when_they_fit():
+    converted_groups = convert_message_groups(create_chat(3, 10))
+    messages = [message for _, group_messages in converted_groups for message in group_messages]
+
+    assert fit_message_groups(converted_groups, 10_000, count_tokens) == messages
+
+
+def test_should_keep_recent_groups_intact_when_compacting():
+    converted_groups = convert_message_groups(create_chat(10, 5_000))
+    recent_messages = [message for _, group_messages in converted_groups[-4:] for message in group_messages]
+
+    messages = fit_message_groups(converted_groups, 25_000, count_tokens)
+
+    assert sum(count_tokens(message) for message in messages) <= 25_000
+    assert messages[-len(recent_messages) :] == recent_messages
+
+
+def test_should_summarize_old_groups_before_dropping_them():
+    converted_groups = convert_message_groups(create_chat(10, 5_000))
+
+    messages = fit_message_groups(converted_groups, 24_000, count_tokens)
+
+    assert any(message.name == "summary" for message in messages)
+
+
+def test_should_keep_director_message_of_compacted_groups():
+    chat = create_chat(10, 5_000)
+    # Later groups of the same agent and materials rely on the director message of the first one
+    chat.message_groups[0].task = "Analyze the data"
+    converted_groups = convert_message_groups(chat)
+    director_message = converted_groups[0][1][0]
+    assert director_message.role == "system"
+
+    messages = fit_message_groups(converted_groups, 15_000, count_tokens)
+
+    assert not any(message.content == "message 0" for message in messages)
+    assert messages[0] == director_message
+
+
+def test_should_cache_group_summaries():
+    [(group, messages)] = convert_message_groups(create_chat(1, 10))
+
+    assert summarize_message_group(group, messages) is summarize_message_group(group, messages)
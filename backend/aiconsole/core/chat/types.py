@@ -55,6 +55,9 @@ class AICMessageGroup(BaseModel):
     analysis: str
     task: str
     materials_ids: list[str]
+    # Materials left out of or shortened in the prompt because they did not fit the budget of the agent
+    dropped_materials_ids: list[str] = []
+    truncated_materials_ids: list[str] = []
     messages: list[AICMessage]
 
 
@@ -0,0 +1,147 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from aiconsole.core.settings.settings import settings
+from aiconsole.utils.metrics import metrics
+
+_log = logging.getLogger(__name__)
+
+
+class CodeExecutionScheduler:
+    """
+    Runs of the same interpreter (chat and language) are serialized, and at most the configured number
+    of runs execute at once across all chats (code_execution_max_concurrency setting).
+
+    When runs have to wait for a free slot, it goes to the waiting chat that was served least recently,
+    so a chat queuing many runs does not hold back the others.
+    """
+
+    def __init__(self):
+        self._interpreter_locks: dict[tuple[str, str], asyncio.Lock] = {}
+        self._running = 0
+        self._waiting: dict[str, deque[asyncio.Future]] = {}
+        self._queued: dict[str, int] = {}
+        self._served_at: dict[str, int] = {}
+        self._served = 0
+
+    @staticmethod
+    def _limit() -> int:
+        return max(1, settings().unified_settings.code_execution_max_concurrency)
+
+    @asynccontextmanager
+    async def slot(self, chat_id: str, language: str):
+        loop = asyncio.get_running_loop()
+        enqueued_at = loop.time()
+        lock = self._interpreter_locks.setdefault((chat_id, language), asyncio.Lock())
+
+        self._queued[chat_id] = self._queued.get(chat_id, 0) + 1
+        metrics().histogram("code_execution_queue_length", chat_id=chat_id).observe(self._queued[chat_id])
+
+        dequeued = False
+        try:
+            async with lock:
+                try:
+                    await self._acquire(chat_id)
+                finally:
+                    self._dequeue(chat_id)
+                    dequeued = True
+
+                metrics().histogram("code_execution_wait_seconds", chat_id=chat_id).observe(loop.time() - enqueued_at)
+
+                try:
+                    yield
+                finally:
+                    self._release()
+        finally:
+            if not dequeued:
+                self._dequeue(chat_id)
+
+    def _dequeue(self, chat_id: str):
+        self._queued[chat_id] -= 1
+        if not self._queued[chat_id]:
+            del self._queued[chat_id]
+
+    async def _acquire(self, chat_id: str):
+        if self._running < self._limit() and not self._waiting:
+            self._take_slot(chat_id)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(chat_id, deque()).append(future)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before the cancellation
+                self._release()
+            else:
+                self._remove_waiter(chat_id, future)
+            raise
+
+    def _take_slot(self, chat_id: str):
+        self._running += 1
+        self._served += 1
+        self._served_at[chat_id] = self._served
+
+    def _remove_waiter(self, chat_id: str, future: asyncio.Future):
+        waiters = self._waiting.get(chat_id)
+        if waiters is None:
+            return
+
+        if future in waiters:
+            waiters.remove(future)
+        if not waiters:
+            del self._waiting[chat_id]
+
+    def _release(self):
+        self._running -= 1
+
+        while self._running < self._limit() and self._waiting:
+            chat_id = min(self._waiting, key=lambda chat_id: self._served_at.get(chat_id, 0))
+            future = self._waiting[chat_id].popleft()
+            if not self._waiting[chat_id]:
+                del self._waiting[chat_id]
+
+            if future.done():
+                continue
+
+            self._take_slot(chat_id)
+            future.set_result(None)
+
+    def forget(self, chat_id: str):
+        """
+        Drops the state and metrics kept for a chat whose interpreters were reset.
+        """
+
+        for key in [key for key, lock in self._interpreter_locks.items() if key[0] == chat_id and not lock.locked()]:
+            del self._interpreter_locks[key]
+
+        if chat_id not in self._waiting and chat_id not in self._queued:
+            self._served_at.pop(chat_id, None)
+            metrics().remove("code_execution_queue_length", chat_id=chat_id)
+            metrics().remove("code_execution_wait_seconds", chat_id=chat_id)
+
+
+@lru_cache
+def code_execution_scheduler() -> CodeExecutionScheduler:
+    return CodeExecutionScheduler()
@@ -0,0 +1,253 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator
+
+from pydantic import BaseModel
+
+from aiconsole.api.websockets.connection_manager import connection_manager
+from aiconsole.api.websockets.server_messages import ErrorServerMessage
+from aiconsole.core.code_running.code_interpreters.base_code_interpreter import (
+    BaseCodeInterpreter,
+)
+from aiconsole.core.code_running.code_interpreters.kernel_pool import kernel_pool
+from aiconsole.core.code_running.code_interpreters.language import LanguageStr
+from aiconsole.core.code_running.code_interpreters.language_map import language_map
+from aiconsole.core.settings.settings import settings
+from aiconsole.utils.metrics import metrics
+from aiconsole.utils.process_memory import process_rss_bytes
+
+_log = logging.getLogger(__name__)
+
+# Interval of the idle and memory checks
+CHECK_INTERVAL = 30.0
+
+MB = 1024 * 1024
+
+
+@dataclass
+class _LiveInterpreter:
+    interpreter: BaseCodeInterpreter
+    started_at: float
+    last_used_at: float
+    runs: int = 0
+    running: int = 0
+
+
+class CodeInterpreterStats(BaseModel):
+    chat_id: str
+    language: str
+    pid: int | None
+    rss_bytes: int | None
+    uptime_seconds: float
+    idle_seconds: float
+    runs: int
+    running: bool
+
+
+class CodeInterpreterManager:
+    """
+    Keeps the code interpreters of chats, one per chat and language, started on first use.
+
+    Interpreters not used for code_interpreter_idle_timeout seconds are shut down, and so are the least recently
+    used ones when more than code_interpreter_max_live are alive, unless they are running code. An interpreter
+    whose process, with the processes it started, grows over code_interpreter_memory_limit_mb is killed even
+    then, and its chat is told.
+    0 disables each of the limits.
+    """
+
+    def __init__(self):
+        self._live: OrderedDict[tuple[str, str], _LiveInterpreter] = OrderedDict()
+        self._monitor_task: asyncio.Task | None = None
+
+    async def get(self, chat_id: str, language: LanguageStr) -> BaseCodeInterpreter:
+        return (await self._get_live(chat_id, language)).interpreter
+
+    @asynccontextmanager
+    async def use(self, chat_id: str, language: LanguageStr) -> AsyncIterator[BaseCodeInterpreter]:
+        """
+        Provides the interpreter for a run, it is not shut down for being idle or over the count meanwhile.
+        """
+
+        live = await self._get_live(chat_id, language)
+        live.runs += 1
+        live.running += 1
+
+        try:
+            yield live.interpreter
+        finally:
+            live.running -= 1
+            live.last_used_at = time.monotonic()
+
+    async def _get_live(self, chat_id: str, language: LanguageStr) -> _LiveInterpreter:
+        key = (chat_id, language)
+
+        if key not in self._live:
+            if language == "python":
+                interpreter = await kernel_pool().acquire()
+            else:
+                interpreter = language_map[language]()
+                await interpreter.initialize()
+
+            if key in self._live:
+                # Started concurrently for the same chat
+                await interpreter.terminate()
+            else:
+                now = time.monotonic()
+                self._live[key] = _LiveInterpreter(interpreter=interpreter, started_at=now, last_used_at=now)
+                await self._evict_least_recently_used(keep=key)
+
+            self._ensure_monitor()
+
+        live = self._live[key]
+        live.last_used_at = time.monotonic()
+        self._live.move_to_end(key)
+
+        return live
+
+    async def _evict_least_recently_used(self, keep: tuple[str, str]):
+        max_live = settings().unified_settings.code_interpreter_max_live
+        if max_live <= 0:
+            return
+
+        excess = len(self._live) - max_live
+        if excess <= 0:
+            return
+
+        evictable = [key for key, live in self._live.items() if key != keep and not live.running]
+        if len(evictable) < excess:
+            _log.warning(f"{len(self._live)} code interpreters are alive, the limit is {max_live}")
+
+        for key in evictable[:excess]:
+            await self._shut_down(key, self._live[key], "lru")
+
+    def _ensure_monitor(self):
+        task = self._monitor_task
+        # A task of a closed loop, for example after the server was restarted in tests, will never finish
+        if task is None or task.done() or task.get_loop().is_closed():
+            self._monitor_task = asyncio.create_task(self._monitor())
+
+    async def _monitor(self):
+        while self._live:
+            await asyncio.sleep(CHECK_INTERVAL)
+
+            try:
+                await self.check()
+            except Exception:
+                _log.exception("Could not check code interpreters")
+
+    async def check(self):
+        """
+        Shuts down interpreters that are idle for too long or use too much memory.
+        """
+
+        s = settings().unified_settings
+
+        for key, live in list(self._live.items()):
+            idle_seconds = time.monotonic() - live.last_used_at
+            if (
+                s.code_interpreter_idle_timeout > 0
+                and not live.running
+                and idle_seconds > s.code_interpreter_idle_timeout
+            ):
+                await self._shut_down(key, live, "idle")
+                continue
+
+            pid = live.interpreter.pid
+            if s.code_interpreter_memory_limit_mb <= 0 or pid is None:
+                continue
+
+            rss_bytes = await process_rss_bytes(pid)
+            if rss_bytes is None or rss_bytes <= s.code_interpreter_memory_limit_mb * MB:
+                continue
+
+            chat_id, language = key
+            _log.warning(f"The {language} interpreter of chat {chat_id} uses {rss_bytes // MB} MB, killing it")
+
+            if await self._shut_down(key, live, "memory"):
+                await connection_manager().send_to_chat(
+                    ErrorServerMessage(
+                        error=f"The {language} interpreter used {rss_bytes // MB} MB of memory, over the limit of "
+                        f"{s.code_interpreter_memory_limit_mb} MB, and was shut down. "
+                        "A new one is started on the next run, without the previous state."
+                    ),
+                    chat_id,
+                )
+
+    async def _shut_down(self, key: tuple[str, str], live: _LiveInterpreter, reason: str) -> bool:
+        # It may have been shut down or replaced while awaiting
+        if self._live.get(key) is not live:
+            return False
+
+        del self._live[key]
+        metrics().counter("code_interpreter_shutdowns_total", reason=reason).inc()
+
+        try:
+            await live.interpreter.terminate()
+        except Exception:
+            _log.exception(f"Could not shut down the {key[1]} interpreter of chat {key[0]}")
+
+        return True
+
+    async def reset(self, chat_id: str | None = None):
+        """
+        Shuts down the interpreters of the chat, or all of them.
+        """
+
+        await asyncio.gather(
+            *(
+                self._shut_down(key, live, "reset")
+                for key, live in list(self._live.items())
+                if chat_id is None or key[0] == chat_id
+            )
+        )
+
+    async def stats(self) -> list[CodeInterpreterStats]:
+        """
+        Stats of the live interpreters, least recently used first.
+        """
+
+        result = []
+        for (chat_id, language), live in list(self._live.items()):
+            now = time.monotonic()
+            pid = live.interpreter.pid
+
+            result.append(
+                CodeInterpreterStats(
+                    chat_id=chat_id,
+                    language=language,
+                    pid=pid,
+                    rss_bytes=await process_rss_bytes(pid) if pid is not None else None,
+                    uptime_seconds=now - live.started_at,
+                    idle_seconds=0.0 if live.running else now - live.last_used_at,
+                    runs=live.runs,
+                    running=bool(live.running),
+                )
+            )
+
+        return result
+
+
+@lru_cache
+def code_interpreter_manager() -> CodeInterpreterManager:
+    return CodeInterpreterManager()
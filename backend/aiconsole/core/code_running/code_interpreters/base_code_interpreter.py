@@ -37,9 +37,14 @@ class BaseCodeInterpreter(Protocol):
         """Raises CodeExecutionError"""
         ...
 
-    def terminate(self) -> None:  # fmt: off
+    async def terminate(self) -> None:  # fmt: off
         ...
 
+    @property
+    def pid(self) -> int | None:
+        """Id of the process running the code, None if there is none"""
+        return None
+
     def get_environment_variables(self) -> dict[str, str]:
         path = os.environ.get("PATH") or ""
 
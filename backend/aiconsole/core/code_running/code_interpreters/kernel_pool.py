@@ -0,0 +1,141 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import time
+from functools import lru_cache
+
+from aiconsole.core.code_running.code_interpreters.languages.python import Python
+from aiconsole.core.settings.settings import settings
+from aiconsole.utils.metrics import metrics
+from aiconsole_toolkit.env import get_current_project_venv_python_path
+
+_log = logging.getLogger(__name__)
+
+# Waited after a kernel failed to start, before trying to fill the pool again
+RETRY_DELAY = 30.0
+
+
+class KernelPool:
+    """
+    Keeps a number of started and initialized Python kernels on the project venv, so the first code run
+    in a chat does not wait for a kernel to start. Taken kernels are replaced in the background.
+
+    The size of the pool is the code_interpreter_kernel_pool_size setting, 0 disables it.
+    """
+
+    def __init__(self):
+        self._ready: list[tuple[str, Python]] = []
+        self._starting = 0
+        self._replenish_task: asyncio.Task | None = None
+        self._terminating: set[asyncio.Task] = set()
+
+    @staticmethod
+    def _venv_key() -> str:
+        return str(get_current_project_venv_python_path())
+
+    @staticmethod
+    def _size() -> int:
+        return max(0, settings().unified_settings.code_interpreter_kernel_pool_size)
+
+    async def acquire(self) -> Python:
+        """
+        Returns an initialized kernel, from the pool if one is ready or a newly started one otherwise.
+        """
+
+        started_at = time.perf_counter()
+        venv_key = self._venv_key()
+
+        interpreter = None
+        while self._ready:
+            key, candidate = self._ready.pop(0)
+            if key == venv_key:
+                interpreter = candidate
+                break
+
+            # Started for a venv that is no longer the current one
+            task = asyncio.create_task(candidate.terminate())
+            self._terminating.add(task)
+            task.add_done_callback(self._terminating.discard)
+
+        source = "pool" if interpreter is not None else "new"
+        if interpreter is None:
+            interpreter = Python()
+            await interpreter.initialize()
+
+        self.replenish()
+
+        metrics().histogram("kernel_acquire_seconds", source=source).observe(time.perf_counter() - started_at)
+
+        return interpreter
+
+    def replenish(self):
+        """
+        Starts kernels in the background until the pool is full, does nothing if it is already being filled.
+        """
+
+        if not self._is_replenishing():
+            self._replenish_task = asyncio.create_task(self._replenish())
+
+    def _is_replenishing(self) -> bool:
+        task = self._replenish_task
+        # A task of a closed loop, for example after the server was restarted in tests, will never finish
+        return task is not None and not task.done() and not task.get_loop().is_closed()
+
+    async def _replenish(self):
+        while len(self._ready) + self._starting < self._size():
+            venv_key = self._venv_key()
+            interpreter = Python()
+
+            self._starting += 1
+            try:
+                await interpreter.wait_for_path()
+                await interpreter.initialize()
+            except asyncio.CancelledError:
+                if hasattr(interpreter, "km"):
+                    await interpreter.terminate()
+                raise
+            except Exception:
+                _log.exception("Could not start a kernel for the pool")
+                await asyncio.sleep(RETRY_DELAY)
+                continue
+            finally:
+                self._starting -= 1
+
+            self._ready.append((venv_key, interpreter))
+            metrics().counter("kernel_pool_started_total").inc()
+
+    async def clear(self):
+        """
+        Shuts down all pooled kernels, for example when the project is closed.
+        """
+
+        replenishing = self._is_replenishing()
+        task, self._replenish_task = self._replenish_task, None
+        if replenishing:
+            assert task is not None
+            task.cancel()
+            # Kernels being started are shut down before the next project starts
+            await asyncio.gather(task, return_exceptions=True)
+
+        ready, self._ready = self._ready, []
+        await asyncio.gather(*(interpreter.terminate() for _, interpreter in ready), return_exceptions=True)
+
+
+@lru_cache
+def kernel_pool() -> KernelPool:
+    return KernelPool()
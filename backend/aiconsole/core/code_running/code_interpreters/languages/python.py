@@ -34,11 +34,11 @@
 
 import ast
 import asyncio
+import hashlib
 import logging
-import queue
 import re
-import threading
 import traceback
+from functools import lru_cache
 from typing import Any, AsyncGenerator
 
 from jupyter_client.asynchronous.client import AsyncKernelClient
@@ -67,14 +67,19 @@ async def start_new_async_kernel(
             "-f",
             "{connection_file}",
         ]
-    await km.start_kernel(**kwargs)
-    kc = km.client()
-    kc.start_channels()
     try:
-        await kc.wait_for_ready(timeout=startup_timeout)
-    except RuntimeError:
-        kc.stop_channels()
-        await km.shutdown_kernel()
+        await km.start_kernel(**kwargs)
+        kc = km.client()
+        kc.start_channels()
+        try:
+            await kc.wait_for_ready(timeout=startup_timeout)
+        except BaseException:
+            kc.stop_channels()
+            raise
+    except BaseException:
+        # Also when cancelled, for example while filling the kernel pool, so the kernel process does not leak
+        if km.has_kernel:
+            await asyncio.shield(km.shutdown_kernel(now=True))
         raise
 
     return (km, kc)
@@ -87,9 +92,9 @@ class Python(BaseCodeInterpreter):
             # executable=str(get_current_project_venv_python_path()),
             # argv=[f"{get_current_project_venv_python_path()}", "-m", "ipykernel_launcher", "-f", "{connection_file}"],
         )
-        self.listener_thread = None
-        self.finish_flag = False
         self.has_error = False
+        self.api_prelude_hash: str | None = None
+        self._reader: asyncio.Task | None = None
 
         # DISABLED because sometimes this bypasses sending it up to us for some reason!
         # Give it our same matplotlib backend
@@ -107,21 +112,37 @@ matplotlib.use('{backend}')
             pass
 
     async def terminate(self):
+        # Ends a running execution, see _execute_code
+        if self._reader is not None:
+            self._reader.cancel()
+
         self.kc.stop_channels()
         await self.km.shutdown_kernel()
 
+    @property
+    def pid(self) -> int | None:
+        # Set by the local provisioner, the one used for kernels started by the manager
+        return getattr(self.km.provisioner, "pid", None)
+
     async def run(self, code: str, materials: list[Material]) -> AsyncGenerator[str, None]:
-        self.finish_flag = False
         self.has_error = False
 
         try:
-            preprocessed_code = preprocess_python(code, materials)
-            message_queue: queue.Queue[Any] = queue.Queue()
-            self._execute_code(preprocessed_code, message_queue)
-            async for output in self._capture_output(message_queue):
+            preprocessed_code = preprocess_python(code)
+
+            # API materials are defined in the kernel once, and again only when they change
+            prelude_hash, prelude = api_prelude(materials)
+            injects_prelude = prelude_hash != self.api_prelude_hash
+            if injects_prelude and prelude:
+                preprocessed_code = f"{prelude}\n{preprocessed_code}"
+
+            async for output in self._execute_code(preprocessed_code):
                 yield output
             if self.has_error:
                 raise CodeExecutionError("Error during code execution")
+
+            if injects_prelude:
+                self.api_prelude_hash = prelude_hash
         except GeneratorExit:
             yield "Code execution stopped by user."
             raise
@@ -131,124 +152,86 @@ matplotlib.use('{backend}')
             content = traceback.format_exc()
             yield content
 
-    def _execute_code(self, code, message_queue):
-        async def iopub_message_listener():
+    async def _execute_code(self, code: str) -> AsyncGenerator[str, None]:
+        """
+        Executes the code and yields its outputs as they arrive.
+
+        Messages of the execution are read from the iopub channel by a task on the server loop and passed on
+        through an asyncio queue, so nothing polls, and the kernel is interrupted if the output is not read
+        until the end.
+        """
+
+        outputs: asyncio.Queue[str | None] = asyncio.Queue()
+        msg_id = self.kc.execute(code)
+        self._reader = reader = asyncio.create_task(self._read_iopub(msg_id, outputs))
+
+        try:
+            while (output := await outputs.get()) is not None:
+                yield output
+
+            if reader.cancelled():
+                # The kernel was shut down while running, for example for using too much memory
+                message = "The interpreter was shut down during the execution."
+                yield message
+                raise CodeExecutionError(message)
+
+            await reader
+        finally:
+            if self._reader is reader:
+                self._reader = None
+
+            if not reader.done():
+                _log.debug("Interrupting kernel.")
+                reader.cancel()
+                await self.km.interrupt_kernel()
+
+    async def _read_iopub(self, msg_id: str, outputs: "asyncio.Queue[str | None]"):
+        try:
             while True:
-                # If self.finish_flag = True, and we didn't set it (we do below), we need to stop. That's our "stop"
-                if self.finish_flag:
-                    _log.debug("Interrupting kernel.")
-                    await self.km.interrupt_kernel()
-                    return
-                try:
-                    msg = await self.kc.iopub_channel.get_msg(timeout=0.05)
-                except queue.Empty:
+                msg = await self.kc.get_iopub_msg()
+
+                # Left over from an earlier, interrupted execution
+                if msg["parent_header"].get("msg_id") != msg_id:
                     continue
 
                 _log.debug("Received message: %s", msg["content"])
 
-                if msg["header"]["msg_type"] == "status" and msg["content"]["execution_state"] == "idle":
-                    # Set finish_flag and return when the kernel becomes idle
-                    _log.debug("Kernel is idle, setting finish_flag to True.")
-                    self.finish_flag = True
+                if msg["msg_type"] == "status" and msg["content"]["execution_state"] == "idle":
+                    _log.debug("Kernel is idle, execution finished.")
                     return
 
-                content = msg["content"]
-
-                if msg["msg_type"] == "stream":
-                    line = content["text"]
-                    message_queue.put({"type": "console", "format": "output", "content": line})
-                elif msg["msg_type"] == "error":
-                    content = "\n".join(content["traceback"])
-                    # Remove color codes
-                    ansi_escape = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
-                    content = ansi_escape.sub("", content)
-                    message_queue.put(
-                        {
-                            "type": "error",
-                            "format": "output",
-                            "content": content,
-                        }
-                    )
-                    self.has_error = True
-                elif msg["msg_type"] in ["display_data", "execute_result"]:
-                    data = content["data"]
-                    if "image/png" in data:
-                        message_queue.put(
-                            {
-                                "type": "image",
-                                "format": "base64.png",
-                                "content": data["image/png"],
-                            }
-                        )
-                    elif "image/jpeg" in data:
-                        message_queue.put(
-                            {
-                                "type": "image",
-                                "format": "base64.jpeg",
-                                "content": data["image/jpeg"],
-                            }
-                        )
-                    elif "text/html" in data:
-                        message_queue.put(
-                            {
-                                "type": "code",
-                                "format": "html",
-                                "content": data["text/html"],
-                            }
-                        )
-                    elif "text/plain" in data:
-                        message_queue.put(
-                            {
-                                "type": "console",
-                                "format": "output",
-                                "content": data["text/plain"],
-                            }
-                        )
-                    elif "application/javascript" in data:
-                        message_queue.put(
-                            {
-                                "type": "code",
-                                "format": "javascript",
-                                "content": data["application/javascript"],
-                            }
-                        )
-
-        def start_async_loop(async_func):
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                loop.run_until_complete(async_func())
-            finally:
-                loop.close()
-
-        self.listener_thread = threading.Thread(target=start_async_loop, args=(iopub_message_listener,))
-        # self.listener_thread.daemon = True
-        self.listener_thread.start()
-
-        _log.debug("Listener thread is alive: %s", self.listener_thread.is_alive())
-
-        self.kc.execute(code)  # execute_interactive
-
-    async def _capture_output(self, message_queue):
-        while True:
-            if self.listener_thread:
-                try:
-                    output = message_queue.get(timeout=0.1)
-                    _log.debug("Output from queue: %s", output)
-                    if content := output.get("content", None):
-                        yield content
-                except queue.Empty:
-                    if self.finish_flag:
-                        _log.debug("Finish flag is set, stopping output capture.")
-                        break
-
-            await asyncio.sleep(0.1)
+                if output := self._output_from_message(msg):
+                    outputs.put_nowait(output)
+        finally:
+            outputs.put_nowait(None)
+
+    def _output_from_message(self, msg: dict[str, Any]) -> str | None:
+        content = msg["content"]
+
+        if msg["msg_type"] == "stream":
+            return content["text"]
+        elif msg["msg_type"] == "error":
+            self.has_error = True
+            # Remove color codes
+            ansi_escape = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+            return ansi_escape.sub("", "\n".join(content["traceback"]))
+        elif msg["msg_type"] in ["display_data", "execute_result"]:
+            data = content["data"]
+            for mime_type in ["image/png", "image/jpeg", "text/html", "text/plain", "application/javascript"]:
+                if mime_type in data:
+                    return data[mime_type]
+
+        return None
 
     def stop(self):
-        self.finish_flag = True
+        """
+        Interrupts the running code, its execution then finishes with a KeyboardInterrupt error.
+        """
+
+        asyncio.create_task(self.km.interrupt_kernel())
 
 
-def preprocess_python(code: str, materials: list[Material]):
+def preprocess_python(code: str):
     # If a line starts with "!" then it's a shell command, we need to wrap it appropriately
     code = "\n".join(
         [
@@ -282,20 +265,8 @@ def preprocess_python(code: str, materials: list[Material]):
 
         return f"print(f'''{msg_for_user}''')"
 
-    api_materials = [material for material in materials if material.content_type == "api"]
-    apis = [material.inlined_content for material in api_materials]
-
-    parsed_code = ast.parse("\n\n\n".join(apis))
-    parsed_code.body = [b for b in parsed_code.body if not isinstance(b, ast.Expr) or not isinstance(b.value, ast.Str)]
-    apis_str = ast.unparse(parsed_code)
-
-    newline = "\n"
-    api_lines = [line for line in apis_str.split(newline) if line.strip()]
-    code_lines = [line for line in code.split(newline) if line.strip()]
-
     # Indentation error windows, https://github.com/10clouds/aiconsole/issues/753
-    insert_code = newline.join((line) for line in [*api_lines, *code_lines])
-    insert_code = "\n".join(filter(bool, insert_code.split("\n")))
+    insert_code = "\n".join(line for line in code.split("\n") if line.strip())
 
     if not insert_code.strip():
         insert_code = "'No input received'"
@@ -305,3 +276,22 @@ def preprocess_python(code: str, materials: list[Material]):
 """.strip()
     _log.info("Preprocessed code: %s", code)
     return code
+
+
+def api_prelude(materials: list[Material]) -> tuple[str, str]:
+    """
+    Returns the hash of the API materials and the code defining them in the kernel,
+    the code is only prepared again when the set of API materials changes.
+    """
+
+    apis = "\n\n\n".join(material.inlined_content for material in materials if material.content_type == "api")
+    return hashlib.sha256(apis.encode()).hexdigest(), _preprocess_apis(apis)
+
+
+@lru_cache(maxsize=32)
+def _preprocess_apis(apis: str) -> str:
+    parsed_code = ast.parse(apis)
+    parsed_code.body = [b for b in parsed_code.body if not isinstance(b, ast.Expr) or not isinstance(b.value, ast.Str)]
+
+    # Indentation error windows, https://github.com/10clouds/aiconsole/issues/753
+    return "\n".join(line for line in ast.unparse(parsed_code).split("\n") if line.strip())
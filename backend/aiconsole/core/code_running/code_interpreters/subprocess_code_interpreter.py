@@ -34,10 +34,6 @@
 import asyncio
 import logging
 import platform
-import queue
-import subprocess
-import threading
-import time
 import traceback
 from typing import AsyncGenerator
 
@@ -47,13 +43,18 @@ from .base_code_interpreter import BaseCodeInterpreter
 
 _log = logging.getLogger(__name__)
 
+# Output is read in chunks and split into lines here, StreamReader.readline fails on lines over its buffer limit
+READ_CHUNK_BYTES = 64 * 1024
+
 
 class SubprocessCodeInterpreter(BaseCodeInterpreter):
     def __init__(self):
         self.start_cmd = ""
-        self.process = None
-        self.output_queue: "queue.Queue[str]" = queue.Queue()
-        self.done = threading.Event()
+        self.process: asyncio.subprocess.Process | None = None
+        # Lines of output, None marks the end of an execution
+        self.output_queue: "asyncio.Queue[str | None]" = asyncio.Queue()
+        self._open_streams = 0
+        self._readers: list[asyncio.Task] = []
 
     async def initialize(self):
         pass
@@ -73,40 +74,49 @@ class SubprocessCodeInterpreter(BaseCodeInterpreter):
         """
         return code
 
-    def terminate(self):
-        if self.process:
+    async def terminate(self):
+        if not self.process:
+            raise Exception("Process not started")
+
+        if self.process.returncode is None:
             self.process.terminate()
+            await self.process.wait()
+
+    @property
+    def pid(self) -> int | None:
+        if self.process and self.process.returncode is None:
+            return self.process.pid
+        return None
+
+    async def start_process(self):
+        if self.process and self.process.returncode is None:
+            await self.terminate()
+
+        if platform.system() == "Windows":
+            create_process = asyncio.create_subprocess_shell(self.start_cmd, **self._process_kwargs())
         else:
-            raise Exception("Process not started")
+            create_process = asyncio.create_subprocess_exec(*self.start_cmd.split(), **self._process_kwargs())
+
+        # Output of the previous process is not awaited anymore
+        self.output_queue = asyncio.Queue()
+        self.process = process = await create_process
+        self._open_streams = 2
 
-    def start_process(self):
-        if self.process:
-            self.terminate()
+        self._readers = [
+            asyncio.create_task(self.handle_stream_output(process, process.stdout, False, self.output_queue)),
+            asyncio.create_task(self.handle_stream_output(process, process.stderr, True, self.output_queue)),
+        ]
 
-        self.process = subprocess.Popen(
-            self.start_cmd.split(),
+    def _process_kwargs(self):
+        return dict(
             # TODO: add executable, care with Windows. https://docs.python.org/3/library/subprocess.html#popen-constructor
             # this does not work on windows, with and without str()
             # executable=str(repr(get_current_project_venv_python_path())),
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
             env=self.get_environment_variables(),
-            shell=True if platform.system() == "Windows" else False,
-            text=True,
-            bufsize=0,
-            universal_newlines=True,
         )
-        threading.Thread(
-            target=self.handle_stream_output,
-            args=(self.process.stdout, False),
-            daemon=True,
-        ).start()
-        threading.Thread(
-            target=self.handle_stream_output,
-            args=(self.process.stderr, True),
-            daemon=True,
-        ).start()
 
     async def run(self, code: str, materials: list[Material]) -> AsyncGenerator[str, None]:
         retry_count = 0
@@ -116,21 +126,23 @@ class SubprocessCodeInterpreter(BaseCodeInterpreter):
             await self.wait_for_path()
             code = self.preprocess_code(code, materials)
             _log.info(f"Running code:\n{code}\n---")
-            if not self.process:
-                self.start_process()
+            if not self.process or self.process.returncode is not None:
+                await self.start_process()
         except:  # noqa E722
             yield traceback.format_exc()
             return
 
         while retry_count <= max_retries:
-            self.done.clear()
+            # Drop whatever is left over from an earlier execution
+            while not self.output_queue.empty():
+                self.output_queue.get_nowait()
 
             try:
                 if not self.process or not self.process.stdin:
                     raise Exception("Process not started")
 
-                self.process.stdin.write(code + "\n")
-                self.process.stdin.flush()
+                self.process.stdin.write((code + "\n").encode("utf-8"))
+                await self.process.stdin.drain()
                 break
             except:  # noqa E722
                 if retry_count != 0:
@@ -141,48 +153,62 @@ class SubprocessCodeInterpreter(BaseCodeInterpreter):
                     yield f"Retrying... ({retry_count}/{max_retries})"
                     yield "Restarting process."
 
-                self.start_process()
+                await self.start_process()
 
                 retry_count += 1
                 if retry_count > max_retries:
                     yield "Maximum retries reached. Could not execute code.."
                     return
 
-        while True:
-            if not self.output_queue.empty():
-                yield self.output_queue.get()
-            else:
-                await asyncio.sleep(0.1)
-            try:
-                output = self.output_queue.get(timeout=0.3)  # Waits for 0.3 seconds
-                # _log.info(f"OUTPUT: {output}")
-                yield output
-            except queue.Empty:
-                # AIConsole Fix: Added proces.pool check to fix hanging
-                if self.done.is_set() or (self.process and self.process.poll() is not None):
-                    # Try to yank 3 more times from it... maybe there's something in there...
-                    # (I don't know if this actually helps. Maybe we just need to yank 1 more time)
-
-                    for _ in range(3):
-                        if not self.output_queue.empty():
-                            yield self.output_queue.get()
-                        await asyncio.sleep(0.2)
-                    break
-
-    def handle_stream_output(self, stream, is_error_stream):
-        for line in iter(stream.readline, ""):
-            _log.debug(f"Received output line:\n{line}\n---")
-
-            line = self.line_postprocessor(line)
-
-            if line is None:
-                continue  # `line = None` is the postprocessor's signal to discard completely
-
-            if self.detect_end_of_execution(line):
-                self.done.set()
-            elif is_error_stream and "KeyboardInterrupt" in line:
-                self.output_queue.put("KeyboardInterrupt")
-                time.sleep(0.1)
-                self.done.set()
-            else:
-                self.output_queue.put(line)
+        # Ends on the end of execution marker, or once both output streams are closed when the process exits
+        while (output := await self.output_queue.get()) is not None:
+            yield output
+
+    async def handle_stream_output(
+        self,
+        process: asyncio.subprocess.Process,
+        stream: asyncio.StreamReader | None,
+        is_error_stream: bool,
+        output_queue: "asyncio.Queue[str | None]",
+    ):
+        try:
+            pending = bytearray()
+            while stream and (chunk := await stream.read(READ_CHUNK_BYTES)):
+                pending += chunk
+
+                if (end := pending.rfind(b"\n")) == -1:
+                    continue
+
+                for raw_line in pending[: end + 1].splitlines(keepends=True):
+                    self._handle_line(raw_line.decode("utf-8", errors="replace"), is_error_stream, output_queue)
+                del pending[: end + 1]
+
+            if pending:
+                self._handle_line(pending.decode("utf-8", errors="replace"), is_error_stream, output_queue)
+        except Exception:
+            _log.exception("Could not read the output of the process, killing it")
+            output_queue.put_nowait(traceback.format_exc())
+            # The other stream is closed too, which ends the execution, and the process is restarted on the next run
+            if process.returncode is None:
+                process.kill()
+        finally:
+            if output_queue is self.output_queue:
+                self._open_streams -= 1
+                if not self._open_streams:
+                    output_queue.put_nowait(None)
+
+    def _handle_line(self, line: str, is_error_stream: bool, output_queue: "asyncio.Queue[str | None]"):
+        _log.debug(f"Received output line:\n{line}\n---")
+
+        line = self.line_postprocessor(line)
+
+        if line is None:
+            return  # `line = None` is the postprocessor's signal to discard completely
+
+        if self.detect_end_of_execution(line):
+            output_queue.put_nowait(None)
+        elif is_error_stream and "KeyboardInterrupt" in line:
+            output_queue.put_nowait("KeyboardInterrupt")
+            output_queue.put_nowait(None)
+        else:
+            output_queue.put_nowait(line)
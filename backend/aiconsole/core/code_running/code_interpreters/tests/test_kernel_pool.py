@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from aiconsole.core.code_running.code_interpreters import (
+    kernel_pool as kernel_pool_module,
+)
+from aiconsole.core.code_running.code_interpreters.kernel_pool import KernelPool
+from aiconsole.core.code_running.code_interpreters.languages import (
+    python as python_module,
+)
+from aiconsole.utils.metrics import metrics
+
+STARTUP_SECONDS = 0.2
+
+
+class FakePython:
+    started = 0
+    terminated = 0
+
+    async def wait_for_path(self):
+        pass
+
+    async def initialize(self):
+        await asyncio.sleep(STARTUP_SECONDS)
+        self.km = object()
+        FakePython.started += 1
+
+    async def terminate(self):
+        FakePython.terminated += 1
+
+
+@pytest.fixture
+def pool(monkeypatch: pytest.MonkeyPatch):
+    FakePython.started = FakePython.terminated = 0
+    monkeypatch.setattr(kernel_pool_module, "Python", FakePython)
+    monkeypatch.setattr(KernelPool, "_size", staticmethod(lambda: 2))
+    monkeypatch.setattr(KernelPool, "_venv_key", staticmethod(lambda: "venv"))
+    metrics().reset()
+
+    return KernelPool()
+
+
+def test_kernels_are_taken_from_the_pool(pool: KernelPool):
+    async def scenario():
+        pool.replenish()
+        await asyncio.sleep(STARTUP_SECONDS * 3)
+
+        started_at = asyncio.get_running_loop().time()
+        await pool.acquire()
+        acquire_seconds = asyncio.get_running_loop().time() - started_at
+
+        # The taken kernel is replaced in the background
+        await asyncio.sleep(STARTUP_SECONDS * 2)
+        ready = len(pool._ready)
+
+        await pool.clear()
+
+        return acquire_seconds, ready
+
+    acquire_seconds, ready = asyncio.run(scenario())
+
+    assert acquire_seconds < STARTUP_SECONDS / 2
+    assert ready == 2
+    assert FakePython.started == 3
+    assert FakePython.terminated == 2
+    assert metrics().histogram("kernel_acquire_seconds", source="pool").count == 1
+
+
+def test_kernels_of_another_venv_are_not_used(pool: KernelPool, monkeypatch: pytest.MonkeyPatch):
+    async def scenario():
+        pool.replenish()
+        await asyncio.sleep(STARTUP_SECONDS * 3)
+
+        monkeypatch.setattr(KernelPool, "_venv_key", staticmethod(lambda: "other venv"))
+        await pool.acquire()
+        await asyncio.sleep(0)
+
+        await pool.clear()
+
+    asyncio.run(scenario())
+
+    assert FakePython.terminated == 2
+    assert metrics().histogram("kernel_acquire_seconds", source="new").count == 1
+
+
+class SlowKernelManager:
+    """
+    Starts a kernel process that never gets ready.
+    """
+
+    instances: list["SlowKernelManager"] = []
+
+    def __init__(self, kernel_name: str):
+        self.kernel_spec = None
+        self.has_kernel = False
+        self.shut_down = False
+        SlowKernelManager.instances.append(self)
+
+    async def start_kernel(self, **kwargs):
+        self.has_kernel = True
+        await asyncio.sleep(60)
+
+    async def shutdown_kernel(self, now: bool = False):
+        self.shut_down = True
+
+
+def test_kernels_being_started_are_shut_down_on_clear(monkeypatch: pytest.MonkeyPatch):
+    SlowKernelManager.instances = []
+    monkeypatch.setattr(python_module, "AsyncKernelManager", SlowKernelManager)
+    monkeypatch.setattr(python_module.Python, "wait_for_path", lambda self: asyncio.sleep(0))
+    monkeypatch.setattr(python_module.Python, "get_environment_variables", lambda self: {})
+    monkeypatch.setattr(KernelPool, "_size", staticmethod(lambda: 1))
+    monkeypatch.setattr(KernelPool, "_venv_key", staticmethod(lambda: "venv"))
+
+    async def scenario():
+        pool = KernelPool()
+        pool.replenish()
+        await asyncio.sleep(0.05)
+
+        await pool.clear()
+
+    asyncio.run(scenario())
+
+    assert len(SlowKernelManager.instances) == 1
+    assert SlowKernelManager.instances[0].shut_down
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from aiconsole.core.code_running.code_interpreters.base_code_interpreter import (
+    CodeExecutionError,
+)
+from aiconsole.core.code_running.code_interpreters.languages.python import Python
+
+CHUNKS = 20
+# Only guards against hanging, the scenario takes milliseconds
+TIMEOUT_SECONDS = 10
+
+
+def _message(msg_id: str, msg_type: str, content: dict) -> dict:
+    return {"parent_header": {"msg_id": msg_id}, "msg_type": msg_type, "content": content}
+
+
+class FakeKernelClient:
+    """
+    Publishes the outputs of an execution on the iopub channel as a kernel would, the next chunk only
+    once the previous one was received, so outputs that are not streamed as they arrive never finish.
+    """
+
+    def __init__(self):
+        self._iopub: asyncio.Queue[dict] = asyncio.Queue()
+        self.received = asyncio.Event()
+
+    def execute(self, code: str) -> str:
+        asyncio.create_task(self._publish("run-1"))
+        return "run-1"
+
+    async def _publish(self, msg_id: str):
+        # Output of an earlier execution must not be mixed in
+        self._iopub.put_nowait(_message("run-0", "stream", {"text": "stale"}))
+
+        for i in range(CHUNKS):
+            self._iopub.put_nowait(_message(msg_id, "stream", {"text": f"chunk {i}\n"}))
+            await self.received.wait()
+            self.received.clear()
+
+        self._iopub.put_nowait(_message(msg_id, "execute_result", {"data": {"text/plain": "42"}}))
+        self._iopub.put_nowait(_message(msg_id, "status", {"execution_state": "idle"}))
+
+    async def get_iopub_msg(self) -> dict:
+        return await self._iopub.get()
+
+    def stop_channels(self):
+        pass
+
+
+class FakeKernelManager:
+    interrupted = False
+
+    async def interrupt_kernel(self):
+        self.interrupted = True
+
+    async def shutdown_kernel(self):
+        pass
+
+
+def _python() -> Python:
+    python = Python.__new__(Python)
+    python.kc = FakeKernelClient()  # type: ignore
+    python.km = FakeKernelManager()  # type: ignore
+    python.has_error = False
+    python.api_prelude_hash = None
+    python._reader = None
+    return python
+
+
+def test_outputs_are_streamed_as_they_arrive():
+    async def scenario():
+        python = _python()
+
+        outputs: list[str] = []
+        async for output in python._execute_code("print('hi')"):
+            outputs.append(output)
+            python.kc.received.set()  # type: ignore
+
+        return outputs
+
+    outputs = asyncio.run(asyncio.wait_for(scenario(), TIMEOUT_SECONDS))
+
+    assert outputs == [f"chunk {i}\n" for i in range(CHUNKS)] + ["42"]
+
+
+def test_unfinished_execution_interrupts_kernel():
+    async def scenario():
+        python = _python()
+
+        outputs = python._execute_code("print('hi')")
+        first = await outputs.__anext__()
+        await outputs.aclose()
+
+        return first, python.km.interrupted  # type: ignore
+
+    assert asyncio.run(asyncio.wait_for(scenario(), TIMEOUT_SECONDS)) == ("chunk 0\n", True)
+
+
+def test_shutdown_during_execution_is_an_execution_error():
+    async def scenario():
+        python = _python()
+
+        outputs: list[str] = []
+        with pytest.raises(CodeExecutionError):
+            async for output in python._execute_code("print('hi')"):
+                outputs.append(output)
+                await python.terminate()
+
+        return outputs
+
+    outputs = asyncio.run(asyncio.wait_for(scenario(), TIMEOUT_SECONDS))
+
+    assert outputs == ["chunk 0\n", "The interpreter was shut down during the execution."]
@@ -0,0 +1,80 @@
+import asyncio
+import shutil
+import time
+
+import pytest
+
+from aiconsole.core.code_running.code_interpreters.subprocess_code_interpreter import (
+    SubprocessCodeInterpreter,
+)
+
+END_OF_EXECUTION = "## end_of_execution ##"
+RUNS = 10
+# Over the 64 KiB limit of StreamReader.readline
+LONG_LINE_BYTES = 200_000
+
+
+class Shell(SubprocessCodeInterpreter):
+    def __init__(self):
+        super().__init__()
+        self.start_cmd = "sh"
+
+    async def wait_for_path(self):
+        pass
+
+    def preprocess_code(self, code, materials):
+        return f'{code}; echo "{END_OF_EXECUTION}"'
+
+    def detect_end_of_execution(self, line):
+        return END_OF_EXECUTION in line
+
+
+async def _run(shell: Shell, code: str) -> list[str]:
+    return [output async for output in shell.run(code, [])]
+
+
+@pytest.fixture
+def shell():
+    if not shutil.which("sh"):
+        pytest.skip("No POSIX shell available")
+
+    return Shell()
+
+
+def test_run_has_no_fixed_latency(shell: Shell):
+    async def scenario():
+        started_at = time.perf_counter()
+        outputs = [await _run(shell, f"echo {i}") for i in range(RUNS)]
+        seconds = time.perf_counter() - started_at
+
+        await shell.terminate()
+        return outputs, seconds
+
+    outputs, seconds = asyncio.run(scenario())
+
+    assert outputs == [[f"{i}\n"] for i in range(RUNS)]
+    # Before, every run waited for at least 0.7s, a bound far above the few milliseconds a run takes now
+    assert seconds < RUNS * 0.5
+
+
+def test_long_lines_are_read(shell: Shell):
+    async def scenario():
+        outputs = await asyncio.wait_for(_run(shell, f"head -c {LONG_LINE_BYTES} /dev/zero | tr '\\0' a; echo"), 10)
+        await shell.terminate()
+        return outputs
+
+    assert asyncio.run(scenario()) == ["a" * LONG_LINE_BYTES + "\n"]
+
+
+def test_process_exit_ends_execution_and_restarts(shell: Shell):
+    async def scenario():
+        first = await _run(shell, "echo bye; echo oops >&2; exit")
+        second = await _run(shell, "echo again")
+
+        await shell.terminate()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert sorted(first) == ["bye\n", "oops\n"]
+    assert second == ["again\n"]
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from aiconsole.core.code_running.code_execution_scheduler import CodeExecutionScheduler
+from aiconsole.utils.metrics import metrics
+
+
+@pytest.fixture
+def scheduler(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(CodeExecutionScheduler, "_limit", staticmethod(lambda: 1))
+    metrics().reset()
+
+    return CodeExecutionScheduler()
+
+
+def _run_all(scheduler: CodeExecutionScheduler, runs: list[tuple[str, str, str]]) -> list[str]:
+    order: list[str] = []
+
+    async def run(name: str, chat_id: str, language: str):
+        async with scheduler.slot(chat_id, language):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        tasks = []
+        for run_args in runs:
+            tasks.append(asyncio.create_task(run(*run_args)))
+            # Queued in the order given
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    return order
+
+
+def test_waiting_chats_are_served_in_turn(scheduler: CodeExecutionScheduler):
+    order = _run_all(
+        scheduler,
+        [
+            ("a1", "a", "python"),
+            ("a2", "a", "applescript"),
+            ("a3", "a", "react_ui"),
+            ("b1", "b", "python"),
+            ("c1", "c", "python"),
+        ],
+    )
+
+    assert order == ["a1", "b1", "c1", "a2", "a3"]
+    assert metrics().histogram("code_execution_wait_seconds", chat_id="a").count == 3
+    assert metrics().histogram("code_execution_queue_length", chat_id="a").snapshot()["max"] == 2
+    assert metrics().histogram("code_execution_queue_length", chat_id="b").snapshot()["max"] == 1
+
+    scheduler.forget("a")
+    wait_seconds = metrics().snapshot("code_execution_wait_seconds")["code_execution_wait_seconds"]
+    assert [series["labels"]["chat_id"] for series in wait_seconds] == ["b", "c"]
+
+def test_runs_of_one_interpreter_are_serialized(scheduler: CodeExecutionScheduler, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(CodeExecutionScheduler, "_limit", staticmethod(lambda: 10))
+
+    order = _run_all(scheduler, [("a1", "a", "python"), ("a2", "a", "python"), ("b1", "b", "python")])
+
+    # b1 does not wait for the runs of chat a, a2 waits for a1
+    assert order == ["a1", "b1", "a2"]
+
+
+def test_cancelled_waiter_frees_its_place(scheduler: CodeExecutionScheduler):
+    async def scenario():
+        async with scheduler.slot("a", "python"):
+            waiter = asyncio.create_task(scheduler.slot("b", "python").__aenter__())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+
+        async with scheduler.slot("c", "python"):
+            pass
+
+    asyncio.run(asyncio.wait_for(scenario(), 1))
+
+    assert scheduler._running == 0
+    assert scheduler._waiting == {}
+    assert scheduler._queued == {}
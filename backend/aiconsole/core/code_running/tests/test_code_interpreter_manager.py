@@ -0,0 +1,128 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from aiconsole.core.code_running import code_interpreter_manager as manager_module
+from aiconsole.core.code_running.code_interpreter_manager import (
+    MB,
+    CodeInterpreterManager,
+)
+from aiconsole.utils.metrics import metrics
+from aiconsole_toolkit.settings.settings_data import SettingsData
+
+RSS_BYTES = 100 * MB
+
+
+class FakeInterpreter:
+    terminated = 0
+
+    def __init__(self):
+        self.running = True
+
+    async def initialize(self):
+        pass
+
+    async def terminate(self):
+        self.running = False
+        FakeInterpreter.terminated += 1
+
+    @property
+    def pid(self):
+        return os.getpid() if self.running else None
+
+
+class FakeConnectionManager:
+    def __init__(self):
+        self.sent: list[tuple[str, str]] = []
+
+    async def send_to_chat(self, message, chat_id: str):
+        self.sent.append((chat_id, message.error))
+
+
+@pytest.fixture
+def connections(monkeypatch: pytest.MonkeyPatch):
+    FakeInterpreter.terminated = 0
+    connections = FakeConnectionManager()
+
+    monkeypatch.setattr(manager_module, "language_map", {"shell": FakeInterpreter})
+    monkeypatch.setattr(manager_module, "connection_manager", lambda: connections)
+    monkeypatch.setattr(manager_module, "process_rss_bytes", _fake_rss)
+    metrics().reset()
+
+    return connections
+
+
+async def _fake_rss(pid: int) -> int:
+    return RSS_BYTES
+
+
+def _configure(monkeypatch: pytest.MonkeyPatch, **limits):
+    configured = SimpleNamespace(unified_settings=SettingsData(**limits))
+    monkeypatch.setattr(manager_module, "settings", lambda: configured)
+
+
+def test_least_recently_used_idle_interpreters_are_evicted(
+    connections: FakeConnectionManager, monkeypatch: pytest.MonkeyPatch
+):
+    _configure(monkeypatch, code_interpreter_max_live=2)
+    manager = CodeInterpreterManager()
+
+    async def scenario():
+        async with manager.use("chat_1", "shell"):
+            await manager.get("chat_2", "shell")
+            await manager.get("chat_3", "shell")
+
+            # chat_1 is running code, so chat_2 goes even though chat_1 was used before it
+            live_while_running = [stats.chat_id for stats in await manager.stats()]
+
+        await manager.get("chat_3", "shell")
+        await manager.get("chat_4", "shell")
+        live = [stats.chat_id for stats in await manager.stats()]
+
+        await manager.reset()
+        return live_while_running, live
+
+    live_while_running, live = asyncio.run(scenario())
+
+    assert live_while_running == ["chat_1", "chat_3"]
+    assert live == ["chat_3", "chat_4"]
+    assert FakeInterpreter.terminated == 4
+    assert metrics().counter("code_interpreter_shutdowns_total", reason="lru").value == 2
+
+
+def test_idle_interpreters_are_shut_down(connections: FakeConnectionManager, monkeypatch: pytest.MonkeyPatch):
+    _configure(monkeypatch, code_interpreter_idle_timeout=0.1, code_interpreter_memory_limit_mb=0)
+    manager = CodeInterpreterManager()
+
+    async def scenario():
+        await manager.get("chat_1", "shell")
+        async with manager.use("chat_2", "shell"):
+            await asyncio.sleep(0.2)
+            await manager.check()
+
+            return [stats.chat_id for stats in await manager.stats()]
+
+    assert asyncio.run(scenario()) == ["chat_2"]
+    assert FakeInterpreter.terminated == 1
+
+
+def test_interpreters_over_memory_limit_are_killed(
+    connections: FakeConnectionManager, monkeypatch: pytest.MonkeyPatch
+):
+    manager = CodeInterpreterManager()
+
+    async def scenario(memory_limit_mb: int):
+        _configure(monkeypatch, code_interpreter_memory_limit_mb=memory_limit_mb)
+        async with manager.use("chat_1", "shell"):
+            await manager.check()
+
+        return await manager.stats()
+
+    stats = asyncio.run(scenario(memory_limit_mb=200))
+    assert [(s.chat_id, s.rss_bytes, s.runs) for s in stats] == [("chat_1", RSS_BYTES, 1)]
+
+    assert asyncio.run(scenario(memory_limit_mb=50)) == []
+    assert FakeInterpreter.terminated == 1
+    assert [chat_id for chat_id, _ in connections.sent] == ["chat_1"]
@@ -46,3 +46,12 @@ GPT_MODE_SPEED_MAX_TOKENS = 16384
 class GPTEncoding(str, Enum):
     GPT_4 = "gpt-4"
     GPT_35 = "gpt-3.5-turbo"
+
+
+class PromptOrdering(str, Enum):
+    # Different order on every call, defeats prompt caching
+    RANDOM = "random"
+    # Shuffled, but the same for a given chat
+    SEEDED = "seeded"
+    # Sorted by id
+    STABLE = "stable"
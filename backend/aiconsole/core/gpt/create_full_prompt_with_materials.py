@@ -17,13 +17,22 @@
 from aiconsole.core.assets.materials.rendered_material import RenderedMaterial
 
 
+def _normalize(text: str) -> str:
+    return text.replace("\r\n", "\n").strip()
+
+
 def create_full_prompt_with_materials(intro: str, materials: list[RenderedMaterial], outro: str = ""):
-    section_strs = []
+    """
+    Identical inputs produce byte-identical prompts, so the common prefix can be cached by the provider.
+    """
+
+    section_strs = [_normalize(intro)]
     for material in materials:
-        section_strs.append(material.content)
+        section_strs.append(_normalize(material.content))
+    section_strs.append(_normalize(outro))
 
     # Construct the full prompt
     sub_str = "\n\n\n"
-    full_prompt = f"{intro}\n\n\n{sub_str.join(section_strs)}\n\n\n{outro}".strip()
+    full_prompt = sub_str.join(section for section in section_strs if section)
 
     return full_prompt
@@ -15,17 +15,20 @@
 # limitations under the License.
 import asyncio
 import logging
+import time
 from typing import AsyncGenerator
 
 import litellm  # type: ignore
 
 # from litellm.caching import Cache  # type: ignore
-from openai import AuthenticationError
+from openai import AuthenticationError, RateLimitError
 
 from aiconsole.api.websockets.connection_manager import connection_manager
 from aiconsole.api.websockets.server_messages import DebugJSONServerMessage
+from aiconsole.core.gpt.gpt_scheduler import backoff_delay, gpt_scheduler
 from aiconsole.core.gpt.partial import GPTPartialResponse
 from aiconsole.core.gpt.request import GPTRequest
+from aiconsole.utils.metrics import metrics
 
 from .exceptions import NoOpenAPIKeyException
 from .types import CLEAR_STR, CLEAR_STR_TYPE, GPTChoice, GPTResponse, GPTResponseMessage
@@ -37,6 +40,8 @@ _log = logging.getLogger(__name__)
 litellm.disable_cache()
 litellm.set_verbose = False
 
+MAX_ATTEMPTS = 3
+
 
 class GPTExecutor:
     def __init__(self):
@@ -51,6 +56,7 @@ class GPTExecutor:
             ]
         )
         self.partial_response = GPTPartialResponse()
+        self.queue_wait_seconds = 0.0
 
     async def execute(self, request: GPTRequest) -> AsyncGenerator[litellm.ModelResponse | CLEAR_STR_TYPE, None]:
         request.validate_request()
@@ -68,36 +74,101 @@ class GPTExecutor:
         if request.tools:
             request_dict["tools"] = [tool.model_dump(exclude_none=True) for tool in request.tools]
 
-        for attempt in range(3):
-            try:
-                _log.info("Executing GPT request:", request_dict)
-                self.request = request_dict
-                response = await litellm.acompletion(**request_dict, stream=True)  # caching=True, ttl=60 * 60 * 24
+        model_config = request.model_config
+        prompt_tokens = request.count_tokens()
+        labels = {"gpt_mode": request.gpt_mode, "model": model_config.model, "agent": request.agent_id}
+
+        metrics().counter("gpt_requests_total", **labels).inc()
 
-                self.partial_response = GPTPartialResponse()
+        for attempt in range(MAX_ATTEMPTS):
+            started_at = time.monotonic()
+            first_chunk_seconds = None
+            chunks = 0
 
-                async for chunk in response:  # type: ignore
-                    self.partial_response.apply_chunk(chunk)
-                    yield chunk
-                    await asyncio.sleep(0)
+            try:
+                async with gpt_scheduler().slot(
+                    model_config, prompt_tokens + request.max_tokens
+                ) as queue_wait_seconds:
+                    self.queue_wait_seconds = queue_wait_seconds
+                    metrics().histogram("gpt_queue_wait_seconds", **labels).observe(queue_wait_seconds)
+                    sent_at = time.monotonic()
+
+                    _log.info("Executing GPT request:", request_dict)
+                    self.request = request_dict
+                    response = await litellm.acompletion(**request_dict, stream=True)  # caching=True, ttl=60 * 60 * 24
+
+                    self.partial_response = GPTPartialResponse()
+
+                    async for chunk in response:  # type: ignore
+                        if first_chunk_seconds is None:
+                            first_chunk_seconds = time.monotonic() - sent_at
+                            metrics().histogram("gpt_time_to_first_chunk_seconds", **labels).observe(
+                                first_chunk_seconds
+                            )
+
+                        chunks += 1
+                        self.partial_response.apply_chunk(chunk)
+                        yield chunk
+                        await asyncio.sleep(0)
 
                 self.response = self.partial_response.to_final_response()
 
+                duration_seconds = time.monotonic() - started_at
+                completion_tokens = self._count_completion_tokens(request)
+                metrics().histogram("gpt_duration_seconds", **labels).observe(duration_seconds)
+                metrics().histogram("gpt_chunks", **labels).observe(chunks)
+                metrics().histogram("gpt_prompt_tokens", **labels).observe(prompt_tokens)
+                metrics().histogram("gpt_completion_tokens", **labels).observe(completion_tokens)
+
                 if _log.isEnabledFor(logging.DEBUG):
                     await connection_manager().send_to_all(
                         DebugJSONServerMessage(
-                            message="GPT", object={"request": self.request, "response": self.response.model_dump()}
+                            message="GPT",
+                            object={
+                                "request": self.request,
+                                "response": self.response.model_dump(),
+                                "timings": {
+                                    **labels,
+                                    "queue_wait_seconds": self.queue_wait_seconds,
+                                    "time_to_first_chunk_seconds": first_chunk_seconds,
+                                    "duration_seconds": duration_seconds,
+                                    "chunks": chunks,
+                                    "prompt_tokens": prompt_tokens,
+                                    "completion_tokens": completion_tokens,
+                                    "attempt": attempt,
+                                },
+                            },
                         )
                     )
+                    await connection_manager().send_to_all(
+                        DebugJSONServerMessage(message="GPT metrics", object=metrics().snapshot("gpt_"))
+                    )
 
                 return
             except AuthenticationError:
+                metrics().counter("gpt_errors_total", **labels).inc()
                 raise NoOpenAPIKeyException()
             except Exception as error:
+                metrics().counter("gpt_errors_total", **labels).inc()
                 _log.exception(f"Error on attempt {attempt}: {error}", exc_info=error)
-                if attempt == 2:
+                if attempt == MAX_ATTEMPTS - 1:
                     raise error
-            _log.info("Retrying GPT request")
+
+                delay = backoff_delay(attempt, error)
+
+                # Other chats would most likely hit the same limit, so hold them back as well
+                if isinstance(error, RateLimitError):
+                    gpt_scheduler().pause(model_config, delay)
+
+            metrics().counter("gpt_retries_total", **labels).inc()
+            _log.info(f"Retrying GPT request in {delay:.2f}s")
             yield CLEAR_STR
+            await asyncio.sleep(delay)
 
         raise Exception("Unable to complete GPT request.")
+
+    def _count_completion_tokens(self, request: GPTRequest) -> int:
+        message = self.response.choices[0].message
+        tool_calls = [tool_call.model_dump() for tool_call in message.tool_calls]
+
+        return request.count_tokens_output(message.content or "", {"tool_calls": tool_calls} if tool_calls else None)
@@ -0,0 +1,197 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+
+from aiconsole.core.gpt.types import GPTModeConfig
+
+_log = logging.getLogger(__name__)
+
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    async def acquire(self, amount: float):
+        # A single request bigger than the whole bucket would never be let through
+        amount = min(amount, self.capacity)
+
+        # Holding the lock while sleeping keeps waiting requests in FIFO order
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.refill_per_second)
+
+
+class _ModelLimits:
+    def __init__(self, config: GPTModeConfig):
+        self.config_key = _limits_key(config)
+        self.semaphore = asyncio.Semaphore(config.max_concurrent_requests) if config.max_concurrent_requests else None
+        self.requests_bucket = (
+            TokenBucket(config.requests_per_minute, config.requests_per_minute / 60)
+            if config.requests_per_minute
+            else None
+        )
+        self.tokens_bucket = (
+            TokenBucket(config.tokens_per_minute, config.tokens_per_minute / 60) if config.tokens_per_minute else None
+        )
+        self.paused_until = 0.0
+        self.waiting = 0
+
+
+def _limits_key(config: GPTModeConfig):
+    return (config.max_concurrent_requests, config.requests_per_minute, config.tokens_per_minute)
+
+
+def retry_after_seconds(error: Exception) -> float | None:
+    """
+    Reads the retry-after-ms or retry-after header from the provider response attached to the error, if any.
+    """
+
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+
+        try:
+            return max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+
+    return None
+
+
+def backoff_delay(attempt: int, error: Exception | None = None) -> float:
+    """
+    Exponential backoff with full jitter, never shorter than what the provider asked for in Retry-After.
+    """
+
+    delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt))
+
+    retry_after = retry_after_seconds(error) if error else None
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, BACKOFF_MAX_SECONDS))
+
+    return delay
+
+
+class GPTScheduler:
+    """
+    Shared by all chats, limits concurrency and rate of requests per model according to the GPT mode settings.
+    """
+
+    def __init__(self):
+        self._limits: dict[tuple[str | None, str | None], _ModelLimits] = {}
+
+    def _get_limits(self, config: GPTModeConfig) -> _ModelLimits:
+        key = (config.model, config.api_base)
+        limits = self._limits.get(key)
+
+        # Settings might have changed since the limits were created
+        if limits is None or (limits.config_key != _limits_key(config) and limits.waiting == 0):
+            limits = _ModelLimits(config)
+            self._limits[key] = limits
+
+        return limits
+
+    @asynccontextmanager
+    async def slot(self, config: GPTModeConfig, tokens: int):
+        """
+        Waits until a request of the given size can be sent to the model of the config and holds the slot while inside.
+        """
+
+        limits = self._get_limits(config)
+        started_at = time.monotonic()
+
+        limits.waiting += 1
+        try:
+            if limits.semaphore:
+                await limits.semaphore.acquire()
+
+            try:
+                while (pause := limits.paused_until - time.monotonic()) > 0:
+                    await asyncio.sleep(pause)
+
+                if limits.requests_bucket:
+                    await limits.requests_bucket.acquire(1)
+
+                if limits.tokens_bucket:
+                    await limits.tokens_bucket.acquire(tokens)
+            except BaseException:
+                if limits.semaphore:
+                    limits.semaphore.release()
+                raise
+        finally:
+            limits.waiting -= 1
+
+        wait_seconds = time.monotonic() - started_at
+
+        if wait_seconds > 1:
+            _log.info(f"GPT request to {config.model} waited {wait_seconds:.2f}s in queue")
+
+        try:
+            yield wait_seconds
+        finally:
+            if limits.semaphore:
+                limits.semaphore.release()
+
+    def pause(self, config: GPTModeConfig, seconds: float):
+        """
+        Holds back all requests to the model, used when the provider tells us to slow down.
+        """
+
+        limits = self._get_limits(config)
+        limits.paused_until = max(limits.paused_until, time.monotonic() + seconds)
+
+
+@lru_cache
+def gpt_scheduler() -> GPTScheduler:
+    return GPTScheduler()
@@ -25,6 +25,7 @@ from aiconsole.core.gpt.token_error import TokenError
 from aiconsole.core.gpt.tool_definition import ToolDefinition
 from aiconsole.core.gpt.types import (
     EnforcedFunctionCall,
+    GPTModeConfig,
     GPTRequestMessage,
     GPTRequestTextMessage,
 )
@@ -35,6 +36,46 @@ _log = logging.getLogger(__name__)
 
 EXTRA_BUFFER_FOR_ENCODING_OVERHEAD = 50
 
+# json.dumps separators and brackets between messages are not accounted for by per message counts
+PER_MESSAGE_TOKEN_OVERHEAD = 2
+
+
+def get_gpt_mode_config(gpt_mode: GPTMode) -> GPTModeConfig:
+    mode_config = settings().unified_settings.gpt_modes.get(gpt_mode, None)
+
+    if mode_config is None:
+        raise ValueError(
+            f"Unknown GPT mode: '{gpt_mode}', available modes: {', '.join(settings().unified_settings.gpt_modes.keys())}"
+        )
+
+    # if api_key refers to any other setting, use that setting
+
+    for extra in settings().unified_settings.extra:
+        if mode_config.api_key == extra:
+            mode_config = mode_config.model_copy(update={"api_key": settings().unified_settings.extra[extra]})
+
+    return mode_config
+
+
+def get_encoding(gpt_mode: GPTMode) -> tiktoken.Encoding:
+    return tiktoken.encoding_for_model(get_gpt_mode_config(gpt_mode).encoding)
+
+
+def count_message_tokens(encoding: tiktoken.Encoding, message: GPTRequestMessage) -> int:
+    """
+    Counts tokens of a single message the same way the whole request is counted,
+    so a sum over messages can be used as a (slightly pessimistic) estimate of the request size.
+    """
+
+    return len(encoding.encode(json.dumps(message.model_dump(exclude_none=True)))) + PER_MESSAGE_TOKEN_OVERHEAD
+
+
+def count_tools_tokens(encoding: tiktoken.Encoding, tools: list[ToolDefinition]) -> int:
+    if not tools:
+        return 0
+
+    return len(encoding.encode(",".join(json.dumps(f.model_dump()) for f in tools)))
+
 
 class GPTRequest:
     def __init__(
@@ -48,6 +89,7 @@ class GPTRequest:
         presence_penalty: float = 0,
         min_tokens: int = 0,
         preferred_tokens: int = 0,
+        agent_id: str | None = None,
     ):
         self.system_message = system_message
         self.messages = messages
@@ -56,6 +98,7 @@ class GPTRequest:
         self.temperature = temperature
         self.gpt_mode = gpt_mode
         self.presence_penalty = presence_penalty
+        self.agent_id = agent_id
         self.max_tokens = 0
 
         # Checks if the given prompt can fit within a specified range of token lengths for the specified AI model.
@@ -106,29 +149,11 @@ class GPTRequest:
 
     @property
     def model_config(self):
-        mode_config = settings().unified_settings.gpt_modes.get(self.gpt_mode, None)
-
-        if mode_config is None:
-            raise ValueError(
-                f"Unknown GPT mode: '{self.gpt_mode}', available modes: {', '.join(settings().unified_settings.gpt_modes.keys())}"
-            )
-
-        # if api_key refers to any other setting, use that setting
-
-        for extra in settings().unified_settings.extra:
-            if mode_config.api_key == extra:
-                mode_config = mode_config.model_copy(update={"api_key": settings().unified_settings.extra[extra]})
-
-        return mode_config
+        return get_gpt_mode_config(self.gpt_mode)
 
     def count_tokens(self):
-        encoding = tiktoken.encoding_for_model(self.model_config.encoding)
-
-        if self.tools:
-            functions_tokens = len(encoding.encode(",".join(json.dumps(f.model_dump()) for f in self.tools)))
-        else:
-            functions_tokens = 0
-        return self.count_messages_tokens(encoding) + functions_tokens
+        encoding = get_encoding(self.gpt_mode)
+        return self.count_messages_tokens(encoding) + count_tools_tokens(encoding, self.tools)
 
     def count_tokens_for_model(self, model):
         encoding = tiktoken.encoding_for_model(self.model_config.encoding)
@@ -101,3 +101,8 @@ class GPTModeConfig(BaseModel):
     api_key: str | None = None
     api_base: str | None = None
     extra: dict[str, Any] = {}
+
+    # Limits shared by all requests to the same model, None means unlimited
+    max_concurrent_requests: int | None = None
+    requests_per_minute: int | None = None
+    tokens_per_minute: int | None = None
@@ -32,6 +32,7 @@ from aiconsole.api.websockets.server_messages import (
     ProjectOpenedServerMessage,
 )
 from aiconsole.core.assets.types import AssetType
+from aiconsole.core.code_running.code_interpreters.kernel_pool import kernel_pool
 from aiconsole.core.code_running.run_code import reset_code_interpreters
 from aiconsole.core.code_running.virtual_env.create_dedicated_venv import (
     create_dedicated_venv,
@@ -59,7 +60,8 @@ async def _clear_project():
     if _agents:
         _agents.stop()
 
-    reset_code_interpreters()
+    await reset_code_interpreters()
+    await kernel_pool().clear()
 
     _materials = None
     _agents = None
@@ -136,6 +138,8 @@ async def reinitialize_project():
     await _materials.reload(initial=True)
     await _agents.reload(initial=True)
 
+    kernel_pool().replenish()
+
 
 async def choose_project(path: Path, background_tasks: BackgroundTasks):
     if not path.exists():
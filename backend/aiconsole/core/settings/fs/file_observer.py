@@ -37,7 +37,7 @@ class FileObserver:
             # Set up observer
             try:
                 self._observer.schedule(
-                    BatchingWatchDogHandler(on_changed, file_path.suffix),
+                    BatchingWatchDogHandler(on_changed, file_path.suffix, name=file_path.name),
                     file_path.parent,
                     recursive=False,
                 )
@@ -1,3 +1,5 @@
+import threading
+from dataclasses import dataclass
 from pathlib import Path
 
 import tomlkit
@@ -7,45 +9,103 @@ import tomlkit.items
 from aiconsole_toolkit.settings.partial_settings_data import PartialSettingsData
 
 
+@dataclass
+class _CachedDocument:
+    document: tomlkit.TOMLDocument
+    # (mtime_ns, size) of the file the document was read from or written to, None if it did not exist
+    file_stat: tuple[int, int] | None
+
+
+# Parsed settings files, reused until the file changes on disk
+_documents: dict[Path, _CachedDocument] = {}
+_lock = threading.RLock()
+
+
 def load_settings_file(file_path: Path) -> PartialSettingsData:
-    document = _get_document(file_path)
+    with _lock:
+        document = _get_document(file_path)
+
+        if "settings" in document:
+            settings = document["settings"]
 
-    if "settings" in document:
-        settings = document["settings"]
+            # if is container
+            if isinstance(settings, dict):
+                if "openai_api_key" in settings:
+                    document["openai_api_key"] = settings["openai_api_key"]
 
-        # if is container
-        if isinstance(settings, dict):
-            if "openai_api_key" in settings:
-                document["openai_api_key"] = settings["openai_api_key"]
+                if "code_autorun" in settings:
+                    document["code_autorun"] = settings["code_autorun"]
 
-            if "code_autorun" in settings:
-                document["code_autorun"] = settings["code_autorun"]
+                del document["settings"]
 
-            del document["settings"]
+                # save
+                _flush(file_path)
 
-            # save
-            _write_document(file_path, document)
+        d: dict = dict(document)
 
-    d: dict = dict(document)
     return PartialSettingsData(**d)
 
 
-def save_settings_file(file_path: Path, settings_data: PartialSettingsData):
-    document = _get_document(file_path)
-    _update_document(document, settings_data)
-    _write_document(file_path, document)
+def save_settings_file(file_path: Path, *settings_data: PartialSettingsData):
+    """
+    Applies the updates to the settings file, the file is written once for all of them.
+    """
+
+    with _lock:
+        document = _get_document(file_path)
+
+        try:
+            for data in settings_data:
+                _update_document(document, data)
+        except Exception:
+            # Do not keep a partially updated document
+            _documents.pop(file_path, None)
+            raise
+
+        _flush(file_path)
+
+
+def _file_stat(file_path: Path) -> tuple[int, int] | None:
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
 
 
 def _get_document(file_path: Path) -> tomlkit.TOMLDocument:
-    if not file_path.exists():
-        return tomlkit.document()
+    file_stat = _file_stat(file_path)
+
+    cached = _documents.get(file_path)
+    if cached is not None and cached.file_stat == file_stat:
+        return cached.document
+
+    if file_stat is None:
+        document = tomlkit.document()
+    else:
+        with file_path.open("r", encoding="utf8", errors="replace") as file:
+            document = tomlkit.loads(file.read())
+
+    _documents[file_path] = _CachedDocument(document=document, file_stat=file_stat)
+    return document
+
+
+def _flush(file_path: Path):
+    cached = _documents[file_path]
+
+    try:
+        _write_document(file_path, cached.document)
+    except Exception:
+        _documents.pop(file_path, None)
+        raise
 
-    with file_path.open("r", encoding="utf8", errors="replace") as file:
-        return tomlkit.loads(file.read())
+    cached.file_stat = _file_stat(file_path)
 
 
 def _update_document(document: tomlkit.TOMLDocument, settings_data: PartialSettingsData):
-    settings_data_dump = settings_data.model_dump(exclude_none=True)
+    # JSON mode, so the document in memory holds the same plain values as one read from the file
+    settings_data_dump = settings_data.model_dump(mode="json", exclude_none=True)
     for key, value in settings_data_dump.items():
         if value is None:
             continue
@@ -67,7 +67,7 @@ class SettingsFileStorage(SettingsStorage):
 
         save_settings_file(file_path, settings_data)
 
-    async def _reload(self):
+    async def _reload(self, changed_paths: set[Path]):
         await internal_events().emit(SettingsUpdatedEvent())
 
     def _start_observer(self):
@@ -29,8 +29,20 @@ _log = logging.getLogger(__name__)
 
 
 class Settings:
+    """
+    Unified settings are merged from the settings files once and kept as an immutable snapshot,
+    which is dropped when the files change or settings are saved.
+    """
+
     _storage: SettingsStorage | None = None
     _settings_notifications: SettingsNotifications | None = None
+    _snapshot: SettingsData | None = None
+    _snapshot_version: int = 0
+
+    def _invalidate(self):
+        # A snapshot computed concurrently with the invalidation is not stored, see unified_settings
+        self._snapshot_version += 1
+        self._snapshot = None
 
     def configure(self, storage: SettingsStorage):
         self.destroy()
@@ -48,6 +60,7 @@ class Settings:
     def destroy(self):
         self._storage = None
         self._settings_notifications = None
+        self._invalidate()
 
         internal_events().unsubscribe(
             SettingsUpdatedEvent,
@@ -58,6 +71,7 @@ class Settings:
         if not self._storage or not self._settings_notifications:
             raise ValueError("Settings not configured")
 
+        self._invalidate()
         await self._settings_notifications.notify()
 
     @property
@@ -65,7 +79,17 @@ class Settings:
         if not self._storage or not self._settings_notifications:
             raise ValueError("Settings not configured")
 
-        return merge_settings_data(SettingsData(), self._storage.global_settings, self._storage.project_settings)
+        snapshot = self._snapshot
+        if snapshot is None:
+            version = self._snapshot_version
+            snapshot = merge_settings_data(
+                SettingsData(), self._storage.global_settings, self._storage.project_settings
+            )
+
+            if version == self._snapshot_version:
+                self._snapshot = snapshot
+
+        return snapshot
 
     def save(self, settings_data: PartialSettingsData, to_global: bool):
         if not self._storage or not self._settings_notifications:
@@ -73,6 +97,7 @@ class Settings:
 
         self._settings_notifications.suppress_next_notification()
         self._storage.save(settings_data, to_global=to_global)
+        self._invalidate()
 
 
 @lru_cache
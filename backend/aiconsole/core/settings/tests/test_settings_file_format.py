@@ -0,0 +1,63 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from aiconsole.core.assets.types import AssetStatus
+from aiconsole.core.settings.fs import settings_file_format
+from aiconsole.core.settings.fs.settings_file_format import (
+    load_settings_file,
+    save_settings_file,
+)
+from aiconsole_toolkit.settings.partial_settings_data import PartialSettingsData
+
+
+@pytest.fixture
+def counters(monkeypatch: pytest.MonkeyPatch):
+    counters = {"reads": 0, "writes": 0}
+
+    loads, write_document = settings_file_format.tomlkit.loads, settings_file_format._write_document
+
+    def counting_loads(*args, **kwargs):
+        counters["reads"] += 1
+        return loads(*args, **kwargs)
+
+    def counting_write_document(*args, **kwargs):
+        counters["writes"] += 1
+        return write_document(*args, **kwargs)
+
+    monkeypatch.setattr(settings_file_format.tomlkit, "loads", counting_loads)
+    monkeypatch.setattr(settings_file_format, "_write_document", counting_write_document)
+
+    return counters
+
+
+def test_saves_reuse_the_document(tmp_path: Path, counters: dict[str, int]):
+    file_path = tmp_path / "settings.toml"
+
+    for i in range(100):
+        save_settings_file(file_path, PartialSettingsData(materials={f"material_{i}": AssetStatus.DISABLED}))
+
+    assert load_settings_file(file_path).materials == {f"material_{i}": AssetStatus.DISABLED for i in range(100)}
+    assert counters == {"reads": 0, "writes": 100}
+
+    save_settings_file(
+        file_path,
+        PartialSettingsData(materials={"material_0": AssetStatus.ENABLED}),
+        PartialSettingsData(code_autorun=True),
+    )
+
+    assert counters == {"reads": 0, "writes": 101}
+    assert load_settings_file(file_path).code_autorun is True
+
+
+def test_external_changes_are_read_again(tmp_path: Path, counters: dict[str, int]):
+    file_path = tmp_path / "settings.toml"
+    save_settings_file(file_path, PartialSettingsData(code_autorun=True))
+
+    file_path.write_text("code_autorun = false\nopenai_api_key = 'key'\n")
+    os.utime(file_path, ns=(0, 0))
+
+    assert load_settings_file(file_path).code_autorun is False
+    assert load_settings_file(file_path).openai_api_key == "key"
+    assert counters["reads"] == 1
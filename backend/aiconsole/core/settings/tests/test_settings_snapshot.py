@@ -0,0 +1,104 @@
+from pathlib import Path
+
+import pytest
+
+from aiconsole.core.assets.assets import Assets
+from aiconsole.core.assets.materials.material import Material
+from aiconsole.core.assets.types import AssetLocation, AssetStatus, AssetType
+from aiconsole.core.project import project
+from aiconsole.core.settings import settings as settings_module
+from aiconsole.core.settings.fs.settings_file_storage import SettingsFileStorage
+from aiconsole.core.settings.settings import settings
+from aiconsole_toolkit.settings.partial_settings_data import PartialSettingsData
+
+ASSETS_COUNT = 500
+
+
+class TmpSettingsFileStorage(SettingsFileStorage):
+    def __init__(self, path: Path):
+        self._global_settings_file_path = path / "global" / "settings.toml"
+        self._global_settings_file_path.parent.mkdir()
+        super().__init__(project_path=path, disable_observer=True)
+
+    @property
+    def global_settings_file_path(self):
+        return self._global_settings_file_path
+
+
+@pytest.fixture
+def materials(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    settings().configure(TmpSettingsFileStorage(tmp_path))
+    settings().save(
+        PartialSettingsData(materials={f"material_{i}": AssetStatus.DISABLED for i in range(0, ASSETS_COUNT, 2)}),
+        to_global=False,
+    )
+
+    materials = Assets.__new__(Assets)
+    materials.asset_type = AssetType.MATERIAL
+    materials._status_index = {}
+    materials._status_index_key = None
+    materials._assets = {
+        f"material_{i}": [
+            Material(
+                id=f"material_{i}",
+                name=f"Material {i}",
+                usage="",
+                usage_examples=[],
+                defined_in=AssetLocation.PROJECT_DIR,
+                override=False,
+            )
+        ]
+        for i in range(ASSETS_COUNT)
+    }
+    monkeypatch.setattr(project, "_materials", materials)
+
+    yield materials
+
+    settings().destroy()
+
+
+def test_assets_with_status_uses_settings_snapshot(materials: Assets, monkeypatch: pytest.MonkeyPatch):
+    merges = 0
+    merge_settings_data = settings_module.merge_settings_data
+
+    def counting_merge_settings_data(*args, **kwargs):
+        nonlocal merges
+        merges += 1
+        return merge_settings_data(*args, **kwargs)
+
+    monkeypatch.setattr(settings_module, "merge_settings_data", counting_merge_settings_data)
+
+    enabled = materials.assets_with_status(AssetStatus.ENABLED)
+    disabled = materials.assets_with_status(AssetStatus.DISABLED)
+    statuses = [Assets.get_status(AssetType.MATERIAL, material.id) for material in materials.all_assets()]
+
+    # Before, the settings files were merged again for every asset
+    assert merges <= 1
+    assert len(enabled) == len(disabled) == ASSETS_COUNT // 2
+    assert statuses.count(AssetStatus.DISABLED) == ASSETS_COUNT // 2
+
+
+def test_save_invalidates_settings_snapshot(materials: Assets):
+    assert Assets.get_status(AssetType.MATERIAL, "material_1") == AssetStatus.ENABLED
+
+    settings().save(PartialSettingsData(materials={"material_1": AssetStatus.DISABLED}), to_global=False)
+
+    assert Assets.get_status(AssetType.MATERIAL, "material_1") == AssetStatus.DISABLED
+
+
+def test_assets_with_status_follows_changes(materials: Assets):
+    assert len(materials.assets_with_status(AssetStatus.DISABLED)) == ASSETS_COUNT // 2
+    index = materials._status_index
+
+    Assets.set_status(AssetType.MATERIAL, "material_1", AssetStatus.DISABLED)
+
+    disabled_ids = {material.id for material in materials.assets_with_status(AssetStatus.DISABLED)}
+    assert len(disabled_ids) == ASSETS_COUNT // 2 + 1
+    assert "material_1" in disabled_ids
+    assert "material_1" not in {material.id for material in materials.assets_with_status(AssetStatus.ENABLED)}
+    # Updated in place rather than rebuilt
+    assert materials._status_index is index
+
+    materials._assets = {id: id_assets for id, id_assets in materials._assets.items() if id != "material_1"}
+
+    assert "material_1" not in {material.id for material in materials.assets_with_status(AssetStatus.DISABLED)}
@@ -19,7 +19,8 @@ class MissingFileName(Exception):
 
 class UserProfileService:
     def get_profile(self, email: str | None = None) -> UserProfile:
-        user_profile = settings().unified_settings.user_profile
+        # Copied, as the unified settings are a shared snapshot
+        user_profile = settings().unified_settings.user_profile.model_copy()
         if not user_profile.avatar_url:
             user_profile.avatar_url = self._get_default_avatar()
         if email:
@@ -16,19 +16,48 @@
 
 import asyncio
 import logging
-import threading
+from pathlib import Path
+from typing import Awaitable, Callable
 
 import watchdog.events
 
+from aiconsole.utils.metrics import metrics
+
 _log = logging.getLogger(__name__)
 
 
 class BatchingWatchDogHandler(watchdog.events.FileSystemEventHandler):
-    def __init__(self, reload, extension=".toml"):
-        self.lock = threading.RLock()
-        self.timer = None
+    """
+    Calls reload with the paths changed since the last call, at most once a second.
+
+    Events from the watchdog thread are forwarded to the event loop the handler was created in,
+    reloads run there one at a time, and changes made during a reload are batched into the next one.
+    The time from the first change of a batch until its reload finishes is recorded as
+    file_watcher_reload_latency_seconds.
+    """
+
+    def __init__(
+        self,
+        reload: Callable[[set[Path]], Awaitable[None]],
+        extension=".toml",
+        name: str = "",
+        delay: float = 1.0,
+    ):
         self.reload = reload
         self.extension = extension
+        self.name = name or extension
+        self.delay = delay
+        self.changed_paths: set[Path] = set()
+
+        try:
+            self.loop: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+        except RuntimeError:
+            self.loop = None
+
+        self._timer: asyncio.TimerHandle | None = None
+        self._first_change_at: float | None = None
+        self._lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
 
     def on_moved(self, event):
         return self.on_modified(event)
@@ -40,18 +69,69 @@ class BatchingWatchDogHandler(watchdog.events.FileSystemEventHandler):
         return self.on_modified(event)
 
     def on_modified(self, event):
-        if event.is_directory or not event.src_path.endswith(self.extension):
+        if event.is_directory:
             return
 
-        with self.lock:
+        paths = [Path(path) for path in [event.src_path, getattr(event, "dest_path", "")] if path]
+        paths = [path for path in paths if path.suffix == self.extension]
+        if not paths:
+            return
+
+        if self.loop is None or self.loop.is_closed():
+            _log.warning(f"Ignoring changes of {self.name} files, the watcher was created outside of an event loop")
+            return
+
+        self.loop.call_soon_threadsafe(self._add_changed_paths, paths)
+
+    def _add_changed_paths(self, paths: list[Path]):
+        self.changed_paths.update(paths)
+
+        if self._first_change_at is None:
+            self._first_change_at = self._now()
+
+        if self._timer is None:
+            self._timer = self._event_loop().call_later(self.delay, self._flush)
+
+    def _flush(self):
+        self._timer = None
+
+        task = self._event_loop().create_task(self._reload())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _reload(self):
+        async with self._lock:
+            changed_paths, self.changed_paths = self.changed_paths, set()
+            first_change_at, self._first_change_at = self._first_change_at, None
+
+            if not changed_paths:
+                return
+
+            try:
+                await self.reload(changed_paths)
+            except Exception:
+                _log.exception(f"Reloading changed {self.name} files failed")
+            finally:
+                if first_change_at is not None:
+                    latency = self._now() - first_change_at
+                    metrics().histogram("file_watcher_reload_latency_seconds", watched=self.name).observe(latency)
+                    _log.debug(f"Reloaded {len(changed_paths)} changed {self.name} files {latency:.3f}s after change")
+
+    def stop(self):
+        """
+        Drops pending changes, reloads that are already running are finished.
+        """
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        self.changed_paths = set()
+        self._first_change_at = None
 
-            def reload():
-                with self.lock:
-                    if self.timer is not None:
-                        self.timer.cancel()
-                    self.timer = None
-                    asyncio.run(self.reload())
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        assert self.loop is not None
+        return self.loop
 
-            if self.timer is None:
-                self.timer = threading.Timer(1.0, reload)
-                self.timer.start()
+    def _now(self) -> float:
+        return self._event_loop().time()
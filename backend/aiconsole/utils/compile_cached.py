@@ -0,0 +1,27 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from functools import lru_cache
+from types import CodeType
+
+
+@lru_cache(maxsize=256)
+def compile_cached(source: str, filename: str) -> CodeType:
+    """
+    Compiles the source once per process, syntax errors are not cached and raised on every call.
+    """
+
+    return compile(source, filename, "exec")
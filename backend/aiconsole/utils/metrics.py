@@ -0,0 +1,138 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Any
+
+# Number of most recent samples percentiles are computed from
+DEFAULT_WINDOW = 500
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _percentile(sorted_samples: list[float], fraction: float) -> float:
+    return sorted_samples[min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))]
+
+
+class Histogram:
+    """
+    Rolling histogram, keeps totals since start and percentiles over the most recent samples.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self._samples.append(value)
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> dict[str, Any]:
+        samples = sorted(self._samples)
+
+        if not samples:
+            return {"count": self.count, "sum": self.sum}
+
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": sum(samples) / len(samples),
+            "p50": _percentile(samples, 0.5),
+            "p90": _percentile(samples, 0.9),
+            "p99": _percentile(samples, 0.99),
+            "max": samples[-1],
+        }
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"value": self.value}
+
+
+class Metrics:
+    """
+    In memory registry of labelled metrics, shared by the whole backend.
+    """
+
+    def __init__(self):
+        self._histograms: dict[tuple[str, Labels], Histogram] = {}
+        self._counters: dict[tuple[str, Labels], Counter] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: dict[str, Any]) -> tuple[str, Labels]:
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        key = self._key(name, labels)
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram()
+            return self._histograms[key]
+
+    def counter(self, name: str, **labels) -> Counter:
+        key = self._key(name, labels)
+        with self._lock:
+            if key not in self._counters:
+                self._counters[key] = Counter()
+            return self._counters[key]
+
+    def remove(self, name: str, **labels):
+        """
+        Drops the series with the given name and labels, for labels whose values are not used anymore.
+        """
+
+        key = self._key(name, labels)
+        with self._lock:
+            self._histograms.pop(key, None)
+            self._counters.pop(key, None)
+
+    def snapshot(self, prefix: str = "") -> dict[str, list[dict[str, Any]]]:
+        """
+        Returns all metrics whose name starts with prefix, grouped by name.
+        """
+
+        with self._lock:
+            metrics = [*self._histograms.items(), *self._counters.items()]
+
+        result: dict[str, list[dict[str, Any]]] = {}
+        for (name, labels), metric in metrics:
+            if name.startswith(prefix):
+                result.setdefault(name, []).append({"labels": dict(labels), **metric.snapshot()})
+
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+@lru_cache
+def metrics() -> Metrics:
+    return Metrics()
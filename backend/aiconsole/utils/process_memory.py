@@ -0,0 +1,105 @@
+# The AIConsole Project
+#
+# Copyright 2023 10Clouds
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import os
+import platform
+from pathlib import Path
+
+
+def _linux_children(pid: int) -> list[int]:
+    children: list[int] = []
+    for children_file in Path(f"/proc/{pid}/task").glob("*/children"):
+        try:
+            children.extend(int(child) for child in children_file.read_text().split())
+        except (OSError, ValueError):
+            pass
+    return children
+
+
+def _linux_tree_rss_bytes(pid: int) -> int | None:
+    try:
+        resident_pages = int(Path(f"/proc/{pid}/statm").read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+    pids = [pid]
+    seen = {pid}
+    while pids:
+        for child in _linux_children(pids.pop()):
+            if child in seen:
+                continue
+            seen.add(child)
+            pids.append(child)
+
+            try:
+                resident_pages += int(Path(f"/proc/{child}/statm").read_text().split()[1])
+            except (OSError, IndexError, ValueError):
+                # Exited in the meantime
+                pass
+
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+async def _ps_tree_rss_bytes(pid: int) -> int | None:
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "ps", "-A", "-o", "pid=,ppid=,rss=", stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout, _ = await process.communicate()
+    except OSError:
+        return None
+
+    children: dict[int, list[int]] = {}
+    rss_kilobytes: dict[int, int] = {}
+    for line in stdout.decode().splitlines():
+        try:
+            process_pid, parent_pid, rss = (int(field) for field in line.split())
+        except ValueError:
+            continue
+        children.setdefault(parent_pid, []).append(process_pid)
+        rss_kilobytes[process_pid] = rss
+
+    if pid not in rss_kilobytes:
+        return None
+
+    total = 0
+    pids = [pid]
+    seen = {pid}
+    while pids:
+        process_pid = pids.pop()
+        total += rss_kilobytes[process_pid]
+        for child in children.get(process_pid, []):
+            if child not in seen:
+                seen.add(child)
+                pids.append(child)
+
+    return total * 1024
+
+
+async def process_rss_bytes(pid: int) -> int | None:
+    """
+    Returns the resident set size of the process together with all of its descendants (e.g. commands run by
+    the interpreter), None if it is not running or can not be measured on this platform.
+    """
+
+    if platform.system() == "Linux":
+        return _linux_tree_rss_bytes(pid)
+
+    if platform.system() == "Windows":
+        return None
+
+    return await _ps_tree_rss_bytes(pid)
@@ -0,0 +1,41 @@
+import asyncio
+import threading
+from pathlib import Path
+
+import watchdog.events
+
+from aiconsole.utils.BatchingWatchDogHandler import BatchingWatchDogHandler
+from aiconsole.utils.metrics import metrics
+
+
+def test_changes_are_batched_and_reloaded_in_the_loop():
+    reloads: list[tuple[set[Path], int]] = []
+
+    async def reload(changed_paths: set[Path]):
+        reloads.append((changed_paths, threading.get_ident()))
+        await asyncio.sleep(0.05)
+
+    async def watch():
+        handler = BatchingWatchDogHandler(reload, name="test_batching", delay=0.05)
+
+        def emit_changes(names: list[str]):
+            for name in names:
+                handler.on_modified(watchdog.events.FileModifiedEvent(f"/assets/{name}"))
+
+        # From another thread, as watchdog does
+        await asyncio.to_thread(emit_changes, ["a.toml", "b.toml", "a.toml", "ignored.txt"])
+        await asyncio.sleep(0.08)
+
+        # A change during a running reload waits for it and ends up in the next batch
+        await asyncio.to_thread(emit_changes, ["c.toml"])
+        await asyncio.sleep(0.2)
+
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(watch())
+
+    assert reloads == [
+        ({Path("/assets/a.toml"), Path("/assets/b.toml")}, loop_thread),
+        ({Path("/assets/c.toml")}, loop_thread),
+    ]
+    assert metrics().histogram("file_watcher_reload_latency_seconds", watched="test_batching").count == 2
@@ -0,0 +1,55 @@
+import asyncio
+import platform
+import subprocess
+import sys
+
+import pytest
+
+from aiconsole.utils import process_memory
+from aiconsole.utils.process_memory import process_rss_bytes
+
+MB = 1024 * 1024
+CHILD_MB = 200
+
+# The parent starts a child that holds CHILD_MB of memory, like a command run by an interpreter
+PARENT_SOURCE = f"""
+import subprocess, sys
+child = subprocess.Popen(
+    [sys.executable, "-c", "import time; data = b'x' * {CHILD_MB} * 1024 * 1024; print(flush=True); time.sleep(60)"],
+    stdout=subprocess.PIPE,
+)
+child.stdout.readline()
+print(flush=True)
+child.wait()
+"""
+
+
+@pytest.mark.skipif(platform.system() == "Windows", reason="Memory is not measured on Windows")
+@pytest.mark.parametrize("system", ["Linux", "Darwin"])
+def test_memory_of_child_processes_is_included(system: str, monkeypatch: pytest.MonkeyPatch):
+    if system == "Linux" and platform.system() != "Linux":
+        pytest.skip("/proc is only available on Linux")
+    # Other systems are measured with ps
+    monkeypatch.setattr(process_memory.platform, "system", lambda: system)
+
+    parent = subprocess.Popen([sys.executable, "-c", PARENT_SOURCE], stdout=subprocess.PIPE)
+
+    try:
+        assert parent.stdout is not None
+        parent.stdout.readline()
+
+        rss_bytes = asyncio.run(process_rss_bytes(parent.pid))
+    finally:
+        subprocess.run(["pkill", "-P", str(parent.pid)])
+        parent.kill()
+        parent.wait()
+
+    assert rss_bytes is not None
+    assert rss_bytes > CHILD_MB * MB
+
+
+def test_missing_process_is_not_measured():
+    parent = subprocess.Popen([sys.executable, "-c", "pass"])
+    parent.wait()
+
+    assert asyncio.run(process_rss_bytes(parent.pid)) is None
@@ -8,9 +8,9 @@ from aiconsole.core.assets.types import AssetType
 
 async def get_all_agents() -> list[AICAgent]:
     lists = (await load_all_assets(AssetType.AGENT)).values()
-    return cast(list[AICAgent], (list[0] for list in lists))
+    return [cast(AICAgent, assets[0]) for assets in lists]
 
 
 async def get_all_materials() -> list[Material]:
     lists = (await load_all_assets(AssetType.MATERIAL)).values()
-    return cast(list[Material], (list[0] for list in lists))
+    return [cast(Material, assets[0]) for assets in lists]
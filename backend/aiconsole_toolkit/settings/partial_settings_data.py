@@ -1,8 +1,9 @@
 from typing import Any, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from aiconsole.core.assets.types import AssetStatus
+from aiconsole.core.gpt.consts import PromptOrdering
 from aiconsole.core.gpt.types import GPTModeConfig
 from aiconsole.core.users.types import PartialUserProfile
 
@@ -16,4 +17,17 @@ class PartialSettingsData(BaseModel):
     agents: Optional[dict[str, AssetStatus]] = None
     agents_to_reset: Optional[list[str]] = None
     gpt_modes: Optional[dict[str, GPTModeConfig]] = None
+    prompt_ordering: Optional[PromptOrdering] = None
+    material_render_concurrency: Optional[int] = Field(None, ge=1)
+    material_render_timeout: Optional[float] = Field(None, gt=0)
+    material_sandbox_enabled: Optional[bool] = None
+    material_sandbox_workers: Optional[int] = None
+    material_sandbox_memory_limit_mb: Optional[int] = None
+    material_sandbox_max_tasks_per_worker: Optional[int] = None
+    director_material_candidates: Optional[int] = None
+    code_interpreter_kernel_pool_size: Optional[int] = None
+    code_execution_max_concurrency: Optional[int] = None
+    code_interpreter_idle_timeout: Optional[float] = None
+    code_interpreter_max_live: Optional[int] = None
+    code_interpreter_memory_limit_mb: Optional[int] = None
     extra: Optional[dict[str, Any]] = None
@@ -1,6 +1,6 @@
 from typing import Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 
 from aiconsole.core.assets.types import AssetStatus
 from aiconsole.core.gpt import consts
@@ -11,6 +11,9 @@ REFERENCE_TO_GLOBAL_OPENAI_KEY = "ref/openai_api_key"
 
 
 class SettingsData(BaseModel):
+    # Instances are shared as a cached snapshot, see Settings.unified_settings
+    model_config = ConfigDict(frozen=True)
+
     code_autorun: bool = False
     openai_api_key: str | None = None
     user_profile: UserProfile = UserProfile()
@@ -42,4 +45,17 @@ class SettingsData(BaseModel):
             api_key=REFERENCE_TO_GLOBAL_OPENAI_KEY,
         ),
     }
+    prompt_ordering: consts.PromptOrdering = consts.PromptOrdering.SEEDED
+    material_render_concurrency: int = Field(4, ge=1)
+    material_render_timeout: float = Field(30.0, gt=0)
+    material_sandbox_enabled: bool = False
+    material_sandbox_workers: int = 2
+    material_sandbox_memory_limit_mb: int = 2048
+    material_sandbox_max_tasks_per_worker: int = 100
+    director_material_candidates: int = 30
+    code_interpreter_kernel_pool_size: int = 1
+    code_execution_max_concurrency: int = 4
+    code_interpreter_idle_timeout: float = 1800.0
+    code_interpreter_max_live: int = 8
+    code_interpreter_memory_limit_mb: int = 4096
     extra: dict[str, Any] = {}
@@ -0,0 +1,69 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from aiconsole.core.assets import load_all_assets as load_all_assets_module
+from aiconsole.core.assets.agents.agent import AICAgent
+from aiconsole.core.assets.assets import Assets
+from aiconsole.core.assets.fs import core_assets_manifest as manifest_module
+from aiconsole.core.assets.materials.material import Material
+from aiconsole.core.assets.types import AssetLocation, AssetType
+from aiconsole.core.project import project
+from aiconsole.core.settings.fs.settings_file_storage import SettingsFileStorage
+from aiconsole.core.settings.settings import settings
+from aiconsole_toolkit.project import get_all_agents, get_all_materials
+
+
+class TmpSettingsFileStorage(SettingsFileStorage):
+    def __init__(self, path: Path):
+        self._global_settings_file_path = path / "global" / "settings.toml"
+        self._global_settings_file_path.parent.mkdir()
+        super().__init__(project_path=path, disable_observer=True)
+
+    @property
+    def global_settings_file_path(self):
+        return self._global_settings_file_path
+
+
+@pytest.fixture
+def project_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(manifest_module, "AICONSOLE_USER_CACHE_DIR", lambda: tmp_path)
+    monkeypatch.setattr(
+        load_all_assets_module,
+        "get_project_assets_directory",
+        lambda asset_type: tmp_path / f"{asset_type.value}s",
+    )
+    settings().configure(TmpSettingsFileStorage(tmp_path))
+
+    # Statuses fall back to the defaults of the loaded assets of the project, none are loaded yet
+    for asset_type in [AssetType.MATERIAL, AssetType.AGENT]:
+        assets = Assets.__new__(Assets)
+        assets.asset_type = asset_type
+        assets._assets = {}
+        monkeypatch.setattr(project, f"_{asset_type.value}s", assets)
+
+    (tmp_path / "materials").mkdir()
+    (tmp_path / "materials" / "notes.toml").write_text(
+        'name = "Notes"\nusage = "Notes of the project"\ncontent_type = "static_text"\ncontent = "Notes"\n'
+    )
+
+    yield tmp_path
+
+    settings().destroy()
+
+
+def test_all_materials_include_project_and_core_ones(project_path: Path):
+    materials = asyncio.run(get_all_materials())
+
+    assert all(isinstance(material, Material) for material in materials)
+    locations = {material.id: material.defined_in for material in materials}
+    assert locations["notes"] == AssetLocation.PROJECT_DIR
+    assert AssetLocation.AICONSOLE_CORE in locations.values()
+
+
+def test_all_agents_include_core_ones(project_path: Path):
+    agents = asyncio.run(get_all_agents())
+
+    assert agents
+    assert all(isinstance(agent, AICAgent) and agent.type == AssetType.AGENT for agent in agents)
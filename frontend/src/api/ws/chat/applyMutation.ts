@@ -56,6 +56,12 @@ export function applyMutation(chat: Chat, mutation: ChatMutation) {
     case 'AppendToMaterialsIdsMessageGroupMutation':
       getMessageGroup(chat, mutation.message_group_id).materials_ids.push(mutation.material_id);
       break;
+    case 'SetMaterialsPackingMessageGroupMutation': {
+      const messageGroup = getMessageGroup(chat, mutation.message_group_id);
+      messageGroup.dropped_materials_ids = mutation.dropped_materials_ids;
+      messageGroup.truncated_materials_ids = mutation.truncated_materials_ids;
+      break;
+    }
     case 'SetAnalysisMessageGroupMutation':
       getMessageGroup(chat, mutation.message_group_id).analysis = mutation.analysis;
       break;
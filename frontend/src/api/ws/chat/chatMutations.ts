@@ -82,6 +82,15 @@ export const SetMaterialsIdsMessageGroupMutationSchema = z.object({
 
 export type SetMaterialsIdsMessageGroupMutation = z.infer<typeof SetMaterialsIdsMessageGroupMutationSchema>;
 
+export const SetMaterialsPackingMessageGroupMutationSchema = z.object({
+  type: z.literal('SetMaterialsPackingMessageGroupMutation'),
+  message_group_id: z.string(),
+  dropped_materials_ids: z.array(z.string()),
+  truncated_materials_ids: z.array(z.string()),
+});
+
+export type SetMaterialsPackingMessageGroupMutation = z.infer<typeof SetMaterialsPackingMessageGroupMutationSchema>;
+
 export const AppendToMaterialsIdsMessageGroupMutationSchema = z.object({
   type: z.literal('AppendToMaterialsIdsMessageGroupMutation'),
   message_group_id: z.string(),
@@ -259,6 +268,7 @@ export const ChatMutationSchema = z.union([
   SetActorIdMessageGroupMutationSchema,
   SetMaterialsIdsMessageGroupMutationSchema,
   AppendToMaterialsIdsMessageGroupMutationSchema,
+  SetMaterialsPackingMessageGroupMutationSchema,
   SetAnalysisMessageGroupMutationSchema,
   AppendToAnalysisMessageGroupMutationSchema,
   CreateMessageMutationSchema,
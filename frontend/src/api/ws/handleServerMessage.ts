@@ -79,6 +79,31 @@ export async function handleServerMessage(message: ServerMessage) {
       }
       break;
 
+    case 'AssetsChangedServerMessage': {
+      const count = message.changed_ids.length + message.removed_ids.length;
+
+      if (message.asset_type === 'agent') {
+        useEditablesStore.getState().updateAgents(message.changed_ids, message.removed_ids);
+        if (!message.silent) {
+          showToast({
+            title: 'Agents updated',
+            message: `Reloaded ${count} ${count === 1 ? 'agent' : 'agents'}.`,
+          });
+        }
+      }
+
+      if (message.asset_type === 'material') {
+        useEditablesStore.getState().updateMaterials(message.changed_ids, message.removed_ids);
+        if (!message.silent) {
+          showToast({
+            title: 'Materials updated',
+            message: `Reloaded ${count} ${count === 1 ? 'material' : 'materials'}.`,
+          });
+        }
+      }
+      break;
+    }
+
     case 'SettingsServerMessage':
       useSettingsStore.getState().initSettings();
       useEditablesStore.getState().initMaterials();
@@ -79,10 +79,21 @@ export const AssetsUpdatedServerMessageSchema = BaseServerMessageSchema.extend({
   initial: z.boolean(),
   asset_type: AssetTypeSchema, // Assuming Asset is an enum
   count: z.number(),
+  timings: z.record(z.number()).optional(), // Seconds spent in each loading phase
 });
 
 export type AssetsUpdatedServerMessage = z.infer<typeof AssetsUpdatedServerMessageSchema>;
 
+export const AssetsChangedServerMessageSchema = BaseServerMessageSchema.extend({
+  type: z.literal('AssetsChangedServerMessage'),
+  silent: z.boolean(),
+  asset_type: AssetTypeSchema,
+  changed_ids: z.array(z.string()),
+  removed_ids: z.array(z.string()),
+});
+
+export type AssetsChangedServerMessage = z.infer<typeof AssetsChangedServerMessageSchema>;
+
 export const SettingsServerMessageSchema = BaseServerMessageSchema.extend({
   type: z.literal('SettingsServerMessage'),
   initial: z.boolean(),
@@ -128,6 +139,7 @@ export const ServerMessageSchema = z.discriminatedUnion('type', [
   ProjectClosedServerMessageSchema,
   ProjectLoadingServerMessageSchema,
   AssetsUpdatedServerMessageSchema,
+  AssetsChangedServerMessageSchema,
   SettingsServerMessageSchema,
   NotifyAboutChatMutationServerMessageSchema,
   ChatOpenedServerMessageSchema,
@@ -23,9 +23,10 @@ import { EditablesStore } from './useEditablesStore';
 export type AgentsSlice = {
   agents: Agent[];
   initAgents: () => Promise<void>;
+  updateAgents: (changedIds: string[], removedIds: string[]) => Promise<void>;
 };
 
-export const createAgentsSlice: StateCreator<EditablesStore, [], [], AgentsSlice> = (set) => ({
+export const createAgentsSlice: StateCreator<EditablesStore, [], [], AgentsSlice> = (set, get) => ({
   agents: [],
   initAgents: async () => {
     if (useProjectStore.getState().isProjectOpen) {
@@ -39,4 +40,18 @@ export const createAgentsSlice: StateCreator<EditablesStore, [], [], AgentsSlice
     }
     if (!useProjectStore.getState().isProjectOpen) return;
   },
+  updateAgents: async (changedIds: string[], removedIds: string[]) => {
+    if (!useProjectStore.getState().isProjectOpen) return;
+
+    const changedAgents = await Promise.all(
+      changedIds.map((id) => EditablesAPI.fetchEditableObject<Agent>({ editableObjectType: 'agent', id })),
+    );
+
+    const staleIds = new Set([...changedIds, ...removedIds]);
+    const agents = get().agents.filter((agent) => !staleIds.has(agent.id));
+
+    set({
+      agents: [...agents, ...changedAgents],
+    });
+  },
 });
@@ -24,35 +24,55 @@ import { useProjectStore } from '@/store/projects/useProjectStore';
 export type MaterialSlice = {
   materials?: Material[];
   initMaterials: () => Promise<void>;
+  updateMaterials: (changedIds: string[], removedIds: string[]) => Promise<void>;
 };
 
-export const createMaterialSlice: StateCreator<EditablesStore, [], [], MaterialSlice> = (set) => ({
+function sortMaterials(materials: Material[]) {
+  //sort alphabetically
+  materials.sort((a, b) => a.name.localeCompare(b.name));
+
+  //sort by defined_in
+  materials.sort((a, b) => {
+    const aDefinedIn = a.defined_in === 'project' ? 0 : 1;
+    const bDefinedIn = b.defined_in === 'project' ? 0 : 1;
+    return aDefinedIn - bDefinedIn;
+  });
+
+  //sort by status (forced first, disabled last, enabled in the middle)
+  materials.sort((a, b) => {
+    const aStatus = a.status === 'forced' ? 0 : a.status === 'enabled' ? 1 : 2;
+    const bStatus = b.status === 'forced' ? 0 : b.status === 'enabled' ? 1 : 2;
+    return aStatus - bStatus;
+  });
+
+  return materials;
+}
+
+export const createMaterialSlice: StateCreator<EditablesStore, [], [], MaterialSlice> = (set, get) => ({
   materials: undefined,
   initMaterials: async () => {
     if (useProjectStore.getState().isProjectOpen) {
       const materials = await EditablesAPI.fetchEditableObjects<Material>('material');
 
-      //sort alphabetically
-      materials.sort((a, b) => a.name.localeCompare(b.name));
-
-      //sort by defined_in
-      materials.sort((a, b) => {
-        const aDefinedIn = a.defined_in === 'project' ? 0 : 1;
-        const bDefinedIn = b.defined_in === 'project' ? 0 : 1;
-        return aDefinedIn - bDefinedIn;
-      });
-
-      //sort by status (forced first, disabled last, enabled in the middle)
-      materials.sort((a, b) => {
-        const aStatus = a.status === 'forced' ? 0 : a.status === 'enabled' ? 1 : 2;
-        const bStatus = b.status === 'forced' ? 0 : b.status === 'enabled' ? 1 : 2;
-        return aStatus - bStatus;
-      });
       set({
-        materials,
+        materials: sortMaterials(materials),
       });
     } else {
       set({ materials: [] });
     }
   },
+  updateMaterials: async (changedIds: string[], removedIds: string[]) => {
+    if (!useProjectStore.getState().isProjectOpen) return;
+
+    const changedMaterials = await Promise.all(
+      changedIds.map((id) => EditablesAPI.fetchEditableObject<Material>({ editableObjectType: 'material', id })),
+    );
+
+    const staleIds = new Set([...changedIds, ...removedIds]);
+    const materials = (get().materials || []).filter((material) => !staleIds.has(material.id));
+
+    set({
+      materials: sortMaterials([...materials, ...changedMaterials]),
+    });
+  },
 });
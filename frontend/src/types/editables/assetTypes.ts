@@ -28,6 +28,8 @@ export type TabsValues = 'chats' | 'materials' | 'agents';
 export type Material = Asset & {
   content_type: MaterialContentType;
   content: string;
+  cache_ttl?: number | null;
+  trusted?: boolean;
 };
 
 export type RenderedMaterial = {
@@ -83,6 +85,7 @@ export const AgentSchema = AssetSchema.extend({
   system: z.string(),
   gpt_mode: GPTModeSchema,
   execution_mode: z.string(),
+  materials_max_tokens: z.number().nullable().optional(),
 });
 
 export type Agent = z.infer<typeof AgentSchema>;
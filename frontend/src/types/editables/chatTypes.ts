@@ -37,6 +37,8 @@ export const AICMessageGroupSchema = z.object({
   role: GPTRoleSchema,
   task: z.string(),
   materials_ids: z.array(z.string()),
+  dropped_materials_ids: z.array(z.string()).optional(),
+  truncated_materials_ids: z.array(z.string()).optional(),
   messages: z.array(AICMessageSchema),
   analysis: z.string(),
 });